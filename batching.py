@@ -0,0 +1,95 @@
+import asyncio
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from services import ResumeParserService, FIELDS
+from metrics import detach_timings
+
+
+class LLMBatcher:
+    """
+    Micro-batcher that packs resumes parsed around the same time into one Groq request.
+
+    Callers await parse(text, fields) individually; texts are collected until the
+    batch reaches max_batch_size, would exceed token_budget, or `linger` seconds
+    pass, then sent together with ResumeParserService.parse_texts_batch asking
+    for every field requested by any of them.
+    """
+
+    def __init__(
+        self,
+        parser_service: ResumeParserService,
+        llm_semaphore: asyncio.Semaphore,
+        max_batch_size: int,
+        token_budget: int,
+        linger: float = 0.1,
+    ):
+        self.parser_service = parser_service
+        self.llm_semaphore = llm_semaphore
+        self.max_batch_size = max_batch_size
+        self.token_budget = token_budget
+        self.linger = linger
+        self._overhead = parser_service.estimate_tokens(parser_service.build_batch_prompt([]))
+        self._pending: List[Tuple[str, List[str], asyncio.Future]] = []
+        self._pending_tokens = 0
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks: Set[asyncio.Task] = set()
+
+    async def parse(
+        self,
+        text: str,
+        fields: Optional[List[str]] = None
+    ) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """Parse a resume as part of a batch, returning (fields, batch report)"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        tokens = self.parser_service.estimate_tokens(text)
+
+        if self._pending and self._overhead + self._pending_tokens + tokens > self.token_budget:
+            self._flush()
+        self._pending.append((text, fields or list(FIELDS), future))
+        self._pending_tokens += tokens
+
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.linger, self._flush)
+
+        return await future
+
+    def _flush(self):
+        """Send the pending texts as one batch"""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._pending:
+            return
+        batch, self._pending, self._pending_tokens = self._pending, [], 0
+        task = asyncio.get_running_loop().create_task(self._run(batch))
+        # Keep a reference so the task isn't garbage collected mid-flight
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: List[Tuple[str, List[str], asyncio.Future]]):
+        # This task inherited the context of the file that triggered the flush;
+        # the batch serves every file, so don't bill it to that one
+        detach_timings()
+        fields = [field for field in FIELDS if any(field in wanted for _, wanted, _ in batch)]
+        try:
+            async with self.llm_semaphore:
+                results, report = await self.parser_service.parse_texts_batch(
+                    [text for text, _, _ in batch], fields
+                )
+            print(
+                f"Parsed batch of {report['size']} resumes in {report['requests']} request(s): "
+                f"{report['prompt_tokens']} prompt + {report['completion_tokens']} completion tokens"
+            )
+        except Exception as e:
+            results, report = [e] * len(batch), None
+
+        for (_, _, future), result in zip(batch, results):
+            if future.done():
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result((result, report))
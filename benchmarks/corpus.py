@@ -0,0 +1,297 @@
+"""
+Synthetic resume corpus for the benchmarks.
+
+Generates PDF and DOCX resumes of varying length and layout from a seed,
+so runs on different commits see the same documents:
+
+    python benchmarks/corpus.py /tmp/corpus --count 200 --seed 1
+
+PDFs are written directly (Helvetica text objects, no extra dependency);
+DOCX files use python-docx. A manifest.json lists every file with its
+format, layout and page count.
+"""
+import argparse
+import io
+import json
+import os
+import random
+from typing import Any, Dict, List, Optional, Tuple
+
+from docx import Document
+
+FIRST_NAMES = ["Jane", "John", "Priya", "Wei", "Carlos", "Amara", "Lukas", "Sofia", "Omar", "Hannah",
+               "Kenji", "Fatima", "Noah", "Elena", "Arjun", "Grace", "Mateo", "Yuki", "David", "Aisha"]
+LAST_NAMES = ["Doe", "Smith", "Patel", "Chen", "Garcia", "Okafor", "Muller", "Rossi", "Haddad", "Kim",
+              "Tanaka", "Khan", "Johnson", "Petrova", "Sharma", "Lee", "Lopez", "Sato", "Brown", "Bello"]
+TITLES = ["Software Engineer", "Senior Backend Engineer", "Data Scientist", "DevOps Engineer",
+          "Product Manager", "Frontend Developer", "Machine Learning Engineer", "QA Engineer",
+          "Engineering Manager", "Data Analyst", "Site Reliability Engineer", "Mobile Developer"]
+COMPANIES = ["Acme Corp", "Globex", "Initech", "Umbrella Labs", "Stark Industries", "Wayne Enterprises",
+             "Hooli", "Pied Piper", "Vandelay Industries", "Cyberdyne Systems", "Soylent", "Tyrell Corp"]
+UNIVERSITIES = ["State University", "Institute of Technology", "University of Springfield",
+                "National University", "Polytechnic University", "City College"]
+DEGREES = ["Bachelor of Science in Computer Science", "Master of Science in Data Science",
+           "Bachelor of Engineering in Electronics", "MBA", "Master of Computer Applications",
+           "Bachelor of Arts in Economics"]
+SKILLS = ["Python", "Java", "Go", "Rust", "TypeScript", "React", "Django", "FastAPI", "PostgreSQL",
+          "MySQL", "Redis", "Kafka", "Docker", "Kubernetes", "AWS", "GCP", "Terraform", "Spark",
+          "Pandas", "PyTorch", "TensorFlow", "SQL", "GraphQL", "Linux", "CI/CD", "Airflow"]
+VERBS = ["Designed", "Built", "Led", "Migrated", "Optimized", "Automated", "Maintained", "Scaled",
+         "Launched", "Refactored", "Mentored", "Reduced"]
+OBJECTS = ["the payments service", "an internal analytics platform", "the customer onboarding flow",
+           "a real-time event pipeline", "the search backend", "the mobile release process",
+           "a recommendation engine", "the monitoring stack", "legacy batch jobs", "the public API"]
+OUTCOMES = ["cutting latency by {n}%", "serving {n}k requests per second", "saving {n} engineer hours a month",
+            "improving conversion by {n}%", "with {n} engineers across three time zones",
+            "reducing cloud spend by {n}%"]
+
+LAYOUTS = {"pdf": ["single", "two_column", "dates_last"], "docx": ["plain", "table"]}
+
+# A4 in points; lines per page at the body font size
+PAGE_WIDTH, PAGE_HEIGHT = 595, 842
+MARGIN = 50
+LEADING = 14
+
+
+def _person(rng: random.Random, jobs: int) -> Dict[str, Any]:
+    """Random candidate with `jobs` positions, most recent first"""
+    first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+    year = 2025
+    positions = []
+    for index in range(jobs):
+        length = rng.randint(1, 4)
+        start = year - length
+        positions.append({
+            "title": rng.choice(TITLES),
+            "company": rng.choice(COMPANIES),
+            "start": start,
+            "end": "Present" if index == 0 else str(year),
+            "bullets": [
+                f"{rng.choice(VERBS)} {rng.choice(OBJECTS)}, "
+                + rng.choice(OUTCOMES).format(n=rng.randint(5, 90)) + "."
+                for _ in range(rng.randint(2, 6))
+            ],
+        })
+        year = start - rng.randint(0, 1)
+    graduation = year - rng.randint(0, 2)
+    return {
+        "name": f"{first} {last}",
+        "email": f"{first.lower()}.{last.lower()}@example.com",
+        "phone": f"+1 555 {rng.randint(100, 999)} {rng.randint(1000, 9999)}",
+        "skills": rng.sample(SKILLS, rng.randint(5, 12)),
+        "degree": rng.choice(DEGREES),
+        "university": rng.choice(UNIVERSITIES),
+        "graduation": graduation,
+        "positions": positions,
+        "summary": " ".join(
+            f"{rng.choice(VERBS)} {rng.choice(OBJECTS)}." for _ in range(rng.randint(2, 5))
+        ),
+    }
+
+
+def _wrap(text: str, width: int) -> List[str]:
+    lines, line = [], ""
+    for word in text.split():
+        if line and len(line) + 1 + len(word) > width:
+            lines.append(line)
+            line = word
+        else:
+            line = f"{line} {word}" if line else word
+    if line:
+        lines.append(line)
+    return lines
+
+
+def _sections(person: Dict[str, Any], with_dates: bool = True) -> Dict[str, List[str]]:
+    """Resume text as lines per section"""
+    experience = []
+    for position in person["positions"]:
+        header = f"{position['title']} - {position['company']}"
+        if with_dates:
+            header += f" ({position['start']} - {position['end']})"
+        experience.append(header)
+        experience.extend(f"- {bullet}" for bullet in position["bullets"])
+        experience.append("")
+    return {
+        "contact": [person["name"], person["email"], person["phone"]],
+        "summary": [person["summary"]],
+        "experience": experience,
+        "education": [person["degree"], person["university"]]
+        + ([f"Graduated {person['graduation']}"] if with_dates else []),
+        "skills": [", ".join(person["skills"])],
+    }
+
+
+def _pdf_escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def build_pdf(pages: List[List[Tuple[float, float, float, str]]]) -> bytes:
+    """Minimal PDF with one Helvetica text run per (x, y, size, text) item on each page"""
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        None,  # page tree, filled in once the page objects are numbered
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>",
+    ]
+    page_ids = []
+    for items in pages:
+        stream = "".join(
+            f"BT /F1 {size:g} Tf {x:g} {y:g} Td ({_pdf_escape(text)}) Tj ET\n"
+            for x, y, size, text in items
+        ).encode("latin-1", "replace")
+        objects.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"endstream")
+        content_id = len(objects)
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %d %d] /Resources << /Font << /F1 3 0 R >> >> "
+            b"/Contents %d 0 R >>" % (PAGE_WIDTH, PAGE_HEIGHT, content_id)
+        )
+        page_ids.append(len(objects))
+    kids = " ".join(f"{page_id} 0 R" for page_id in page_ids).encode()
+    objects[1] = b"<< /Type /Pages /Kids [" + kids + b"] /Count %d >>" % len(page_ids)
+
+    out = io.BytesIO()
+    out.write(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(out.tell())
+        out.write(b"%d 0 obj\n" % number + body + b"\nendobj\n")
+    xref = out.tell()
+    out.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1))
+    for offset in offsets:
+        out.write(b"%010d 00000 n \n" % offset)
+    out.write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref))
+    return out.getvalue()
+
+
+def _flow(columns: List[Tuple[float, int, List[Tuple[float, str]]]]) -> List[List[Tuple[float, float, float, str]]]:
+    """
+    Lay out columns of (size, line) items top to bottom, starting new pages as needed.
+    Each column is (x, wrap width in characters, items); columns share pages.
+    """
+    pages: List[List[Tuple[float, float, float, str]]] = []
+    for x, width, items in columns:
+        page, y = 0, PAGE_HEIGHT - MARGIN
+        for size, text in items:
+            for line in _wrap(text, width) or [""]:
+                if y < MARGIN:
+                    page, y = page + 1, PAGE_HEIGHT - MARGIN
+                while len(pages) <= page:
+                    pages.append([])
+                if line:
+                    pages[page].append((x, y, size, line))
+                y -= LEADING if size <= 11 else LEADING + 4
+    return pages
+
+
+def render_pdf(person: Dict[str, Any], layout: str) -> Tuple[bytes, int]:
+    """PDF bytes and page count for a layout in LAYOUTS["pdf"]"""
+    def block(title: str, lines: List[str]) -> List[Tuple[float, str]]:
+        return [(13, title.upper())] + [(10, line) for line in lines] + [(10, "")]
+
+    if layout == "two_column":
+        sections = _sections(person)
+        sidebar = block("Contact", sections["contact"]) + block("Skills", person["skills"]) \
+            + block("Education", sections["education"])
+        main = [(18, person["name"])] + block("Summary", sections["summary"]) \
+            + block("Experience", sections["experience"])
+        pages = _flow([(MARGIN, 28, sidebar), (210, 64, main)])
+    elif layout == "dates_last":
+        # Dates detached from their sections, as some PDF exports produce
+        sections = _sections(person, with_dates=False)
+        dates = [f"{p['start']} - {p['end']}" for p in person["positions"]] + [str(person["graduation"])]
+        items = [(18, person["name"])]
+        for title in ("contact", "summary", "experience", "education", "skills"):
+            items += block(title, sections[title])
+        items += [(10, line) for line in dates]
+        pages = _flow([(MARGIN, 95, items)])
+    else:
+        sections = _sections(person)
+        items = [(18, person["name"])]
+        for title in ("contact", "summary", "experience", "education", "skills"):
+            items += block(title, sections[title])
+        pages = _flow([(MARGIN, 95, items)])
+    return build_pdf(pages), len(pages)
+
+
+def render_docx(person: Dict[str, Any], layout: str) -> Tuple[bytes, int]:
+    """DOCX bytes and an estimated page count for a layout in LAYOUTS["docx"]"""
+    sections = _sections(person)
+    document = Document()
+    document.add_heading(person["name"], level=0)
+    if layout == "table":
+        # Contact and skills in a side table, as many templates do
+        table = document.add_table(rows=1, cols=2)
+        table.cell(0, 0).text = "\n".join(sections["contact"])
+        table.cell(0, 1).text = "\n".join(person["skills"])
+    else:
+        for line in sections["contact"]:
+            document.add_paragraph(line)
+    lines = 0
+    for title in ("summary", "experience", "education", "skills"):
+        if layout == "table" and title == "skills":
+            continue
+        document.add_heading(title.title(), level=1)
+        for line in sections[title]:
+            document.add_paragraph(line)
+            lines += max(1, len(line) // 90)
+    out = io.BytesIO()
+    document.save(out)
+    return out.getvalue(), max(1, (lines + 12) // 45)
+
+
+def generate(
+    out_dir: str,
+    count: int,
+    seed: int = 1,
+    max_jobs: int = 12,
+    docx_share: float = 0.25,
+    nonce: Optional[str] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Write `count` resumes to out_dir and return the manifest entries.
+    The nonce is added to every document so a run doesn't hit the parse cache of an earlier one.
+    """
+    rng = random.Random(seed)
+    os.makedirs(out_dir, exist_ok=True)
+    manifest = []
+    for index in range(count):
+        person = _person(rng, rng.randint(1, max_jobs))
+        if nonce:
+            person["summary"] += f" Reference {nonce}-{index}."
+        file_format = "docx" if rng.random() < docx_share else "pdf"
+        layout = rng.choice(LAYOUTS[file_format])
+        if file_format == "pdf":
+            content, pages = render_pdf(person, layout)
+        else:
+            content, pages = render_docx(person, layout)
+        filename = f"resume_{index:05d}.{file_format}"
+        with open(os.path.join(out_dir, filename), "wb") as f:
+            f.write(content)
+        manifest.append({
+            "filename": filename,
+            "format": file_format,
+            "layout": layout,
+            "pages": pages,
+            "bytes": len(content),
+            "jobs": len(person["positions"]),
+        })
+    with open(os.path.join(out_dir, "manifest.json"), "w") as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic resume corpus")
+    parser.add_argument("out_dir")
+    parser.add_argument("--count", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--max-jobs", type=int, default=12, help="Positions per resume (more means more pages)")
+    parser.add_argument("--docx-share", type=float, default=0.25, help="Fraction of DOCX files")
+    args = parser.parse_args()
+    manifest = generate(args.out_dir, args.count, args.seed, args.max_jobs, args.docx_share)
+    pages = sum(entry["pages"] for entry in manifest)
+    print(f"Wrote {len(manifest)} resumes ({pages} pages) to {args.out_dir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""
+Local stand-in for the Groq chat-completions API.
+
+Answers with a plausible resume JSON (or a JSON array for batch prompts)
+after a configurable latency, and can inject 429s with Retry-After:
+
+    python benchmarks/mock_groq.py --port 8765 --latency 0.3 --jitter 0.1 --error-rate 0.05
+
+Point the app at it with GROQ_BASE_URL=http://127.0.0.1:8765.
+GET /stats returns request counters.
+"""
+import argparse
+import asyncio
+import json
+import random
+import re
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+_RESUME_MARKER = re.compile(r"=== RESUME (\d+) ===\n(.*?)\n=== END RESUME \1 ===", re.S)
+_EMAIL = re.compile(r"[\w.+-]+@[\w-]+\.[\w.]+")
+# Field list lines of the compact prompt ("- name", "- skills: ...")
+_FIELD_LINE = re.compile(r"^- (\w+)", re.M)
+
+
+def _fields(text: str) -> dict:
+    """Fields a parser would plausibly return for a resume text"""
+    lines = [line.strip() for line in text.splitlines() if line.strip()]
+    email = _EMAIL.search(text)
+    return {
+        "name": lines[0] if lines else None,
+        "email": email.group(0) if email else None,
+        "phone": None,
+        "total_years_experience": len(re.findall(r"\b(19|20)\d{2}\b", text)) // 2,
+        "last_job_title": None,
+        "last_job_company": None,
+        "last_job_duration": None,
+        "highest_degree": None,
+        "university": None,
+        "graduation_year": None,
+        "special_highlights": None,
+        "skills": "Python, SQL",
+    }
+
+
+def create_app(latency: float, jitter: float, error_rate: float, retry_after: float) -> FastAPI:
+    app = FastAPI()
+    stats = {"requests": 0, "rate_limited": 0, "prompt_tokens": 0, "completion_tokens": 0}
+
+    @app.post("/openai/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        stats["requests"] += 1
+        await asyncio.sleep(max(0.0, random.gauss(latency, jitter)) if jitter else latency)
+        if random.random() < error_rate:
+            stats["rate_limited"] += 1
+            return JSONResponse(
+                {"error": {"message": "Rate limit reached", "type": "tokens", "code": "rate_limit_exceeded"}},
+                status_code=429,
+                headers={"retry-after": str(retry_after)},
+            )
+
+        prompt = body["messages"][-1]["content"]
+        instructions = re.split(r"Resume Text:|=== RESUME 0 ===", prompt, 1)[0]
+        # Answer only the fields asked for, like the model would
+        requested = set(_FIELD_LINE.findall(instructions))
+
+        def answer(text: str) -> dict:
+            fields = _fields(text)
+            if requested & set(fields):
+                fields = {key: value for key, value in fields.items() if key in requested}
+            return fields
+
+        batch = _RESUME_MARKER.findall(prompt)
+        if batch:
+            content = json.dumps([dict(answer(text), index=int(index)) for index, text in batch])
+        else:
+            text = prompt.split("Resume Text:", 1)[-1]
+            content = json.dumps(answer(text))
+        prompt_tokens = sum(len(m["content"]) for m in body["messages"]) // 4
+        completion_tokens = len(content) // 4
+        stats["prompt_tokens"] += prompt_tokens
+        stats["completion_tokens"] += completion_tokens
+        return {
+            "id": f"mock-{stats['requests']}",
+            "object": "chat.completion",
+            "created": 0,
+            "model": body["model"],
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop",
+            }],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            },
+        }
+
+    @app.get("/stats")
+    async def get_stats():
+        return stats
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mock Groq chat-completions server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.3, help="Mean response time in seconds")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Standard deviation of the response time")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with 429")
+    parser.add_argument("--retry-after", type=float, default=1.0, help="Retry-After sent with injected 429s")
+    args = parser.parse_args()
+    app = create_app(args.latency, args.jitter, args.error_rate, args.retry_after)
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,314 @@
+"""
+End-to-end upload benchmark.
+
+Generates (or reuses) a synthetic corpus, starts the mock Groq server and
+pushes the files through POST /upload/bulk?wait=true of the app running
+in this process, with SQLite (default) or a local Postgres for storage:
+
+    python benchmarks/run.py --files 200 --batch-size 10 --concurrency 2 \\
+        --latency 0.3 --error-rate 0.02 --output results.json
+
+Reports files/sec, per-file latency percentiles, peak RSS and extraction
+time per page, and saves them as JSON. --compare baseline.json prints the
+change against an earlier run. App settings can be overridden with
+--set NAME=VALUE (e.g. --set LLM_BATCH_SIZE=5).
+
+Use a scratch database: the run inserts the parsed resumes.
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import platform
+import resource
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCHMARK_DIR)
+sys.path.insert(0, BENCHMARK_DIR)
+
+import corpus  # noqa: E402
+
+# Extraction stages reported by the pipeline timings (see metrics.py)
+EXTRACTION_STAGES = ("pdf_probe", "pypdf2", "pdfplumber", "docx")
+# Metrics compared with --compare and whether higher is better
+COMPARED = {
+    "files_per_second": True,
+    "latency_p50_seconds": False,
+    "latency_p95_seconds": False,
+    "latency_p99_seconds": False,
+    "peak_rss_mb": False,
+    "peak_children_rss_mb": False,
+    "extraction_ms_per_page": False,
+    "prompt_tokens_per_file": False,
+}
+
+
+def percentile(values: List[float], p: float) -> Optional[float]:
+    """Nearest-rank percentile"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, math.ceil(p / 100 * len(ordered)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def _max_rss_mb(who: int) -> float:
+    rss = resource.getrusage(who).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=REPO_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def start_mock(args, port: int) -> subprocess.Popen:
+    """Start the mock Groq server and wait until it answers"""
+    process = subprocess.Popen([
+        sys.executable, os.path.join(BENCHMARK_DIR, "mock_groq.py"),
+        "--port", str(port),
+        "--latency", str(args.latency),
+        "--jitter", str(args.jitter),
+        "--error-rate", str(args.error_rate),
+        "--retry-after", str(args.retry_after),
+    ])
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            httpx.get(f"http://127.0.0.1:{port}/stats", timeout=1).raise_for_status()
+            return process
+        except httpx.HTTPError:
+            if process.poll() is not None:
+                raise RuntimeError("Mock Groq server exited during startup")
+            time.sleep(0.2)
+    process.kill()
+    raise RuntimeError("Mock Groq server did not start")
+
+
+async def upload_all(app, batches: List[List[str]], corpus_dir: str, concurrency: int) -> Dict[str, Any]:
+    """Upload the batches (lists of filenames), `concurrency` requests at a time"""
+    semaphore = asyncio.Semaphore(concurrency)
+    transport = httpx.ASGITransport(app=app)
+    files_out: List[Dict[str, Any]] = []
+    request_seconds: List[float] = []
+    errors: List[Dict[str, Any]] = []
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark", timeout=None) as client:
+        async def upload(batch: List[str]):
+            payload = []
+            for filename in batch:
+                with open(os.path.join(corpus_dir, filename), "rb") as f:
+                    payload.append(("files", (filename, f.read())))
+            async with semaphore:
+                started = time.perf_counter()
+                response = await client.post("/upload/bulk?wait=true&timings=true", files=payload)
+                request_seconds.append(time.perf_counter() - started)
+            response.raise_for_status()
+            summary = response.json()
+            files_out.extend(summary.get("timings", []))
+            errors.extend(summary.get("errors", []))
+
+        started = time.perf_counter()
+        await asyncio.gather(*(upload(batch) for batch in batches))
+        wall = time.perf_counter() - started
+    return {"files": files_out, "request_seconds": request_seconds, "errors": errors, "wall_seconds": wall}
+
+
+def summarize(run: Dict[str, Any], manifest: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    files = run["files"]
+    latencies = [entry["total_seconds"] for entry in files]
+    stage_values: Dict[str, List[float]] = {}
+    extraction = {"pdf": [0.0, 0], "docx": [0.0, 0]}
+    for entry in files:
+        for stage, seconds in entry["stages"].items():
+            stage_values.setdefault(stage, []).append(seconds)
+        info = manifest.get(entry["filename"])
+        if info:
+            spent = sum(entry["stages"].get(stage, 0.0) for stage in EXTRACTION_STAGES)
+            extraction[info["format"]][0] += spent
+            extraction[info["format"]][1] += info["pages"]
+
+    def per_page(seconds: float, pages: int) -> Optional[float]:
+        return round(seconds / pages * 1000, 3) if pages else None
+
+    total_pages = extraction["pdf"][1] + extraction["docx"][1]
+    return {
+        "files": len(files),
+        "failed": len(run["errors"]),
+        "wall_seconds": round(run["wall_seconds"], 3),
+        "files_per_second": round(len(files) / run["wall_seconds"], 3) if run["wall_seconds"] else None,
+        "latency_p50_seconds": percentile(latencies, 50),
+        "latency_p95_seconds": percentile(latencies, 95),
+        "latency_p99_seconds": percentile(latencies, 99),
+        "request_p50_seconds": round(percentile(run["request_seconds"], 50) or 0, 4),
+        "request_p95_seconds": round(percentile(run["request_seconds"], 95) or 0, 4),
+        "extraction_ms_per_page": per_page(extraction["pdf"][0] + extraction["docx"][0], total_pages),
+        "pdf_extraction_ms_per_page": per_page(*extraction["pdf"]),
+        "docx_extraction_ms_per_page": per_page(*extraction["docx"]),
+        "pages": total_pages,
+        # Estimated by the app (text pre-processing plus the compact prompt template)
+        "tokens_saved_per_file": round(sum(entry.get("tokens_saved", 0) for entry in files) / len(files), 1)
+        if files else None,
+        "stages": {
+            stage: {
+                "mean": round(sum(values) / len(values), 4),
+                "p50": round(percentile(values, 50), 4),
+                "p95": round(percentile(values, 95), 4),
+            }
+            for stage, values in sorted(stage_values.items())
+        },
+    }
+
+
+def compare(current: Dict[str, Any], baseline_path: str):
+    """Print the change of the headline metrics against an earlier result file"""
+    with open(baseline_path) as f:
+        baseline = json.load(f)["summary"]
+    print(f"\nCompared with {baseline_path}:")
+    for key, higher_is_better in COMPARED.items():
+        old, new = baseline.get(key), current.get(key)
+        if old is None or new is None:
+            continue
+        change = (new - old) / old * 100 if old else 0.0
+        better = change > 0 if higher_is_better else change < 0
+        verdict = "better" if better and abs(change) >= 1 else "worse" if abs(change) >= 1 else "same"
+        print(f"  {key:26} {old:>10} -> {new:<10} {change:+7.1f}%  {verdict}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the bulk upload path against a mock Groq server")
+    parser.add_argument("--files", type=int, default=100, help="Files to upload (excluding warm-up)")
+    parser.add_argument("--corpus", help="Directory written by corpus.py (generated into a temp dir if omitted)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--max-jobs", type=int, default=12, help="Positions per generated resume")
+    parser.add_argument("--docx-share", type=float, default=0.25)
+    parser.add_argument("--batch-size", type=int, default=10, help="Files per upload request")
+    parser.add_argument("--concurrency", type=int, default=2, help="Upload requests in flight")
+    parser.add_argument("--warmup", type=int, default=2, help="Files uploaded first and left out of the results")
+    parser.add_argument("--latency", type=float, default=0.3, help="Mock LLM response time (seconds)")
+    parser.add_argument("--jitter", type=float, default=0.05, help="Standard deviation of the mock response time")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of mock responses that are 429s")
+    parser.add_argument("--retry-after", type=float, default=1.0)
+    parser.add_argument("--database-url", help="Defaults to a fresh SQLite file; use a scratch Postgres database")
+    parser.add_argument("--set", action="append", default=[], metavar="NAME=VALUE", help="App setting override")
+    parser.add_argument("--output", help="Write the results to this JSON file")
+    parser.add_argument("--compare", help="Earlier results JSON to compare with")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="resume-bench-")
+    corpus_dir = args.corpus
+    if corpus_dir:
+        with open(os.path.join(corpus_dir, "manifest.json")) as f:
+            entries = json.load(f)
+    else:
+        corpus_dir = os.path.join(workdir, "corpus")
+        # A fresh nonce per run keeps the parse cache of an earlier run from serving the files
+        entries = corpus.generate(
+            corpus_dir, args.files + args.warmup, args.seed, args.max_jobs, args.docx_share,
+            nonce=uuid.uuid4().hex[:12]
+        )
+    if len(entries) < args.files + args.warmup:
+        parser.error(f"The corpus has {len(entries)} files, {args.files + args.warmup} needed")
+    manifest = {entry["filename"]: entry for entry in entries}
+    warmup = [entry["filename"] for entry in entries[:args.warmup]]
+    measured = [entry["filename"] for entry in entries[args.warmup:args.warmup + args.files]]
+
+    port = _free_port()
+    mock = start_mock(args, port)
+    try:
+        os.environ.update({
+            "DATABASE_URL": args.database_url or f"sqlite://{os.path.join(workdir, 'bench.sqlite3')}",
+            "GROQ_BASE_URL": f"http://127.0.0.1:{port}",
+            "GROQ_API_KEY": "benchmark",
+            "DB_AUTO_MIGRATE": "true",
+            "GROQ_RATE_LIMIT_BACKEND": "local",
+        })
+        # The mock has no quota; keep the limiter from being the bottleneck unless asked
+        os.environ.setdefault("GROQ_REQUESTS_PER_MINUTE", "100000")
+        os.environ.setdefault("GROQ_TOKENS_PER_MINUTE", "100000000")
+        settings = {}
+        for item in args.set:
+            name, _, value = item.partition("=")
+            settings[name] = value
+        os.environ.update(settings)
+
+        sys.path.insert(0, REPO_DIR)
+        import main as app_module
+
+        async def mock_stats() -> Dict[str, int]:
+            async with httpx.AsyncClient() as client:
+                return (await client.get(f"http://127.0.0.1:{port}/stats")).json()
+
+        async def run():
+            async with app_module.lifespan(app_module.app):
+                if warmup:
+                    await upload_all(app_module.app, [warmup], corpus_dir, 1)
+                before = await mock_stats()
+                batches = [measured[i:i + args.batch_size] for i in range(0, len(measured), args.batch_size)]
+                result = await upload_all(app_module.app, batches, corpus_dir, args.concurrency)
+                after = await mock_stats()
+            # Token usage as seen by the mock (batched requests serve several files)
+            result["groq"] = {key: after[key] - before[key] for key in after}
+            return result
+
+        result = asyncio.run(run())
+    finally:
+        mock.terminate()
+        mock.wait()
+
+    summary = summarize(result, manifest)
+    summary["peak_rss_mb"] = round(_max_rss_mb(resource.RUSAGE_SELF), 1)
+    # Extraction workers (and the mock server, also a child process)
+    summary["peak_children_rss_mb"] = round(_max_rss_mb(resource.RUSAGE_CHILDREN), 1)
+    summary["groq_requests"] = result["groq"]["requests"]
+    summary["groq_rate_limited"] = result["groq"]["rate_limited"]
+    summary["prompt_tokens"] = result["groq"]["prompt_tokens"]
+    summary["completion_tokens"] = result["groq"]["completion_tokens"]
+    summary["prompt_tokens_per_file"] = round(summary["prompt_tokens"] / summary["files"], 1) if summary["files"] else None
+    report = {
+        "run": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "database": os.environ["DATABASE_URL"].split(":", 1)[0],
+            "args": {key: value for key, value in vars(args).items() if key not in ("output", "compare")},
+            "settings": settings,
+        },
+        "summary": summary,
+        "errors": result["errors"][:20],
+    }
+
+    print(json.dumps(summary, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Results written to {args.output}")
+    if args.compare:
+        compare(summary, args.compare)
+
+
+if __name__ == "__main__":
+    main()
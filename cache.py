@@ -0,0 +1,129 @@
+import asyncio
+import hashlib
+import json
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from tortoise.exceptions import IntegrityError
+
+from models import ParseCacheEntry
+
+
+def content_sha256(content: bytes) -> str:
+    """SHA-256 hex digest of the uploaded file bytes"""
+    return hashlib.sha256(content).hexdigest()
+
+
+def file_sha256(path: str, block_size: int = 1024 * 1024) -> str:
+    """SHA-256 hex digest of a file on disk, read in blocks"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class ParseCache:
+    """
+    Two-level cache of extracted text + parsed JSON.
+
+    An in-process LRU (bounded by approximate size in bytes) sits in front of
+    the persistent parse_cache table. Concurrent lookups for the same key
+    share a single computation, so a file uploaded twice in one batch is
+    only parsed once.
+    """
+
+    def __init__(self, model_name: str, prompt_version: str, max_bytes: int = 64 * 1024 * 1024):
+        self.model_name = model_name
+        self.prompt_version = prompt_version
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, Tuple[str, Dict[str, Any], int]]" = OrderedDict()
+        self._size = 0
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+    def make_key(self, content_hash: str) -> str:
+        """Cache key for a file under the current model and prompt version"""
+        raw = f"{content_hash}:{self.model_name}:{self.prompt_version}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _remember(self, key: str, text: str, parsed: Dict[str, Any]):
+        """Insert into the LRU, evicting least recently used entries past max_bytes"""
+        size = len(text) + len(json.dumps(parsed))
+        if size > self.max_bytes:
+            return
+        if key in self._entries:
+            self._size -= self._entries.pop(key)[2]
+        self._entries[key] = (text, parsed, size)
+        self._size += size
+        while self._size > self.max_bytes:
+            _, (_, _, evicted_size) = self._entries.popitem(last=False)
+            self._size -= evicted_size
+
+    async def get(self, content_hash: str) -> Optional[Tuple[str, Dict[str, Any]]]:
+        """Return (extracted_text, parsed_data) from memory or the database"""
+        key = self.make_key(content_hash)
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            return entry[0], dict(entry[1])
+
+        row = await ParseCacheEntry.get_or_none(key=key)
+        if row is None:
+            return None
+        self._remember(key, row.extracted_text, row.parsed_data)
+        return row.extracted_text, dict(row.parsed_data)
+
+    async def put(self, content_hash: str, text: str, parsed: Dict[str, Any]):
+        """Store a parse result in memory and in the database"""
+        key = self.make_key(content_hash)
+        self._remember(key, text, parsed)
+        try:
+            await ParseCacheEntry.create(
+                key=key,
+                content_hash=content_hash,
+                model_name=self.model_name,
+                prompt_version=self.prompt_version,
+                extracted_text=text,
+                parsed_data=parsed
+            )
+        except IntegrityError:
+            # Another worker stored the same file first
+            pass
+
+    async def get_or_compute(
+        self,
+        content_hash: str,
+        compute: Callable[[], Awaitable[Tuple[str, Dict[str, Any]]]]
+    ) -> Tuple[str, Dict[str, Any], bool]:
+        """
+        Return (extracted_text, parsed_data, cache_hit).
+        On a miss `compute` is awaited once even if several callers ask for the same file.
+        """
+        key = self.make_key(content_hash)
+        pending = self._inflight.get(key)
+        if pending is not None:
+            text, parsed = await asyncio.shield(pending)
+            return text, dict(parsed), True
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            cached = await self.get(content_hash)
+            if cached is not None:
+                future.set_result(cached)
+                return cached[0], cached[1], True
+
+            text, parsed = await compute()
+            await self.put(content_hash, text, parsed)
+            future.set_result((text, parsed))
+            return text, dict(parsed), False
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Mark the exception as retrieved when nobody else was waiting
+            future.exception()
+            raise
+        finally:
+            del self._inflight[key]
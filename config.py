@@ -0,0 +1,166 @@
+import os
+import tempfile
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+def _int_env(name: str, default: int, minimum: int = 1) -> int:
+    """Read an integer setting (at least `minimum`) from the environment"""
+    value = os.getenv(name)
+    if value is None or value.strip() == "":
+        return default
+    try:
+        parsed = int(value)
+    except ValueError:
+        raise ValueError(f"{name} must be an integer, got {value!r}")
+    if parsed < minimum:
+        raise ValueError(f"{name} must be at least {minimum}, got {parsed}")
+    return parsed
+
+
+def _bool_env(name: str, default: bool) -> bool:
+    """Read a boolean setting (1/true/yes/on) from the environment"""
+    value = os.getenv(name)
+    if value is None or value.strip() == "":
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+def _float_env(name: str, default: float) -> float:
+    """Read a positive float setting from the environment"""
+    value = os.getenv(name)
+    if value is None or value.strip() == "":
+        return default
+    try:
+        parsed = float(value)
+    except ValueError:
+        raise ValueError(f"{name} must be a number, got {value!r}")
+    if parsed <= 0:
+        raise ValueError(f"{name} must be greater than 0, got {parsed}")
+    return parsed
+
+
+# Server settings
+# Number of web worker processes (python main.py and gunicorn.conf.py)
+WEB_CONCURRENCY = _int_env("WEB_CONCURRENCY", 1)
+# A gunicorn worker is restarted after this many requests (plus random jitter)
+WEB_MAX_REQUESTS = _int_env("WEB_MAX_REQUESTS", 1000, minimum=0)
+WEB_MAX_REQUESTS_JITTER = _int_env("WEB_MAX_REQUESTS_JITTER", 100, minimum=0)
+# Heavy modules are imported on first use. WARMUP preloads groups of them in the
+# background once the server accepts traffic: a comma-separated list of "parsing"
+# (Groq SDK), "documents" (extraction workers with PyPDF2/pdfplumber/python-docx),
+# "export" (openpyxl) and "matching" (NumPy), or "all"
+_WARMUP_GROUPS = ("parsing", "documents", "export", "matching")
+WARMUP = [group.strip() for group in os.getenv("WARMUP", "").lower().split(",") if group.strip()]
+if "all" in WARMUP:
+    WARMUP = list(_WARMUP_GROUPS)
+if any(group not in _WARMUP_GROUPS for group in WARMUP):
+    raise ValueError(f"WARMUP must list groups of {', '.join(_WARMUP_GROUPS)} or be all, got {WARMUP!r}")
+# Delay between startup and the warm-up, so the first requests aren't competing with it
+WARMUP_DELAY_SECONDS = _float_env("WARMUP_DELAY_SECONDS", 1.0)
+
+# Groq settings
+GROQ_API_KEY = os.getenv("GROQ_API_KEY")
+GROQ_MODEL = os.getenv("GROQ_MODEL", "llama-3.3-70b-versatile")
+# Account quotas used by the shared rate limiter
+GROQ_REQUESTS_PER_MINUTE = _int_env("GROQ_REQUESTS_PER_MINUTE", 30)
+GROQ_TOKENS_PER_MINUTE = _int_env("GROQ_TOKENS_PER_MINUTE", 12000)
+# Attempts per completion when Groq answers 429/5xx
+GROQ_MAX_RETRIES = _int_env("GROQ_MAX_RETRIES", 3)
+# Longest wait before retrying a 429/5xx, whatever the reset headers say
+GROQ_MAX_RETRY_DELAY_SECONDS = _float_env("GROQ_MAX_RETRY_DELAY_SECONDS", 60.0)
+# Parsing prompt template: "v2" (compact) or "v1" (original long form)
+PROMPT_VERSION = os.getenv("PROMPT_VERSION", "v2").strip().lower()
+if PROMPT_VERSION not in ("v1", "v2"):
+    raise ValueError(f"PROMPT_VERSION must be v1 or v2, got {PROMPT_VERSION!r}")
+# Clean resume text before prompting (whitespace, repeated page headers/footers, low-value sections)
+LLM_PREPROCESS = _bool_env("LLM_PREPROCESS", True)
+# Estimated tokens of resume text per prompt; low-value sections are trimmed to fit
+LLM_TEXT_TOKEN_BUDGET = _int_env("LLM_TEXT_TOKEN_BUDGET", 3000)
+# Which fields the LLM is asked for: "full" (all; regex/dictionary matches fill gaps),
+# "fill" (only those the local pass didn't find) or "fast" (none, no Groq call)
+LLM_FIELD_MODE = os.getenv("LLM_FIELD_MODE", "full").strip().lower()
+if LLM_FIELD_MODE not in ("full", "fill", "fast"):
+    raise ValueError(f"LLM_FIELD_MODE must be full, fill or fast, got {LLM_FIELD_MODE!r}")
+# Where the rate limiter keeps its state: "local" (this process only), "file"
+# (shared by the processes of one host) or "postgres" (shared through the database)
+GROQ_RATE_LIMIT_BACKEND = os.getenv(
+    "GROQ_RATE_LIMIT_BACKEND", "file" if WEB_CONCURRENCY > 1 else "local"
+).strip().lower()
+if GROQ_RATE_LIMIT_BACKEND not in ("local", "file", "postgres"):
+    raise ValueError(f"GROQ_RATE_LIMIT_BACKEND must be local, file or postgres, got {GROQ_RATE_LIMIT_BACKEND!r}")
+# State file of the "file" backend
+GROQ_RATE_LIMIT_FILE = os.getenv(
+    "GROQ_RATE_LIMIT_FILE", os.path.join(tempfile.gettempdir(), "resume-scanner-groq-limits.json")
+)
+
+# Upload settings (enforced while the request body streams in)
+# Largest accepted file, and largest accepted request body
+UPLOAD_MAX_FILE_BYTES = _int_env("UPLOAD_MAX_FILE_BYTES", 20 * 1024 * 1024)
+UPLOAD_MAX_REQUEST_BYTES = _int_env("UPLOAD_MAX_REQUEST_BYTES", 200 * 1024 * 1024)
+# Files per upload request
+UPLOAD_MAX_FILES = _int_env("UPLOAD_MAX_FILES", 1000)
+# Files larger than this are spooled to disk instead of being kept in memory
+UPLOAD_SPOOL_THRESHOLD_BYTES = _int_env("UPLOAD_SPOOL_THRESHOLD_BYTES", 1024 * 1024, minimum=0)
+# Directory for spooled uploads (system temp directory when unset)
+UPLOAD_SPOOL_DIR = os.getenv("UPLOAD_SPOOL_DIR") or None
+
+# Bulk ingestion settings
+# Maximum number of Groq chat completions in flight at once
+MAX_CONCURRENT_LLM_CALLS = _int_env("MAX_CONCURRENT_LLM_CALLS", 4)
+# Resumes packed into one Groq request (1 disables batching)
+LLM_BATCH_SIZE = _int_env("LLM_BATCH_SIZE", 1)
+# Estimated prompt tokens allowed per batched request
+LLM_BATCH_TOKEN_BUDGET = _int_env("LLM_BATCH_TOKEN_BUDGET", 6000)
+# Background workers draining the bulk upload job queue
+JOB_WORKERS = _int_env("JOB_WORKERS", 1)
+# Files of one job processed at the same time
+JOB_FILE_CONCURRENCY = _int_env("JOB_FILE_CONCURRENCY", MAX_CONCURRENT_LLM_CALLS * 2)
+# A running job is reclaimed by another worker if its lease isn't renewed in time
+JOB_LEASE_SECONDS = _float_env("JOB_LEASE_SECONDS", 60.0)
+# Parsed resumes written per bulk insert (1 inserts each file on its own)
+DB_WRITE_BATCH_SIZE = _int_env("DB_WRITE_BATCH_SIZE", 50)
+# Number of worker processes used for PDF/DOCX text extraction (per web worker)
+EXTRACTION_WORKERS = _int_env("EXTRACTION_WORKERS", max(1, (os.cpu_count() or 2) // WEB_CONCURRENCY))
+# Extraction workers are replaced after this many documents to release parser memory
+EXTRACTION_MAX_TASKS_PER_WORKER = _int_env("EXTRACTION_MAX_TASKS_PER_WORKER", 100)
+# Per-document extraction time budget; slower workers are killed and replaced
+EXTRACTION_TIMEOUT_SECONDS = _float_env("EXTRACTION_TIMEOUT_SECONDS", 60.0)
+# PDFs are read page by page up to this many pages...
+PDF_MAX_PAGES = _int_env("PDF_MAX_PAGES", 20)
+# ...or until this much text has been collected
+PDF_MAX_CHARS = _int_env("PDF_MAX_CHARS", 30000)
+
+# Parse cache settings
+# Size bound of the in-process LRU in front of the parse_cache table
+PARSE_CACHE_MAX_BYTES = _int_env("PARSE_CACHE_MAX_BYTES", 64 * 1024 * 1024)
+# Reuse the existing Resume row when the same file is uploaded again
+DEDUPE_RESUMES = _bool_env("DEDUPE_RESUMES", False)
+
+# Export settings
+# Rows fetched per page when streaming exports
+EXPORT_CHUNK_SIZE = _int_env("EXPORT_CHUNK_SIZE", 1000)
+
+# Job description matching settings
+# Terms are hashed into 2**MATCH_HASH_BITS dimensions
+MATCH_HASH_BITS = _int_env("MATCH_HASH_BITS", 18)
+# Most frequent terms kept per resume vector (bounds index memory)
+MATCH_MAX_TERMS = _int_env("MATCH_MAX_TERMS", 256)
+
+# Database settings
+# asyncpg pool bounds
+DB_POOL_MIN_SIZE = _int_env("DB_POOL_MIN_SIZE", 1)
+DB_POOL_MAX_SIZE = _int_env("DB_POOL_MAX_SIZE", 10)
+if DB_POOL_MIN_SIZE > DB_POOL_MAX_SIZE:
+    raise ValueError("DB_POOL_MIN_SIZE must not exceed DB_POOL_MAX_SIZE")
+# Idle connections are closed after this long; keep it below Neon's auto-suspend delay
+DB_POOL_MAX_IDLE_SECONDS = _float_env("DB_POOL_MAX_IDLE_SECONDS", 240.0)
+# Prepared statements cached per connection (0 when going through a transaction-mode PgBouncer)
+DB_STATEMENT_CACHE_SIZE = _int_env("DB_STATEMENT_CACHE_SIZE", 100, minimum=0)
+# Connections idle for longer than this are pinged before being handed out
+DB_PING_AFTER_IDLE_SECONDS = _float_env("DB_PING_AFTER_IDLE_SECONDS", 30.0)
+# Retries when connecting fails (e.g. while a suspended Neon compute wakes up)
+DB_CONNECT_RETRIES = _int_env("DB_CONNECT_RETRIES", 3, minimum=0)
+# Run pending schema migrations on startup instead of `python database.py migrate`
+DB_AUTO_MIGRATE = _bool_env("DB_AUTO_MIGRATE", False)
@@ -1,7 +1,16 @@
 from tortoise import Tortoise
+from tortoise.backends.base.config_generator import DB_LOOKUP, expand_db_url
+from tortoise.exceptions import OperationalError
+import asyncio
 import os
+import sys
+import time
+from typing import Any, Dict
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
 from dotenv import load_dotenv
 
+import config
+
 load_dotenv()
 
 # Get Neon DB connection string from environment
@@ -15,22 +24,237 @@ if not DATABASE_URL:
 if DATABASE_URL.startswith("postgresql://"):
     DATABASE_URL = DATABASE_URL.replace("postgresql://", "postgres://", 1)
 
-# Remove sslmode parameter and add proper SSL config
-# asyncpg uses 'ssl' not 'sslmode'
-if "?sslmode=" in DATABASE_URL:
-    DATABASE_URL = DATABASE_URL.split("?sslmode=")[0]
-elif "&sslmode=" in DATABASE_URL:
-    DATABASE_URL = DATABASE_URL.split("&sslmode=")[0]
+# asyncpg uses 'ssl' not 'sslmode'; other libpq-only parameters (e.g. channel_binding)
+# are dropped since asyncpg would reject them
+SSL_MODE = None
+if DATABASE_URL.startswith("postgres://"):
+    _url = urlsplit(DATABASE_URL)
+    _params = dict(parse_qsl(_url.query))
+    SSL_MODE = _params.pop("sslmode", None)
+    _params = {key: value for key, value in _params.items() if key in DB_LOOKUP["postgres"]["cast"]}
+    DATABASE_URL = urlunsplit(_url._replace(query=urlencode(_params)))
+
+# Bump when models or the migration steps below change; startup refuses to run
+# against an older schema unless DB_AUTO_MIGRATE is set
+SCHEMA_VERSION = 4
+
+# Serializes migrations of several instances on Postgres
+MIGRATION_LOCK_ID = 804201
+
+
+def tortoise_config() -> Dict[str, Any]:
+    """
+    Tortoise config for DATABASE_URL.
+    Postgres goes through db_pool.AsyncpgPoolClient with explicit pool settings.
+    """
+    db = expand_db_url(DATABASE_URL)
+    if db["engine"] == "tortoise.backends.asyncpg":
+        db["engine"] = "db_pool"
+        db["credentials"].update({
+            "minsize": config.DB_POOL_MIN_SIZE,
+            "maxsize": config.DB_POOL_MAX_SIZE,
+            "max_inactive_connection_lifetime": config.DB_POOL_MAX_IDLE_SECONDS,
+            "statement_cache_size": config.DB_STATEMENT_CACHE_SIZE,
+            "ping_after_idle": config.DB_PING_AFTER_IDLE_SECONDS,
+            "reconnect_attempts": config.DB_CONNECT_RETRIES,
+        })
+        if SSL_MODE and SSL_MODE != "disable":
+            db["credentials"]["ssl"] = SSL_MODE
+    return {
+        "connections": {"default": db},
+        "apps": {"models": {"models": ["models"], "default_connection": "default"}},
+    }
+
+# Columns added to existing tables after their first release.
+# generate_schemas() only creates missing tables, so these are added explicitly
+# before it runs (it also creates the indexes declared on the models).
+ADDED_COLUMNS = [
+    ("resumes", "content_hash", "VARCHAR(64)"),
+    ("resume_texts", "extraction_backend", "VARCHAR(20)"),
+    ("resume_texts", "page_count", "INT"),
+]
+
+async def _table_columns(conn, table: str) -> set:
+    """
+    Column names of an existing table (empty if the table doesn't exist yet)
+    """
+    if conn.capabilities.dialect == "postgres":
+        _, rows = await conn.execute_query(
+            "SELECT column_name AS name FROM information_schema.columns WHERE table_name = $1",
+            [table]
+        )
+    else:
+        _, rows = await conn.execute_query(f'PRAGMA table_info("{table}")')
+    return {row["name"] for row in rows}
+
+async def _ensure_columns():
+    """
+    Add columns introduced by newer versions to tables that already exist
+    """
+    conn = Tortoise.get_connection("default")
+    for table, column, column_type in ADDED_COLUMNS:
+        columns = await _table_columns(conn, table)
+        if not columns or column in columns:
+            continue
+        await conn.execute_script(f'ALTER TABLE "{table}" ADD COLUMN "{column}" {column_type}')
+        print(f"Added column {table}.{column}")
+
+# Trigram indexes for the case-insensitive substring filters of /resumes/query.
+# The expressions match what Tortoise generates for __icontains on Postgres.
+# resume_texts gets a stored tsvector column with a GIN index for /search.
+POSTGRES_INDEXES = [
+    'CREATE EXTENSION IF NOT EXISTS pg_trgm',
+    'CREATE INDEX IF NOT EXISTS "idx_resumes_degree_trgm" ON "resumes" '
+    'USING gin ((UPPER(CAST("highest_degree" AS VARCHAR))) gin_trgm_ops)',
+    'CREATE INDEX IF NOT EXISTS "idx_resumes_university_trgm" ON "resumes" '
+    'USING gin ((UPPER(CAST("university" AS VARCHAR))) gin_trgm_ops)',
+    'CREATE INDEX IF NOT EXISTS "idx_resumes_company_trgm" ON "resumes" '
+    'USING gin ((UPPER(CAST("last_job_company" AS VARCHAR))) gin_trgm_ops)',
+    'ALTER TABLE "resume_texts" ADD COLUMN IF NOT EXISTS "content_tsv" tsvector '
+    "GENERATED ALWAYS AS (to_tsvector('english', coalesce(\"content\", ''))) STORED",
+    'CREATE INDEX IF NOT EXISTS "idx_resume_texts_tsv" ON "resume_texts" USING gin ("content_tsv")',
+]
+
+async def _ensure_postgres_indexes():
+    """
+    Create Postgres-only indexes that can't be declared on the models
+    """
+    conn = Tortoise.get_connection("default")
+    if conn.capabilities.dialect != "postgres":
+        return
+    for statement in POSTGRES_INDEXES:
+        try:
+            await conn.execute_script(statement)
+        except Exception as e:
+            # Filters still work without them, just slower
+            print(f"Could not create index ({statement[:60]}...): {e}")
+
+async def _backfill_resume_skills(batch_size: int = 500):
+    """
+    Populate resume_skills for resumes saved before the table existed
+    """
+    from models import Resume, ResumeSkill
+    from tortoise.expressions import Subquery
+    
+    total = 0
+    last_id = 0
+    while True:
+        resumes = await Resume.filter(id__gt=last_id, skills__not_isnull=True).exclude(
+            id__in=Subquery(ResumeSkill.all().values("resume_id"))
+        ).order_by("id").limit(batch_size)
+        if not resumes:
+            break
+        for resume in resumes:
+            await resume.save_skills()
+        total += len(resumes)
+        last_id = resumes[-1].id
+    if total:
+        print(f"Indexed skills for {total} existing resumes")
+
+async def _backfill_resume_texts(batch_size: int = 500):
+    """
+    Store search text for existing resumes whose extracted text is still in the parse cache
+    """
+    from models import ParseCacheEntry, Resume, ResumeText
+    from tortoise.expressions import Subquery
+
+    total = 0
+    last_id = 0
+    while True:
+        rows = await Resume.filter(id__gt=last_id, content_hash__not_isnull=True).exclude(
+            id__in=Subquery(ResumeText.all().values("resume_id"))
+        ).order_by("id").limit(batch_size).values("id", "content_hash")
+        if not rows:
+            break
+        texts = dict(await ParseCacheEntry.filter(
+            content_hash__in=list({row["content_hash"] for row in rows})
+        ).values_list("content_hash", "extracted_text"))
+        missing = [
+            ResumeText(resume_id=row["id"], content=texts[row["content_hash"]])
+            for row in rows if row["content_hash"] in texts
+        ]
+        if missing:
+            await ResumeText.bulk_create(missing)
+        total += len(missing)
+        last_id = rows[-1]["id"]
+    if total:
+        print(f"Stored search text for {total} existing resumes")
+
+async def _schema_version(conn) -> int:
+    """
+    Version recorded by the last migration (0 for databases never migrated)
+    """
+    try:
+        rows = await conn.execute_query_dict('SELECT MAX("version") AS "version" FROM "schema_version"')
+    except OperationalError:
+        return 0
+    return rows[0]["version"] or 0
+
+async def _migrate_steps(conn):
+    await _ensure_columns()
+    await Tortoise.generate_schemas(safe=True)
+    await _ensure_postgres_indexes()
+    await _backfill_resume_skills()
+    await _backfill_resume_texts()
+    await conn.execute_script('CREATE TABLE IF NOT EXISTS "schema_version" ("version" INTEGER NOT NULL)')
+    await conn.execute_query('INSERT INTO "schema_version" ("version") VALUES (%d)' % SCHEMA_VERSION)
+
+async def migrate():
+    """
+    Bring the schema up to date: create tables, add columns and indexes, run backfills
+    """
+    conn = Tortoise.get_connection("default")
+    if conn.capabilities.dialect != "postgres":
+        if await _schema_version(conn) < SCHEMA_VERSION:
+            await _migrate_steps(conn)
+        return
+
+    # Held on one pooled connection so concurrent instances migrate one at a time
+    async with conn.acquire_connection() as lock_conn:
+        await lock_conn.execute("SELECT pg_advisory_lock($1)", MIGRATION_LOCK_ID)
+        try:
+            version = await _schema_version(conn)
+            if version < SCHEMA_VERSION:
+                print(f"Migrating database schema from version {version} to {SCHEMA_VERSION}")
+                await _migrate_steps(conn)
+        finally:
+            await lock_conn.execute("SELECT pg_advisory_unlock($1)", MIGRATION_LOCK_ID)
+
+async def warm_up():
+    """
+    Open the connection pool and run a round-trip so the first request doesn't pay for it
+    """
+    started = time.monotonic()
+    await Tortoise.get_connection("default").execute_query("SELECT 1")
+    print(f"Database connection ready in {(time.monotonic() - started) * 1000:.0f} ms")
+
+def pool_stats() -> Dict[str, Any]:
+    """
+    Connection pool size and utilization (None for backends without a pool)
+    """
+    conn = Tortoise.get_connection("default")
+    stats = getattr(conn, "pool_stats", None)
+    return {
+        "backend": conn.capabilities.dialect,
+        "pool": stats() if stats else None,
+    }
 
 async def init_db():
     """
-    Initialize database connection and generate schemas
+    Initialize the database connection and check the schema is current.
+    Schema changes run in `python database.py migrate`, or here with DB_AUTO_MIGRATE.
     """
-    await Tortoise.init(
-        db_url=DATABASE_URL,
-        modules={'models': ['models']},
-    )
-    await Tortoise.generate_schemas()
+    await Tortoise.init(config=tortoise_config())
+    await warm_up()
+    version = await _schema_version(Tortoise.get_connection("default"))
+    if version < SCHEMA_VERSION:
+        if not config.DB_AUTO_MIGRATE:
+            await Tortoise.close_connections()
+            raise RuntimeError(
+                f"Database schema is at version {version}, this release needs {SCHEMA_VERSION}. "
+                "Run `python database.py migrate` or set DB_AUTO_MIGRATE=true"
+            )
+        await migrate()
     print("Database initialized successfully")
 
 async def close_db():
@@ -38,4 +262,18 @@ async def close_db():
     Close database connections
     """
     await Tortoise.close_connections()
-    print("Database connections closed")
\ No newline at end of file
+    print("Database connections closed")
+
+async def _run_migrations():
+    await Tortoise.init(config=tortoise_config())
+    try:
+        await migrate()
+        print(f"Database schema is at version {SCHEMA_VERSION}")
+    finally:
+        await Tortoise.close_connections()
+
+if __name__ == "__main__":
+    if sys.argv[1:] != ["migrate"]:
+        print("Usage: python database.py migrate")
+        sys.exit(2)
+    asyncio.run(_run_migrations())
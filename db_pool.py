@@ -0,0 +1,123 @@
+import asyncio
+import time
+from typing import Any, Dict, Optional
+
+import asyncpg
+from tortoise.backends.asyncpg.client import AsyncpgDBClient
+
+# Errors meaning the server side of a connection is gone (e.g. Neon suspended the compute)
+CONNECTION_ERRORS = (
+    OSError,
+    asyncio.TimeoutError,
+    asyncpg.PostgresConnectionError,
+    asyncpg.InterfaceError,
+    asyncpg.AdminShutdownError,
+    asyncpg.CannotConnectNowError,
+)
+
+
+class MonitoredPool:
+    """
+    Wrapper around an asyncpg pool that Tortoise uses in its place.
+
+    Connections idle for longer than ping_after_idle seconds are pinged when
+    handed out; a dead one is closed by asyncpg and acquire() retries with a
+    fresh connection. Acquisition counts and wait times are kept for metrics.
+    """
+
+    def __init__(self, ping_after_idle: float, reconnect_attempts: int):
+        self.pool: Optional[asyncpg.Pool] = None
+        self.ping_after_idle = ping_after_idle
+        self.reconnect_attempts = reconnect_attempts
+        self._last_used: Dict[int, float] = {}
+        self.acquired = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        self.pings = 0
+        self.reconnects = 0
+
+    async def setup(self, conn):
+        """asyncpg setup hook: pre-ping connections that sat idle"""
+        last_used = self._last_used.get(conn.get_server_pid())
+        if last_used is not None and time.monotonic() - last_used > self.ping_after_idle:
+            self.pings += 1
+            await asyncio.wait_for(conn.fetchval("SELECT 1"), timeout=5)
+
+    async def acquire(self):
+        started = time.monotonic()
+        for attempt in range(self.reconnect_attempts + 1):
+            try:
+                conn = await self.pool.acquire()
+                break
+            except CONNECTION_ERRORS:
+                if attempt == self.reconnect_attempts:
+                    raise
+                self.reconnects += 1
+                await asyncio.sleep(0.5 * 2 ** attempt)
+        waited = time.monotonic() - started
+        self.acquired += 1
+        self.wait_seconds_total += waited
+        self.wait_seconds_max = max(self.wait_seconds_max, waited)
+        return conn
+
+    async def release(self, conn, *args, **kwargs):
+        if not conn.is_closed():
+            if len(self._last_used) > 4 * self.pool.get_max_size():
+                # Forget connections closed since (worst case: one extra ping)
+                self._last_used.clear()
+            self._last_used[conn.get_server_pid()] = time.monotonic()
+        return await self.pool.release(conn, *args, **kwargs)
+
+    def stats(self) -> Dict[str, Any]:
+        """Pool size, utilization and acquisition counters"""
+        size = self.pool.get_size()
+        idle = self.pool.get_idle_size()
+        return {
+            "min_size": self.pool.get_min_size(),
+            "max_size": self.pool.get_max_size(),
+            "size": size,
+            "idle": idle,
+            "in_use": size - idle,
+            "acquired_total": self.acquired,
+            "acquire_wait_seconds_total": round(self.wait_seconds_total, 4),
+            "acquire_wait_seconds_max": round(self.wait_seconds_max, 4),
+            "pings_total": self.pings,
+            "reconnects_total": self.reconnects,
+        }
+
+    def __getattr__(self, name):
+        # close(), terminate(), expire_connections() ... go to the real pool
+        return getattr(self.pool, name)
+
+
+class AsyncpgPoolClient(AsyncpgDBClient):
+    """
+    Tortoise asyncpg client using MonitoredPool.
+    Selected with engine "db_pool" in the Tortoise config (see database.py).
+    """
+
+    def __init__(self, *args, ping_after_idle: float = 30.0, reconnect_attempts: int = 3, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.ping_after_idle = ping_after_idle
+        self.reconnect_attempts = reconnect_attempts
+        self._monitored: Optional[MonitoredPool] = None
+
+    async def create_pool(self, **kwargs) -> MonitoredPool:
+        monitored = MonitoredPool(self.ping_after_idle, self.reconnect_attempts)
+        # Neon may need a few seconds to resume a suspended compute
+        for attempt in range(self.reconnect_attempts + 1):
+            try:
+                monitored.pool = await asyncpg.create_pool(None, setup=monitored.setup, **kwargs)
+                break
+            except CONNECTION_ERRORS:
+                if attempt == self.reconnect_attempts:
+                    raise
+                await asyncio.sleep(0.5 * 2 ** attempt)
+        self._monitored = monitored
+        return monitored
+
+    def pool_stats(self) -> Optional[Dict[str, Any]]:
+        return self._monitored.stats() if self._monitored and self._pool else None
+
+
+client_class = AsyncpgPoolClient
@@ -0,0 +1,134 @@
+import asyncio
+import csv
+import io
+import json
+import os
+import tempfile
+from typing import Any, AsyncIterator, Dict, Iterator, List, Pattern
+
+from models import Resume
+import startup
+
+# (column header, Resume field) in export order
+EXPORT_COLUMNS = [
+    ("ID", "id"),
+    ("Name", "name"),
+    ("Email", "email"),
+    ("Phone", "phone"),
+    ("Total Experience (Years)", "total_years_experience"),
+    ("Last Job Title", "last_job_title"),
+    ("Last Job Company", "last_job_company"),
+    ("Last Job Duration", "last_job_duration"),
+    ("Highest Degree", "highest_degree"),
+    ("University", "university"),
+    ("Graduation Year", "graduation_year"),
+    ("Skills", "skills"),
+    ("Special Highlights", "special_highlights"),
+    ("Created At", "created_at"),
+]
+
+EXPORT_FIELDS = [field for _, field in EXPORT_COLUMNS]
+EXPORT_HEADERS = [header for header, _ in EXPORT_COLUMNS]
+
+# Size of the chunks the spooled Excel file is streamed in
+STREAM_BLOCK_SIZE = 64 * 1024
+
+
+async def iter_resume_chunks(chunk_size: int = 1000) -> AsyncIterator[List[Dict[str, Any]]]:
+    """
+    Page through the resumes table with keyset pagination on id.
+    Only the exported columns are fetched and at most chunk_size rows are held at once.
+    """
+    last_id = 0
+    while True:
+        rows = await (
+            Resume.filter(id__gt=last_id)
+            .order_by("id")
+            .limit(chunk_size)
+            .values(*EXPORT_FIELDS)
+        )
+        if not rows:
+            return
+        yield rows
+        last_id = rows[-1]["id"]
+
+
+def _format_row(row: Dict[str, Any]) -> List[Any]:
+    """Export values for a row in column order"""
+    created_at = row.get("created_at")
+    values = [row.get(field) for field in EXPORT_FIELDS]
+    values[-1] = created_at.strftime("%Y-%m-%d %H:%M:%S") if created_at else None
+    return values
+
+
+def _excel_value(value: Any, illegal_characters: Pattern) -> Any:
+    """Strip control characters openpyxl refuses to write"""
+    if isinstance(value, str):
+        return illegal_characters.sub("", value)
+    return value
+
+
+def _iter_file(path: str) -> Iterator[bytes]:
+    """Stream a file in blocks and delete it afterwards"""
+    try:
+        with open(path, "rb") as f:
+            while True:
+                block = f.read(STREAM_BLOCK_SIZE)
+                if not block:
+                    break
+                yield block
+    finally:
+        os.remove(path)
+
+
+async def build_excel_export(chunk_size: int = 1000) -> Iterator[bytes]:
+    """
+    Write all resumes to an .xlsx file with openpyxl's write-only workbook.
+
+    Rows are written chunk by chunk so the table is never fully in memory.
+    XLSX is a zip archive and can only be sent once complete, so the workbook
+    is saved to a temporary file that is then streamed in blocks.
+    """
+    # openpyxl is only imported by the first Excel export
+    openpyxl = await startup.load_async("openpyxl")
+    illegal_characters = startup.load("openpyxl.cell.cell").ILLEGAL_CHARACTERS_RE
+    workbook = openpyxl.Workbook(write_only=True)
+    sheet = workbook.create_sheet("Resumes")
+    sheet.append(EXPORT_HEADERS)
+
+    async for rows in iter_resume_chunks(chunk_size):
+        for row in rows:
+            sheet.append([_excel_value(value, illegal_characters) for value in _format_row(row)])
+
+    fd, path = tempfile.mkstemp(suffix=".xlsx")
+    os.close(fd)
+    try:
+        await asyncio.to_thread(workbook.save, path)
+    except Exception:
+        os.remove(path)
+        raise
+    return _iter_file(path)
+
+
+async def stream_csv(chunk_size: int = 1000) -> AsyncIterator[str]:
+    """Stream resumes as CSV, one chunk of rows at a time"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_HEADERS)
+    yield buffer.getvalue()
+
+    async for rows in iter_resume_chunks(chunk_size):
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows(_format_row(row) for row in rows)
+        yield buffer.getvalue()
+
+
+async def stream_ndjson(chunk_size: int = 1000) -> AsyncIterator[str]:
+    """Stream resumes as newline-delimited JSON, one object per resume"""
+    async for rows in iter_resume_chunks(chunk_size):
+        lines = []
+        for row in rows:
+            values = _format_row(row)
+            lines.append(json.dumps(dict(zip(EXPORT_FIELDS, values))))
+        yield "\n".join(lines) + "\n"
@@ -0,0 +1,198 @@
+import asyncio
+import multiprocessing
+import signal
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import metrics
+
+
+class ExtractionTimeout(Exception):
+    """Raised when a document takes longer than its extraction time budget"""
+
+
+class ExtractionWorkerError(Exception):
+    """Raised when an extraction worker dies while handling a document"""
+
+
+def _worker_main(conn, options: Dict[str, Any], preload: List[str]):
+    """
+    Entry point of an extraction worker process.
+    Receives (source, file_extension) jobs, where source is the document's bytes
+    or the path of a spooled upload, and replies with ("ok", (text, info), stages)
+    or ("error", message, stages), where info describes how the text was extracted and
+    stages holds the timings of the extraction steps. Options go to extract_document.
+    Modules in `preload` are imported before the first job instead of on first use.
+    """
+    from services import ResumeParserService
+    import startup
+
+    # Ctrl-C reaches the whole process group; the parent stops the workers itself
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+    if preload:
+        started = time.perf_counter()
+        failed = startup.preload(preload)
+        print(f"Extraction worker preloaded {len(preload) - len(failed)} modules in {time.perf_counter() - started:.2f}s")
+
+    while True:
+        try:
+            job = conn.recv()
+        except (EOFError, OSError):
+            return
+        if job is None:
+            return
+        source, file_extension = job
+        timings = metrics.start_timings()
+        try:
+            result = ResumeParserService.extract_document(source, file_extension, **options)
+        except Exception as e:
+            conn.send(("error", str(e), timings.stages))
+        else:
+            conn.send(("ok", result, timings.stages))
+
+
+class _Worker:
+    """A single extraction process and the pipe used to talk to it"""
+
+    def __init__(self, ctx, options: Dict[str, Any], preload: List[str]):
+        self.conn, child_conn = ctx.Pipe()
+        self.process = ctx.Process(target=_worker_main, args=(child_conn, options, preload), daemon=True)
+        self.process.start()
+        child_conn.close()
+        self.tasks = 0
+
+    def stop(self, timeout: float = 2.0):
+        """Ask the worker to exit, killing it if it doesn't"""
+        try:
+            self.conn.send(None)
+        except (OSError, ValueError):
+            pass
+        self.process.join(timeout)
+        if self.process.is_alive():
+            self.kill()
+        self.conn.close()
+
+    def kill(self):
+        """Terminate the worker immediately"""
+        self.process.kill()
+        self.process.join()
+        self.conn.close()
+
+
+class ExtractionExecutor:
+    """
+    Process pool for PDF/DOCX text extraction.
+
+    Each worker handles one document at a time. A worker that exceeds the
+    per-document timeout (or crashes) is killed and replaced so a single
+    pathological file can't stall the pool. Workers are also retired after
+    max_tasks documents, so memory held by the PDF libraries is returned.
+    PDFs are read up to pdf_max_pages pages or pdf_max_chars characters.
+    """
+
+    def __init__(
+        self,
+        workers: int = 2,
+        timeout: Optional[float] = 60.0,
+        max_tasks: Optional[int] = None,
+        pdf_max_pages: int = 20,
+        pdf_max_chars: int = 30000,
+    ):
+        self.size = workers
+        self.timeout = timeout
+        self.max_tasks = max_tasks
+        self._options = {"pdf_max_pages": pdf_max_pages, "pdf_max_chars": pdf_max_chars}
+        # Modules new workers import up front (set by warm_up)
+        self._preload: List[str] = []
+        self._ctx = multiprocessing.get_context("spawn")
+        self._workers: List[_Worker] = []
+        self._idle: Optional[asyncio.Queue] = None
+        # Threads only wait on worker pipes (or retiring workers), so the event loop never blocks
+        self._waiters = ThreadPoolExecutor(max_workers=workers + 1, thread_name_prefix="extract-wait")
+
+    def _start(self):
+        """Spawn the worker processes on first use"""
+        self._idle = asyncio.Queue()
+        for _ in range(self.size):
+            worker = _Worker(self._ctx, self._options, self._preload)
+            self._workers.append(worker)
+            self._idle.put_nowait(worker)
+
+    def warm_up(self, preload: List[str]):
+        """
+        Start the worker processes now rather than on the first document, and
+        have them (and their replacements) import `preload` before taking jobs.
+        """
+        self._preload = list(preload)
+        if self._idle is None:
+            self._start()
+
+    def _replace(self, worker: _Worker) -> _Worker:
+        """Kill a worker and start a fresh one in its place"""
+        worker.kill()
+        replacement = _Worker(self._ctx, self._options, self._preload)
+        self._workers[self._workers.index(worker)] = replacement
+        return replacement
+
+    def _recycle(self, worker: _Worker) -> _Worker:
+        """Start a fresh worker and let the old one exit after its current job"""
+        replacement = _Worker(self._ctx, self._options, self._preload)
+        self._workers[self._workers.index(worker)] = replacement
+        # stop() joins the process, keep that off the event loop
+        self._waiters.submit(worker.stop)
+        return replacement
+
+    def _roundtrip(self, worker: _Worker, source: Union[bytes, str], file_extension: str):
+        """Send a job to a worker and wait for the reply (runs in a waiter thread)"""
+        worker.conn.send((source, file_extension))
+        if not worker.conn.poll(self.timeout):
+            raise ExtractionTimeout(
+                f"Text extraction exceeded {self.timeout:g}s time budget"
+            )
+        return worker.conn.recv()
+
+    async def extract(self, source: Union[bytes, str], file_extension: str) -> Tuple[str, Dict[str, Any]]:
+        """
+        Extract text from a document in a worker process, returning (text, extraction info).
+        A file path is passed as is, so large spooled uploads aren't copied through the pipe.
+        """
+        if self._idle is None:
+            self._start()
+
+        loop = asyncio.get_running_loop()
+        with metrics.timed("extract_queue"):
+            worker = await self._idle.get()
+        healthy = False
+        try:
+            status, payload, stages = await loop.run_in_executor(
+                self._waiters, self._roundtrip, worker, source, file_extension
+            )
+            healthy = True
+        except (EOFError, OSError) as e:
+            raise ExtractionWorkerError(f"Extraction worker died: {e}")
+        finally:
+            # Timed out, crashed or cancelled mid-job: the worker state is unknown
+            if not healthy:
+                worker = self._replace(worker)
+            else:
+                worker.tasks += 1
+                if self.max_tasks and worker.tasks >= self.max_tasks:
+                    worker = self._recycle(worker)
+            self._idle.put_nowait(worker)
+
+        # Timings measured in the worker process are recorded here
+        for stage, seconds in stages.items():
+            metrics.observe_stage(stage, seconds)
+        if status == "error":
+            raise ValueError(payload)
+        return payload
+
+    def shutdown(self):
+        """Stop all worker processes"""
+        for worker in self._workers:
+            worker.stop()
+        self._workers = []
+        self._idle = None
+        self._waiters.shutdown(wait=False, cancel_futures=True)
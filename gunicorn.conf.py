@@ -0,0 +1,28 @@
+# Gunicorn settings for multi-process serving:
+#
+#   WEB_CONCURRENCY=4 gunicorn main:app
+#
+# Each worker runs its own event loop, extraction pool and job workers. The
+# Groq rate limiter shares its state between them (GROQ_RATE_LIMIT_BACKEND),
+# and workers are restarted after WEB_MAX_REQUESTS requests so memory left
+# behind by long-lived processes is returned.
+import os
+
+# Module-level names are read as gunicorn settings, and "config" is one of them
+import config as app_config
+
+# Workers import config too; keep the derived defaults (e.g. the extraction
+# pool size and the file rate limit backend) consistent with the worker count
+os.environ.setdefault("WEB_CONCURRENCY", str(app_config.WEB_CONCURRENCY))
+
+bind = os.getenv("BIND", "0.0.0.0:8000")
+workers = app_config.WEB_CONCURRENCY
+worker_class = "uvicorn.workers.UvicornWorker"
+
+# Graceful recycling: a worker stops accepting requests, finishes the ones in
+# flight (up to graceful_timeout) and is replaced by a fresh process
+max_requests = app_config.WEB_MAX_REQUESTS
+max_requests_jitter = app_config.WEB_MAX_REQUESTS_JITTER
+graceful_timeout = 60
+# Bulk uploads wait on the LLM; don't kill workers for slow requests
+timeout = 300
@@ -0,0 +1,293 @@
+"""
+Offline bulk ingestion of a directory or ZIP archive of resumes.
+
+Runs the pipeline behind POST /upload/bulk (extraction process pool, bounded
+Groq calls, parse cache, batched inserts) directly, without HTTP:
+
+    python ingest.py resumes/ --report report.json
+    python ingest.py resumes.zip --workers 8 --llm-concurrency 6
+
+Every finished file is appended to a checkpoint file (SOURCE.ingest.jsonl by
+default), and running the same command again skips the files recorded there,
+so an interrupted run resumes where it stopped. Failed files are retried on the
+next run unless --skip-failed is given. Files already stored (same content
+hash) are not inserted twice, which also covers files that finished right
+before an interruption but weren't checkpointed yet.
+
+Settings come from the environment like for the server (DATABASE_URL,
+GROQ_API_KEY, LLM_BATCH_SIZE, ...). To try it against the mock Groq server
+and SQLite:
+
+    python benchmarks/mock_groq.py --port 8765 &
+    GROQ_BASE_URL=http://127.0.0.1:8765 GROQ_API_KEY=test DB_AUTO_MIGRATE=true \\
+        DATABASE_URL=sqlite://ingest.sqlite3 python ingest.py resumes/
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import sys
+import time
+import zipfile
+from typing import Any, Dict, List, Optional
+
+import config
+from database import init_db, close_db
+from pipeline import BulkIngestPipeline, build_pipeline, summarize, unsupported_file_error
+from metrics import GROQ_REQUESTS_TOTAL, GROQ_TOKENS_TOTAL
+
+
+def _ignored(name: str) -> bool:
+    """Hidden files and folders, including the __MACOSX resource forks of archives made on macOS"""
+    return any(part.startswith(".") or part == "__MACOSX" for part in name.split("/"))
+
+
+class DirectorySource:
+    """Resume files below a directory, keyed by their relative path"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.names = []
+        for root, dirs, files in os.walk(path):
+            dirs.sort()
+            for filename in sorted(files):
+                name = os.path.relpath(os.path.join(root, filename), path).replace(os.sep, "/")
+                if not _ignored(name):
+                    self.names.append(name)
+
+    def size(self, name: str) -> int:
+        return os.path.getsize(os.path.join(self.path, name))
+
+    async def process(self, pipeline: BulkIngestPipeline, name: str, dedupe: bool) -> Dict[str, Any]:
+        # Passed by path, so the extraction workers read the file themselves
+        return await pipeline.process_path(name, os.path.join(self.path, name), dedupe)
+
+    def close(self):
+        pass
+
+
+class ZipSource:
+    """Resume files in a ZIP archive, keyed by their member name"""
+
+    def __init__(self, path: str):
+        self.archive = zipfile.ZipFile(path)
+        self._members = {
+            info.filename: info for info in self.archive.infolist()
+            if not info.is_dir() and not _ignored(info.filename)
+        }
+        self.names = sorted(self._members)
+
+    def size(self, name: str) -> int:
+        return self._members[name].file_size
+
+    async def process(self, pipeline: BulkIngestPipeline, name: str, dedupe: bool) -> Dict[str, Any]:
+        content = await asyncio.to_thread(self.archive.read, name)
+        return await pipeline.process_content(name, content, dedupe)
+
+    def close(self):
+        self.archive.close()
+
+
+class Checkpoint:
+    """
+    Append-only JSON Lines record of finished files:
+    {"file", "status": "ok" | "failed", "resume_id" or "error"}.
+    Lines are flushed as they are written, so a killed run loses at most the files in flight.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        needs_newline = False
+        if os.path.exists(path):
+            with open(path) as f:
+                for line in f:
+                    needs_newline = not line.endswith("\n")
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        # A line cut short when the previous run was killed
+                        continue
+                    self.entries[entry["file"]] = entry
+        self._file = open(path, "a")
+        if needs_newline:
+            self._file.write("\n")
+
+    def finished(self, name: str, retry_failed: bool) -> bool:
+        entry = self.entries.get(name)
+        return entry is not None and (entry["status"] == "ok" or not retry_failed)
+
+    def record(self, outcome: Dict[str, Any]):
+        if "error" in outcome:
+            entry = {"file": outcome["filename"], "status": "failed", "error": outcome["error"]}
+        else:
+            entry = {"file": outcome["filename"], "status": "ok", "resume_id": outcome["resume"]["id"]}
+        self.entries[entry["file"]] = entry
+        self._file.write(json.dumps(entry) + "\n")
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+def load_source(path: str):
+    if os.path.isdir(path):
+        return DirectorySource(path)
+    if zipfile.is_zipfile(path):
+        return ZipSource(path)
+    raise ValueError(f"{path} is neither a directory nor a ZIP archive")
+
+
+def percentile(values: List[float], p: float) -> Optional[float]:
+    """Nearest-rank percentile"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[max(1, math.ceil(p / 100 * len(ordered))) - 1]
+
+
+async def ingest(args) -> Dict[str, Any]:
+    """Ingest the pending files of args.source and return the run report"""
+    source = load_source(args.source)
+    checkpoint = Checkpoint(args.checkpoint)
+    supported = [name for name in source.names if not unsupported_file_error(name)]
+    pending = [name for name in supported if not checkpoint.finished(name, not args.skip_failed)]
+    print(f"[ingest] {len(source.names)} files in {args.source}: {len(pending)} to process, "
+          f"{len(supported) - len(pending)} already in {args.checkpoint}, "
+          f"{len(source.names) - len(supported)} unsupported")
+
+    outcomes: List[Dict[str, Any]] = []
+    interrupted = False
+    started = time.perf_counter()
+    pipeline = None
+    await init_db()
+    try:
+        # The file and postgres rate limit backends share the Groq quota with running servers
+        pipeline = build_pipeline(workers=args.workers, max_llm_calls=args.llm_concurrency)
+        # Files in flight; enough to keep the extraction workers and the LLM calls busy
+        slots = asyncio.Semaphore(args.concurrency)
+        tasks = set()
+        last_progress = time.perf_counter()
+
+        async def run(name: str):
+            nonlocal last_progress
+            try:
+                if source.size(name) > config.UPLOAD_MAX_FILE_BYTES:
+                    outcome = {"filename": name, "error": f"File exceeds UPLOAD_MAX_FILE_BYTES ({config.UPLOAD_MAX_FILE_BYTES})"}
+                else:
+                    outcome = await source.process(pipeline, name, args.dedupe)
+            except Exception as e:
+                outcome = {"filename": name, "error": str(e)}
+            finally:
+                slots.release()
+            checkpoint.record(outcome)
+            outcomes.append(outcome)
+            now = time.perf_counter()
+            if now - last_progress >= args.progress_interval or len(outcomes) == len(pending):
+                last_progress = now
+                failed = sum(1 for item in outcomes if "error" in item)
+                print(f"[ingest] {len(outcomes)}/{len(pending)} files, {failed} failed, "
+                      f"{len(outcomes) / (now - started):.2f} files/s")
+
+        try:
+            for name in pending:
+                await slots.acquire()
+                task = asyncio.create_task(run(name))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            await asyncio.gather(*tasks)
+        except asyncio.CancelledError:
+            # Ctrl-C: files still in flight are picked up again by the next run
+            interrupted = True
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+    finally:
+        if pipeline:
+            pipeline.extractor.shutdown()
+        checkpoint.close()
+        source.close()
+        await close_db()
+
+    wall = time.perf_counter() - started
+    summary = summarize(outcomes, include_timings=True)
+    latencies = [outcome["timings"]["total_seconds"] for outcome in outcomes if outcome.get("timings")]
+    return {
+        "source": args.source,
+        "checkpoint": args.checkpoint,
+        "interrupted": interrupted,
+        "files": len(source.names),
+        "unsupported": len(source.names) - len(supported),
+        "skipped": len(supported) - len(pending),
+        "processed": len(outcomes),
+        "successful": summary["successful"],
+        "failed": summary["failed"],
+        "cache_hits": summary["cache_hits"],
+        "duplicates": sum(1 for resume in summary["resumes"] if resume["duplicate"]),
+        "wall_seconds": round(wall, 3),
+        "files_per_second": round(len(outcomes) / wall, 3) if wall else None,
+        "latency_p50_seconds": percentile(latencies, 50),
+        "latency_p95_seconds": percentile(latencies, 95),
+        "groq_requests": int(GROQ_REQUESTS_TOTAL.total()),
+        "groq_rate_limited": int(GROQ_REQUESTS_TOTAL.total(status=429)),
+        "prompt_tokens": int(GROQ_TOKENS_TOTAL.total(type="prompt")),
+        "completion_tokens": int(GROQ_TOKENS_TOTAL.total(type="completion")),
+        # Summed over files; concurrent files overlap, so this exceeds wall-clock time
+        "stage_totals": summary["stage_totals"],
+        "errors": summary["errors"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ingest a directory or ZIP archive of resumes into the database")
+    parser.add_argument("source", help="Directory (searched recursively) or ZIP archive of PDF/DOCX resumes")
+    parser.add_argument("--checkpoint", help="Checkpoint file (default: SOURCE.ingest.jsonl)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="Extraction worker processes (default: CPU count)")
+    parser.add_argument("--llm-concurrency", type=int, default=config.MAX_CONCURRENT_LLM_CALLS,
+                        help="Groq requests in flight (default: MAX_CONCURRENT_LLM_CALLS)")
+    parser.add_argument("--concurrency", type=int,
+                        help="Files in flight (default: enough for the workers, LLM calls and batches)")
+    parser.add_argument("--dedupe", action=argparse.BooleanOptionalAction, default=True,
+                        help="Reuse the stored resume of a file with the same content (default: on)")
+    parser.add_argument("--skip-failed", action="store_true", help="Don't retry files that failed in an earlier run")
+    parser.add_argument("--progress-interval", type=float, default=10.0, help="Seconds between progress lines")
+    parser.add_argument("--report", help="Write the run report (with all errors) to this JSON file")
+    args = parser.parse_args()
+
+    if args.workers < 1 or args.llm_concurrency < 1 or (args.concurrency is not None and args.concurrency < 1):
+        parser.error("--workers, --llm-concurrency and --concurrency must be at least 1")
+    if not os.path.exists(args.source):
+        parser.error(f"{args.source} does not exist")
+    args.source = args.source.rstrip("/\\") or args.source
+    if args.checkpoint is None:
+        args.checkpoint = args.source + ".ingest.jsonl"
+    if args.concurrency is None:
+        args.concurrency = 2 * args.workers + args.llm_concurrency * config.LLM_BATCH_SIZE
+
+    resume_hint = f"[ingest] Interrupted; run the same command again to continue from {args.checkpoint}"
+    try:
+        report = asyncio.run(ingest(args))
+    except KeyboardInterrupt:
+        print(resume_hint)
+        sys.exit(130)
+
+    summary = {key: value for key, value in report.items() if key != "errors"}
+    print(json.dumps(summary, indent=2))
+    for error in report["errors"][:20]:
+        print(f"[ingest] FAILED {error['filename']}: {error['error']}")
+    if len(report["errors"]) > 20:
+        print(f"[ingest] ... and {len(report['errors']) - 20} more failures")
+    if args.report:
+        with open(args.report, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"[ingest] Report written to {args.report}")
+    if report["interrupted"]:
+        print(resume_hint)
+        sys.exit(130)
+    sys.exit(1 if report["failed"] else 0)
+
+
+if __name__ == "__main__":
+    main()
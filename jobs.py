@@ -0,0 +1,341 @@
+import asyncio
+import json
+import os
+import tempfile
+import traceback
+from datetime import timedelta
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from tortoise import timezone
+from tortoise.expressions import F, Q
+from tortoise.transactions import in_transaction
+
+from models import IngestJob, IngestJobFile, IngestJobFileChunk, Resume
+from pipeline import BulkIngestPipeline, summarize, unsupported_file_error
+from metrics import timed
+from uploads import SpooledUpload
+
+FINISHED_STATUSES = {"completed"}
+# File contents buffered per bulk insert while enqueueing
+ENQUEUE_BATCH_BYTES = 16 * 1024 * 1024
+# Size of the ingest_job_file_chunks rows a queued file is stored in
+FILE_CHUNK_BYTES = 1024 * 1024
+
+
+def _now():
+    return timezone.now()
+
+
+class JobQueue:
+    """
+    Database-backed queue for bulk uploads.
+
+    Uploads are stored as ingest_jobs / ingest_job_files rows and drained by
+    background workers. A worker holds a lease on the job it is running and
+    renews it while working, so a job left behind by a crashed or restarted
+    process is picked up again once its lease expires. Only files still
+    pending are processed on resume.
+    """
+
+    def __init__(
+        self,
+        pipeline: BulkIngestPipeline,
+        workers: int = 1,
+        file_concurrency: int = 8,
+        poll_interval: float = 1.0,
+        lease_seconds: float = 60.0,
+        spool_dir: Optional[str] = None,
+    ):
+        self.pipeline = pipeline
+        self.workers = workers
+        self.file_concurrency = file_concurrency
+        self.poll_interval = poll_interval
+        self.lease_seconds = lease_seconds
+        # Where stored files are written back to disk for the extraction workers
+        self.spool_dir = spool_dir
+        self._tasks: List[asyncio.Task] = []
+        self._wakeup: Optional[asyncio.Event] = None
+
+    async def enqueue(self, files: List[SpooledUpload], dedupe: bool = False) -> IngestJob:
+        """
+        Store the uploaded files as a new queued job.
+        Files are read in FILE_CHUNK_BYTES pieces and their chunk rows inserted
+        in batches of about ENQUEUE_BATCH_BYTES, so a large upload is never held
+        in memory whole. The bytes live in the database so the job can be
+        resumed by any worker process, not only the one holding the spool file.
+        """
+        async with in_transaction(connection_name="default") as conn:
+            job = await IngestJob.create(total=len(files), dedupe=dedupe, using_db=conn)
+            unsupported = 0
+            chunks = []
+            buffered = 0
+            for position, file in enumerate(files):
+                error = unsupported_file_error(file.filename)
+                if error:
+                    # Nothing to process, record the failure straight away
+                    unsupported += 1
+                    await IngestJobFile.create(
+                        job=job, position=position, filename=file.filename,
+                        status="failed", error=error, finished_at=_now(), using_db=conn
+                    )
+                    continue
+                row = await IngestJobFile.create(
+                    job=job, position=position, filename=file.filename, using_db=conn
+                )
+                seq = 0
+                async for data in file.chunks(FILE_CHUNK_BYTES):
+                    chunks.append(IngestJobFileChunk(file_id=row.id, seq=seq, data=data))
+                    seq += 1
+                    buffered += len(data)
+                    if buffered >= ENQUEUE_BATCH_BYTES:
+                        await IngestJobFileChunk.bulk_create(chunks, using_db=conn)
+                        chunks, buffered = [], 0
+            if chunks:
+                await IngestJobFileChunk.bulk_create(chunks, using_db=conn)
+            if unsupported:
+                job.processed = job.failed = unsupported
+                await job.save(using_db=conn)
+
+        if self._wakeup:
+            self._wakeup.set()
+        return job
+
+    def start(self):
+        """Start the background workers"""
+        self._wakeup = asyncio.Event()
+        for _ in range(self.workers):
+            self._tasks.append(asyncio.create_task(self._worker_loop()))
+
+    async def stop(self):
+        """Stop the background workers; running jobs resume after restart"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def _worker_loop(self):
+        while True:
+            try:
+                job = await self._claim()
+                if job is None:
+                    self._wakeup.clear()
+                    try:
+                        await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+                    except asyncio.TimeoutError:
+                        pass
+                    continue
+                await self._run_job(job)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                # Keep the worker alive; the job is retried when its lease expires
+                traceback.print_exc()
+                await asyncio.sleep(self.poll_interval)
+
+    async def _claim(self) -> Optional[IngestJob]:
+        """
+        Take ownership of the oldest queued job (or a running job whose lease expired).
+        The conditional update makes the claim atomic across workers and processes.
+        """
+        now = _now()
+        claimable = Q(status="queued") | Q(status="running", lease_expires_at__lt=now)
+        candidates = await IngestJob.filter(claimable).order_by("created_at").limit(5)
+        for job in candidates:
+            claimed = await IngestJob.filter(
+                claimable, id=job.id, lease_expires_at=job.lease_expires_at
+            ).update(
+                status="running",
+                lease_expires_at=now + timedelta(seconds=self.lease_seconds),
+                started_at=job.started_at or now
+            )
+            if claimed:
+                return await IngestJob.get(id=job.id)
+        return None
+
+    async def _renew_lease(self, job_id):
+        """Extend the lease while the job is being worked on"""
+        while True:
+            await asyncio.sleep(self.lease_seconds / 3)
+            await IngestJob.filter(id=job_id).update(
+                lease_expires_at=_now() + timedelta(seconds=self.lease_seconds)
+            )
+
+    async def _run_job(self, job: IngestJob):
+        print(f"Running ingest job {job.id}")
+        heartbeat = asyncio.create_task(self._renew_lease(job.id))
+        try:
+            pending = await IngestJobFile.filter(job_id=job.id, status="pending").order_by("position").values(
+                "id", "filename"
+            )
+            semaphore = asyncio.Semaphore(self.file_concurrency)
+
+            async def process(row):
+                async with semaphore:
+                    await self._process_file(job, row["id"], row["filename"])
+
+            tasks = [asyncio.create_task(process(row)) for row in pending]
+            try:
+                await asyncio.gather(*tasks)
+            except BaseException:
+                # Stop the other files before the lease can lapse, or the worker
+                # reclaiming the job would process them a second time
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+                raise
+            await IngestJob.filter(id=job.id).update(
+                status="completed", finished_at=_now(), lease_expires_at=None
+            )
+            print(f"Ingest job {job.id} completed")
+        except asyncio.CancelledError:
+            # Shutting down: hand the job back so the next worker resumes it right away
+            await IngestJob.filter(id=job.id).update(status="queued", lease_expires_at=None)
+            raise
+        finally:
+            heartbeat.cancel()
+
+    async def _write_to_disk(self, file_id: int, path: str):
+        """Copy a stored file to `path`, a few chunks at a time"""
+        with open(path, "wb") as f:
+            next_seq = 0
+            while True:
+                chunks = await IngestJobFileChunk.filter(
+                    file_id=file_id, seq__gte=next_seq
+                ).order_by("seq").limit(4).values_list("seq", "data")
+                if not chunks:
+                    break
+                for seq, data in chunks:
+                    await asyncio.to_thread(f.write, data)
+                next_seq = chunks[-1][0] + 1
+            if not next_seq:
+                # Queued before files were stored in chunks
+                content = await IngestJobFile.filter(id=file_id).first().values_list("content", flat=True)
+                await asyncio.to_thread(f.write, content or b"")
+
+    async def _process_file(self, job: IngestJob, file_id: int, filename: str):
+        """Process one stored file and record its outcome"""
+        # Written back to a temp file so the extraction workers read it by path
+        fd, path = tempfile.mkstemp(
+            prefix="job-", suffix=os.path.splitext(filename)[1].lower(), dir=self.spool_dir
+        )
+        os.close(fd)
+        try:
+            with timed("file_read"):
+                await self._write_to_disk(file_id, path)
+            outcome = await self.pipeline.process_path(filename, path, job.dedupe)
+        finally:
+            os.unlink(path)
+
+        if "error" in outcome:
+            await IngestJobFile.filter(id=file_id).update(
+                status="failed", error=outcome["error"], content=None, finished_at=_now()
+            )
+            await IngestJob.filter(id=job.id).update(
+                processed=F("processed") + 1, failed=F("failed") + 1
+            )
+        else:
+            resume = outcome["resume"]
+            await IngestJobFile.filter(id=file_id).update(
+                status="done", resume_id=resume["id"], cached=resume["cached"],
+                duplicate=resume["duplicate"], content=None, finished_at=_now()
+            )
+            await IngestJob.filter(id=job.id).update(
+                processed=F("processed") + 1,
+                successful=F("successful") + 1,
+                cache_hits=F("cache_hits") + (1 if resume["cached"] else 0)
+            )
+        await IngestJobFileChunk.filter(file_id=file_id).delete()
+
+
+def job_progress(job: IngestJob) -> Dict[str, Any]:
+    """Counters, timing and throughput of a job"""
+    end = job.finished_at or _now()
+    elapsed = (end - job.started_at).total_seconds() if job.started_at else 0.0
+    files_per_second = job.processed / elapsed if elapsed > 0 else 0.0
+    remaining = job.total - job.processed
+    return {
+        "job_id": str(job.id),
+        "status": job.status,
+        "total": job.total,
+        "processed": job.processed,
+        "successful": job.successful,
+        "failed": job.failed,
+        "cache_hits": job.cache_hits,
+        "created_at": job.created_at.isoformat() if job.created_at else None,
+        "started_at": job.started_at.isoformat() if job.started_at else None,
+        "finished_at": job.finished_at.isoformat() if job.finished_at else None,
+        "elapsed_seconds": round(elapsed, 2),
+        "files_per_second": round(files_per_second, 3),
+        "eta_seconds": round(remaining / files_per_second, 1)
+        if files_per_second > 0 and job.status not in FINISHED_STATUSES else None,
+    }
+
+
+async def job_status(job: IngestJob) -> Dict[str, Any]:
+    """Progress plus per-file state and the bulk upload summary once finished"""
+    files = await IngestJobFile.filter(job_id=job.id).order_by("position").values(
+        "position", "filename", "status", "error", "resume_id", "cached", "duplicate"
+    )
+    status = job_progress(job)
+    status["files"] = files
+    if job.status in FINISHED_STATUSES:
+        status["results"] = await job_results(job, files)
+    return status
+
+
+async def job_results(job: IngestJob, files: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
+    """Summary in the same shape as a synchronous /upload/bulk response"""
+    if files is None:
+        files = await IngestJobFile.filter(job_id=job.id).order_by("position").values(
+            "filename", "status", "error", "resume_id", "cached", "duplicate"
+        )
+    resume_ids = [row["resume_id"] for row in files if row["resume_id"] is not None]
+    names = dict(await Resume.filter(id__in=resume_ids).values_list("id", "name")) if resume_ids else {}
+
+    outcomes = []
+    for row in files:
+        if row["status"] == "done":
+            outcomes.append({
+                "filename": row["filename"],
+                "resume": {
+                    "id": row["resume_id"],
+                    "name": names.get(row["resume_id"]),
+                    "filename": row["filename"],
+                    "cached": row["cached"],
+                    "duplicate": row["duplicate"]
+                }
+            })
+        elif row["status"] == "failed":
+            outcomes.append({"filename": row["filename"], "error": row["error"]})
+    results = summarize(outcomes)
+    results["job_id"] = str(job.id)
+    return results
+
+
+async def job_events(job_id, interval: float = 1.0) -> AsyncIterator[str]:
+    """
+    Server-sent events with job progress.
+    A "progress" event is sent whenever the counters change and a final
+    "complete" event carries the bulk upload summary.
+    """
+    last = None
+    while True:
+        job = await IngestJob.get_or_none(id=job_id)
+        if job is None:
+            yield f"event: error\ndata: {json.dumps({'detail': 'Job not found'})}\n\n"
+            return
+
+        progress = job_progress(job)
+        if job.status in FINISHED_STATUSES:
+            yield f"event: progress\ndata: {json.dumps(progress)}\n\n"
+            yield f"event: complete\ndata: {json.dumps(await job_results(job))}\n\n"
+            return
+
+        snapshot = (job.status, job.processed)
+        if snapshot != last:
+            last = snapshot
+            yield f"event: progress\ndata: {json.dumps(progress)}\n\n"
+        else:
+            # Comment line keeps proxies from closing an idle stream
+            yield ": keep-alive\n\n"
+        await asyncio.sleep(interval)
@@ -0,0 +1,186 @@
+import re
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from preprocess import normalize_whitespace, strip_headers_footers, split_sections
+
+# Fields found reliably enough by the rules below to skip asking the LLM for them ("fill" mode)
+RELIABLE_FIELDS = ("email", "phone", "graduation_year", "skills")
+# Exact pattern matches, used to fill gaps in the LLM's answer even in "full" mode
+EXACT_FIELDS = ("email", "phone")
+
+# Skills dictionary (canonical spelling). Ambiguous short names ("Go", "R", "C") are left out.
+SKILLS = [
+    "Python", "Java", "JavaScript", "TypeScript", "C++", "C#", "Ruby", "PHP", "Swift", "Kotlin",
+    "Scala", "Rust", "Golang", "Perl", "MATLAB", "Objective-C", "Dart", "Elixir", "Haskell", "Bash",
+    "PowerShell", "SQL", "NoSQL", "PostgreSQL", "MySQL", "SQLite", "Oracle", "SQL Server", "MongoDB",
+    "Redis", "Cassandra", "Elasticsearch", "DynamoDB", "Snowflake", "BigQuery", "Redshift",
+    "HTML", "CSS", "Sass", "React", "Angular", "Vue.js", "Next.js", "Node.js", "Express", "jQuery",
+    "Redux", "GraphQL", "REST", "gRPC", "Django", "Flask", "FastAPI", "Spring", "Spring Boot",
+    "Ruby on Rails", ".NET", "ASP.NET", "Laravel", "Symfony",
+    "AWS", "Azure", "GCP", "Google Cloud", "Docker", "Kubernetes", "Terraform", "Ansible", "Jenkins",
+    "GitHub Actions", "GitLab CI", "CI/CD", "Linux", "Unix", "Git", "Nginx", "Kafka", "RabbitMQ",
+    "Spark", "Hadoop", "Airflow", "dbt", "Pandas", "NumPy", "SciPy", "scikit-learn", "TensorFlow",
+    "PyTorch", "Keras", "OpenCV", "NLP", "Machine Learning", "Deep Learning", "Computer Vision",
+    "Data Analysis", "Data Science", "Statistics", "Tableau", "Power BI", "Looker", "Excel",
+    "Android", "iOS", "Flutter", "React Native", "Unity", "Microservices", "Agile", "Scrum",
+    "Kanban", "Jira", "Confluence", "Figma", "Sketch", "Photoshop", "Illustrator", "SEO",
+    "Salesforce", "SAP", "Selenium", "Cypress", "Jest", "pytest", "JUnit", "TDD",
+    "Project Management", "Product Management", "Stakeholder Management", "Leadership",
+    "Communication", "Public Speaking", "Negotiation", "Budgeting", "Accounting", "Financial Analysis",
+    "Marketing", "Digital Marketing", "Sales", "Customer Service", "Recruiting", "AutoCAD",
+    "SolidWorks", "Six Sigma", "Lean",
+]
+# Acronyms (SQL, REST, SAP) must match in capitals; they are ordinary words otherwise
+_SKILL_PATTERNS = [
+    (skill, re.compile(r"(?<![\w+#.])" + re.escape(skill) + r"(?![\w+#])", 0 if skill.isupper() else re.I))
+    for skill in SKILLS
+]
+
+_EMAIL = re.compile(r"[\w.+-]+@[\w-]+(?:\.[\w-]+)+")
+_PHONE = re.compile(r"(?<![\w+])\+?\(?\d[\d ().-]{6,}\d(?!\w)")
+_YEAR = re.compile(r"\b(?:19|20)\d{2}\b")
+_PRESENT = r"present|current|now|ongoing|till date|to date"
+_MONTH = r"(?:[A-Za-z]{3,9}\.?\s+|\d{1,2}/)?"
+_RANGE = re.compile(
+    rf"{_MONTH}((?:19|20)\d{{2}})\s*(?:-|–|—|to)\s*{_MONTH}((?:19|20)\d{{2}}|{_PRESENT})", re.I
+)
+# "Title - Company", "Title at Company", "Title | Company", "Title, Company"
+_JOB_SEPARATOR = re.compile(r"\s+(?:-|–|—|\||at|@)\s+|,\s+")
+_NAME = re.compile(r"^[A-Z][A-Za-z'.-]+(?: [A-Z][A-Za-z'.-]*){1,3}$")
+# Highest level first
+_DEGREES = [
+    re.compile(r"\b(ph\.?\s?d|doctor(ate)? of|d\.?phil)\b", re.I),
+    re.compile(r"\b(master'?s?|m\.?sc|m\.?s\.|mba|m\.?tech|m\.?eng|m\.?a\.)\b", re.I),
+    re.compile(r"\b(bachelor'?s?|b\.?sc|b\.?s\.|b\.?a\.|b\.?tech|b\.?eng|b\.?e\.)\b", re.I),
+    re.compile(r"\b(associate'?s? degree|diploma|high school)\b", re.I),
+]
+_SCHOOL = re.compile(r"\b(university|college|institute|polytechnic|school of)\b", re.I)
+
+
+def _section_text(sections: List[Tuple[str, str]], *names: str) -> str:
+    return "\n".join(content for name, content in sections if name in names)
+
+
+def _phone(text: str) -> Optional[str]:
+    for match in _PHONE.finditer(text):
+        candidate = match.group(0).strip()
+        digits = sum(char.isdigit() for char in candidate)
+        # Year ranges and dates have fewer digits or no separators a phone number would have
+        if 10 <= digits <= 15 or (candidate.startswith("+") and digits >= 8):
+            if not _RANGE.fullmatch(candidate):
+                return candidate
+    return None
+
+
+def _name(header: str) -> Optional[str]:
+    """First line of the header that looks like a person's name (falls back to the first short line)"""
+    lines = [line.strip() for line in header.split("\n") if line.strip()]
+    for line in lines[:5]:
+        if _NAME.match(line.title() if line.isupper() else line):
+            return line.title() if line.isupper() else line
+    for line in lines[:3]:
+        if len(line) <= 60 and "@" not in line and not any(char.isdigit() for char in line):
+            return line
+    return None
+
+
+def _job(line: str, date_range: str) -> Dict[str, str]:
+    """Title and company from a job line, e.g. "Engineer - Acme (2020 - Present)" """
+    rest = line.replace(date_range, " ").strip(" ,|-–—()")
+    parts = [part.strip(" ,|-–—()") for part in _JOB_SEPARATOR.split(rest, 1)]
+    if len(parts) != 2 or not all(parts):
+        return {}
+    return {"last_job_title": parts[0][:255], "last_job_company": parts[1][:255]}
+
+
+def _experience(text: str) -> Dict[str, Any]:
+    """Total years covered by the date ranges of a work experience section and the latest job"""
+    current_year = datetime.now().year
+    intervals = []
+    latest = None
+    for line in text.split("\n"):
+        for match in _RANGE.finditer(line):
+            start = int(match.group(1))
+            end = current_year if not match.group(2)[:1].isdigit() else int(match.group(2))
+            if end < start:
+                continue
+            intervals.append((start, end))
+            if latest is None or (end, start) > latest[0]:
+                latest = ((end, start), match.group(0).strip(), line)
+    if not intervals:
+        return {}
+    # Overlapping jobs count once
+    total = 0
+    merged_start, merged_end = None, None
+    for start, end in sorted(intervals):
+        if merged_end is None or start > merged_end:
+            if merged_end is not None:
+                total += merged_end - merged_start
+            merged_start, merged_end = start, end
+        else:
+            merged_end = max(merged_end, end)
+    total += merged_end - merged_start
+    return {"total_years_experience": total, "last_job_duration": latest[1][:100], **_job(latest[2], latest[1])}
+
+
+def _education(text: str) -> Dict[str, Any]:
+    fields: Dict[str, Any] = {}
+    current_year = datetime.now().year
+    years = [int(year) for year in _YEAR.findall(text) if 1950 <= int(year) <= current_year + 6]
+    if years:
+        fields["graduation_year"] = str(max(years))
+    lines = [line.strip() for line in text.split("\n") if line.strip()]
+    for pattern in _DEGREES:
+        degree = next((line for line in lines if pattern.search(line)), None)
+        if degree:
+            fields["highest_degree"] = _YEAR.sub("", degree).strip(" ,|-–—()")[:255]
+            break
+    school = next((line for line in lines if _SCHOOL.search(line)), None)
+    if school:
+        fields["university"] = _YEAR.sub("", school).strip(" ,|-–—()")[:255]
+    return fields
+
+
+def skills(text: str) -> List[str]:
+    """Dictionary skills mentioned in the text, in order of first mention"""
+    found = []
+    for skill, pattern in _SKILL_PATTERNS:
+        match = pattern.search(text)
+        if match:
+            found.append((match.start(), skill))
+    return [skill for _, skill in sorted(found)]
+
+
+def extract(text: str) -> Dict[str, Any]:
+    """
+    Fields found in resume text with regexes and the skills dictionary.
+    Only fields that were found are returned; see RELIABLE_FIELDS for those
+    trusted over asking the LLM.
+    """
+    sections = split_sections(normalize_whitespace(strip_headers_footers(normalize_whitespace(text))))
+    # References and declarations carry other people's contact details
+    own_text = "\n".join(
+        content for name, content in sections if name not in ("references", "declaration")
+    )
+    header = _section_text(sections, "header")
+    fields: Dict[str, Any] = {}
+
+    email = _EMAIL.search(header) or _EMAIL.search(own_text)
+    if email:
+        fields["email"] = email.group(0)
+    phone = _phone(header) or _phone(own_text)
+    if phone:
+        fields["phone"] = phone[:50]
+    name = _name(header)
+    if name:
+        fields["name"] = name[:255]
+
+    fields.update(_education(_section_text(sections, "education")))
+
+    fields.update(_experience(_section_text(sections, "experience")))
+
+    found_skills = skills(_section_text(sections, "skills") or own_text)
+    if found_skills:
+        fields["skills"] = ", ".join(found_skills)
+    return fields
@@ -1,29 +1,58 @@
-from fastapi import FastAPI, File, UploadFile, HTTPException
-from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse, StreamingResponse
-from fastapi.staticfiles import StaticFiles
-from typing import List
+# First, so the startup report measures the imports below
+import startup
+
+import asyncio
+import hashlib
 import os
-from dotenv import load_dotenv
-from tortoise import Tortoise
-from tortoise.transactions import in_transaction
 from contextlib import asynccontextmanager
-import uvicorn
-import io
-import pandas as pd
+from typing import List, Optional
+from uuid import UUID
+
+import orjson
+from dotenv import load_dotenv
+from fastapi import FastAPI, HTTPException, Query, Request
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, StreamingResponse, PlainTextResponse, Response
+from fastapi.staticfiles import StaticFiles
+from pydantic import BaseModel, Field
 
-from models import Resume
-from services import ResumeParserService
-from database import init_db, close_db
+import config
+import metrics
+from database import init_db, close_db, pool_stats
+from export import build_excel_export, stream_csv, stream_ndjson
+from jobs import JobQueue, job_status, job_events
+from models import IngestJob, Resume
+from pipeline import build_pipeline
+from queries import query_resumes, InvalidCursor, parse_fields, list_stats, list_resumes, InvalidFields
+from search import ResumeSearch
+from uploads import receive_uploads, UploadRejected, OPENAPI_FILES_BODY
 
 load_dotenv()
 
+async def warm_up():
+    """Preload the WARMUP module groups in the background after startup"""
+    await asyncio.sleep(config.WARMUP_DELAY_SECONDS)
+    if "documents" in config.WARMUP:
+        extraction_executor.warm_up(startup.HEAVY_MODULES["documents"])
+    groups = [group for group in config.WARMUP if group != "documents"]
+    failed = await asyncio.to_thread(startup.warm_up, groups)
+    if "matching" in config.WARMUP and "matching" not in failed:
+        await get_match_index()
+    print(f"Warm-up of {', '.join(config.WARMUP)} finished in {startup.mark('warmed_up'):.2f}s after start")
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
     await init_db()
+    job_queue.start()
+    print(f"Ready in {startup.mark('ready'):.2f}s (app imported in {startup.report()['phases']['app_imported']:.2f}s)")
+    warm_up_task = asyncio.create_task(warm_up()) if config.WARMUP else None
     yield
     # Shutdown
+    if warm_up_task:
+        warm_up_task.cancel()
+    await job_queue.stop()
+    extraction_executor.shutdown()
     await close_db()
 
 app = FastAPI(
@@ -42,22 +71,93 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Initialize parser service
-parser_service = ResumeParserService(
-    groq_api_key=os.getenv("GROQ_API_KEY"),
-    model_name="llama-3.3-70b-versatile"
+# Bulk ingestion pipeline (bounded LLM concurrency + extraction workers),
+# shared across all requests
+ingest_pipeline = build_pipeline()
+parser_service = ingest_pipeline.parser_service
+extraction_executor = ingest_pipeline.extractor
+
+# Database-backed queue so bulk uploads return immediately
+job_queue = JobQueue(
+    ingest_pipeline,
+    workers=config.JOB_WORKERS,
+    file_concurrency=config.JOB_FILE_CONCURRENCY,
+    lease_seconds=config.JOB_LEASE_SECONDS,
+    spool_dir=config.UPLOAD_SPOOL_DIR
 )
 
+# Ranked full-text search over the extracted resume text
+resume_search = ResumeSearch()
+
+# In-memory TF-IDF index for ranking resumes against job descriptions,
+# created on the first match so NumPy is only imported by processes that rank
+match_index = None
+
+async def get_match_index():
+    global match_index
+    if match_index is None:
+        matching = await startup.load_async("matching")
+        if match_index is None:
+            match_index = matching.MatchIndex(hash_bits=config.MATCH_HASH_BITS, max_terms=config.MATCH_MAX_TERMS)
+    return match_index
+
+def _pool_metric(key: str):
+    """Scrape-time reader of one connection pool statistic"""
+    def collect():
+        pool = pool_stats()["pool"]
+        return [({}, pool[key])] if pool else []
+    return collect
+
+for key, help, kind in (
+    ("size", "Open database connections", "gauge"),
+    ("in_use", "Database connections checked out", "gauge"),
+    ("max_size", "Database connection pool limit", "gauge"),
+    ("acquired_total", "Database connections handed out", "counter"),
+    ("acquire_wait_seconds_total", "Time spent waiting for a database connection", "counter"),
+    ("pings_total", "Idle database connections pinged before use", "counter"),
+    ("reconnects_total", "Database connection attempts retried", "counter"),
+):
+    metrics.REGISTRY.callback(f"db_pool_{key}", help, _pool_metric(key), type=kind)
+
+class MatchRequest(BaseModel):
+    job_description: str = Field(..., min_length=1)
+    top_k: int = Field(20, ge=1, le=500)
+    # Required skills; extracted from the job description when omitted
+    skills: Optional[List[str]] = None
+    skill_weight: float = Field(0.3, ge=0, le=1)
+
 @app.get("/")
 async def root():
     return {"message": "Resume Parser API is running"}
 
+@app.get("/metrics", response_class=PlainTextResponse)
+async def prometheus_metrics():
+    """
+    Stage timing histograms, Groq usage and pool metrics in the Prometheus text format
+    Values are per worker process
+    """
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+@app.get("/metrics/db")
+async def database_metrics():
+    """
+    Database connection pool size and utilization
+    """
+    return pool_stats()
+
+@app.get("/metrics/startup")
+async def startup_metrics():
+    """
+    Seconds from process start to each startup phase, and the import time of
+    each lazily loaded module (on first use or by the warm-up)
+    """
+    return startup.report()
+
 @app.get("/test/groq")
 async def test_groq():
     """Test if Groq API is working"""
     try:
-        response = parser_service.client.chat.completions.create(
-            model="llama-3.3-70b-versatile",
+        response = await parser_service.complete(
             messages=[
                 {"role": "user", "content": "Say 'Hello, Groq is working!'"}
             ],
@@ -73,87 +173,176 @@ async def test_groq():
             "message": str(e)
         }
 
-@app.post("/upload/bulk")
-async def upload_bulk_resumes(files: List[UploadFile] = File(...)):
+@app.post("/upload/bulk", openapi_extra=OPENAPI_FILES_BODY)
+async def upload_bulk_resumes(
+    request: Request,
+    dedupe: Optional[bool] = None,
+    wait: bool = False,
+    timings: bool = False
+):
     """
     Upload multiple resume files (PDF, DOCX) for bulk processing
-    Uses transactions to ensure data integrity
+    The files are queued as a job and its ID is returned immediately;
+    poll /jobs/{job_id} or stream /jobs/{job_id}/events for progress.
+    With wait=true the files are processed within the request instead.
+    Re-uploaded files are served from the parse cache; with dedupe the existing row is reused
+    With wait=true and timings=true the response includes a per-file stage timing breakdown
+    Files are streamed to memory or disk as they arrive; uploads over the size limits get 413
     """
-    if not files:
-        raise HTTPException(status_code=400, detail="No files uploaded")
-    
-    # Validate file types
-    allowed_extensions = {'.pdf', '.docx', '.doc'}
-    results = {
-        "total": len(files),
-        "successful": 0,
-        "failed": 0,
-        "errors": [],
-        "resumes": []
-    }
+    try:
+        files = await receive_uploads(
+            request,
+            max_file_bytes=config.UPLOAD_MAX_FILE_BYTES,
+            max_request_bytes=config.UPLOAD_MAX_REQUEST_BYTES,
+            max_files=config.UPLOAD_MAX_FILES,
+            spool_threshold=config.UPLOAD_SPOOL_THRESHOLD_BYTES,
+            spool_dir=config.UPLOAD_SPOOL_DIR
+        )
+    except UploadRejected as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
     
-    for file in files:
-        file_ext = os.path.splitext(file.filename)[1].lower()
-        if file_ext not in allowed_extensions:
-            results["failed"] += 1
-            results["errors"].append({
-                "filename": file.filename,
-                "error": f"Unsupported file type: {file_ext}"
-            })
-            continue
+    try:
+        if not files:
+            raise HTTPException(status_code=400, detail="No files uploaded")
         
-        # Use transaction for each file to ensure atomicity
-        # If anything fails, the database insert is rolled back
-        connection = Tortoise.get_connection("default")
+        if dedupe is None:
+            dedupe = config.DEDUPE_RESUMES
         
-        try:
-            # Start transaction with proper connection
-            async with in_transaction(connection_name="default") as conn:
-                # Read file content
-                content = await file.read()
-                print(f"Processing file: {file.filename}, size: {len(content)} bytes")
-                
-                # Parse resume using AI
-                parsed_data = await parser_service.parse_resume(content, file_ext)
-                print(f"Parsed data for {file.filename}: {parsed_data.get('name', 'NO NAME')}")
-                
-                # Save to database (within transaction)
-                # If this fails, transaction rolls back automatically
-                resume = await Resume.create(**parsed_data, using_db=conn)
-                print(f"Successfully saved resume ID: {resume.id}")
-                
-                results["successful"] += 1
-                results["resumes"].append({
-                    "id": resume.id,
-                    "name": resume.name,
-                    "filename": file.filename
-                })
-            # Transaction commits here if everything succeeded
-            
-        except Exception as e:
-            # Transaction automatically rolled back on exception
-            print(f"ERROR processing {file.filename}: {str(e)}")
-            import traceback
-            traceback.print_exc()
-            results["failed"] += 1
-            results["errors"].append({
-                "filename": file.filename,
-                "error": str(e)
-            })
-    
-    return JSONResponse(content=results, status_code=200)
+        if wait:
+            results = await ingest_pipeline.run(files, dedupe=dedupe, include_timings=timings)
+            return JSONResponse(content=results, status_code=200)
+        
+        job = await job_queue.enqueue(files, dedupe=dedupe)
+    finally:
+        # Spooled files are only needed until processed or stored with the job
+        for file in files:
+            file.close()
+    return JSONResponse(
+        content={
+            "job_id": str(job.id),
+            "status": job.status,
+            "total": job.total,
+            "status_url": f"/jobs/{job.id}",
+            "events_url": f"/jobs/{job.id}/events"
+        },
+        status_code=202
+    )
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: UUID):
+    """
+    Get the progress, per-file state and throughput of a bulk upload job
+    """
+    job = await IngestJob.get_or_none(id=job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return await job_status(job)
+
+@app.get("/jobs/{job_id}/events")
+async def stream_job_events(job_id: UUID):
+    """
+    Server-sent events stream with live job progress
+    """
+    if not await IngestJob.exists(id=job_id):
+        raise HTTPException(status_code=404, detail="Job not found")
+    return StreamingResponse(
+        job_events(job_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 @app.get("/resumes")
-async def get_all_resumes(skip: int = 0, limit: int = 100):
+async def get_all_resumes(
+    request: Request,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=0),
+    fields: Optional[str] = None
+):
     """
-    Get all parsed resumes from database
+    Get parsed resumes from database, ordered by id
+    fields: comma-separated fields to return (e.g. "id,name,email,last_job"), all by default
+    Responses carry an ETag; send it back as If-None-Match to get a 304 while nothing changed
     """
-    resumes = await Resume.all().offset(skip).limit(limit)
+    try:
+        selected = parse_fields(fields)
+    except InvalidFields as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    # Inserts and updates move the latest updated_at, deletes change the total
+    total, latest = await list_stats()
+    version = f"{total}:{latest.isoformat() if latest else ''}:{skip}:{limit}:{','.join(selected)}"
+    etag = f'W/"{hashlib.sha1(version.encode("utf-8")).hexdigest()[:20]}"'
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if_none_match = request.headers.get("if-none-match", "")
+    if etag in [tag.strip() for tag in if_none_match.split(",")] or if_none_match.strip() == "*":
+        return Response(status_code=304, headers=headers)
+
+    resumes = await list_resumes(selected, skip, limit)
+    return Response(
+        orjson.dumps({"count": len(resumes), "total": total, "resumes": resumes}),
+        media_type="application/json",
+        headers=headers
+    )
+
+@app.get("/resumes/query")
+async def search_resumes(
+    min_experience: Optional[float] = None,
+    max_experience: Optional[float] = None,
+    degree: Optional[str] = None,
+    university: Optional[str] = None,
+    company: Optional[str] = None,
+    skills: Optional[List[str]] = Query(None),
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = None
+):
+    """
+    Filter resumes by experience range, degree, university, last company and skills
+    Results are newest first; pass next_cursor back as cursor to get the next page
+    """
+    try:
+        resumes, next_cursor = await query_resumes(
+            min_experience=min_experience,
+            max_experience=max_experience,
+            degree=degree,
+            university=university,
+            company=company,
+            skills=skills,
+            limit=limit,
+            cursor=cursor
+        )
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
     return {
         "count": len(resumes),
-        "resumes": [await resume.to_dict() for resume in resumes]
+        "resumes": [await resume.to_dict() for resume in resumes],
+        "next_cursor": next_cursor
     }
 
+@app.get("/search")
+async def search_resume_text(
+    q: str = Query(..., min_length=1),
+    limit: int = Query(20, ge=1, le=100)
+):
+    """
+    Full-text search over the extracted resume text, best matches first
+    Supports quoted phrases, OR and -exclusions on Postgres
+    """
+    return await resume_search.search(q, limit)
+
+@app.post("/match")
+async def match_resumes(request: MatchRequest):
+    """
+    Rank stored resumes against a job description without calling the LLM
+    Scores combine TF-IDF cosine similarity with overlap on the resume skills
+    """
+    index = await get_match_index()
+    return await index.match(
+        request.job_description,
+        top_k=request.top_k,
+        skills=request.skills,
+        skill_weight=request.skill_weight
+    )
+
 @app.get("/resumes/{resume_id}")
 async def get_resume(resume_id: int):
     """
@@ -188,55 +377,62 @@ async def delete_all_resumes():
 async def export_to_excel():
     """
     Export all resumes to Excel format
+    Rows are paged from the database and written with a write-only workbook
     """
-    try:
-        # Get all resumes
-        resumes = await Resume.all()
-        
-        if not resumes:
-            raise HTTPException(status_code=404, detail="No resumes found to export")
-        
-        # Convert to list of dictionaries
-        data = []
-        for resume in resumes:
-            data.append({
-                "ID": resume.id,
-                "Name": resume.name,
-                "Email": resume.email,
-                "Phone": resume.phone,
-                "Total Experience (Years)": resume.total_years_experience,
-                "Last Job Title": resume.last_job_title,
-                "Last Job Company": resume.last_job_company,
-                "Last Job Duration": resume.last_job_duration,
-                "Highest Degree": resume.highest_degree,
-                "University": resume.university,
-                "Graduation Year": resume.graduation_year,
-                "Skills": resume.skills,
-                "Special Highlights": resume.special_highlights,
-                "Created At": resume.created_at.strftime("%Y-%m-%d %H:%M:%S") if resume.created_at else None
-            })
-        
-        # Create DataFrame
-        df = pd.DataFrame(data)
-        
-        # Create Excel file in memory
-        output = io.BytesIO()
-        with pd.ExcelWriter(output, engine='openpyxl') as writer:
-            df.to_excel(writer, index=False, sheet_name='Resumes')
-        
-        output.seek(0)
-        
-        # Return as downloadable file
-        return StreamingResponse(
-            output,
-            media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-            headers={
-                "Content-Disposition": "attachment; filename=resumes_export.xlsx"
-            }
-        )
+    if not await Resume.exists():
+        raise HTTPException(status_code=404, detail="No resumes found to export")
     
+    try:
+        content = await build_excel_export(config.EXPORT_CHUNK_SIZE)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error exporting to Excel: {str(e)}")
+    
+    # Return as downloadable file
+    return StreamingResponse(
+        content,
+        media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        headers={
+            "Content-Disposition": "attachment; filename=resumes_export.xlsx"
+        }
+    )
+
+@app.get("/export/csv")
+async def export_to_csv():
+    """
+    Stream all resumes as CSV
+    """
+    if not await Resume.exists():
+        raise HTTPException(status_code=404, detail="No resumes found to export")
+    
+    return StreamingResponse(
+        stream_csv(config.EXPORT_CHUNK_SIZE),
+        media_type="text/csv",
+        headers={
+            "Content-Disposition": "attachment; filename=resumes_export.csv"
+        }
+    )
+
+@app.get("/export/ndjson")
+async def export_to_ndjson():
+    """
+    Stream all resumes as newline-delimited JSON
+    """
+    if not await Resume.exists():
+        raise HTTPException(status_code=404, detail="No resumes found to export")
+    
+    return StreamingResponse(
+        stream_ndjson(config.EXPORT_CHUNK_SIZE),
+        media_type="application/x-ndjson",
+        headers={
+            "Content-Disposition": "attachment; filename=resumes_export.ndjson"
+        }
+    )
+
+startup.mark("app_imported")
 
 if __name__ == "__main__":
-    uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
+    import uvicorn
+
+    # WEB_CONCURRENCY > 1 starts several worker processes; use gunicorn.conf.py
+    # for production serving with request-based worker recycling
+    uvicorn.run("main:app", host="0.0.0.0", port=8000, workers=config.WEB_CONCURRENCY)
\ No newline at end of file
@@ -0,0 +1,336 @@
+import asyncio
+import zlib
+from array import array
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import numpy as np
+from tortoise.expressions import Q
+
+from models import Resume, ResumeSkill, ResumeText
+from search import tokenize
+
+# Resumes created this long before the newest indexed one are re-checked on
+# refresh, so rows whose transaction committed out of order aren't missed
+SETTLE_WINDOW = timedelta(seconds=120)
+
+# IDF weights and norms are recomputed once the number of indexed resumes has
+# grown by this fraction since they were last computed
+IDF_REFRESH_GROWTH = 0.1
+
+# Longest skill name (in words) looked for in a job description
+MAX_SKILL_WORDS = 4
+
+# Sublinear term frequency, indexed by raw count (counts are capped at 255)
+_TF_WEIGHT = np.concatenate(([0.0], 1.0 + np.log(np.arange(1, 256)))).astype(np.float32)
+
+
+def _terms(text: str) -> List[str]:
+    """Word unigrams and bigrams of a text"""
+    tokens = tokenize(text)
+    return tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+
+
+def _skill_candidates(text: str) -> Set[str]:
+    """All 1..MAX_SKILL_WORDS word sequences of a text, in normalized skill form"""
+    tokens = tokenize(text, drop_stopwords=False)
+    candidates = set()
+    for size in range(1, MAX_SKILL_WORDS + 1):
+        for start in range(len(tokens) - size + 1):
+            candidates.add(" ".join(tokens[start:start + size]))
+    return candidates
+
+
+def _resume_document(row: Dict[str, Any]) -> str:
+    """Text vectorized for a resume: extracted text plus the parsed fields"""
+    parts = [
+        row.get("last_job_title"), row.get("highest_degree"),
+        row.get("skills"), row.get("special_highlights"), row.get("content")
+    ]
+    return "\n".join(part for part in parts if part)
+
+
+class MatchIndex:
+    """
+    Hashed TF-IDF vectors of all stored resumes, held in NumPy arrays.
+
+    Terms (unigrams and bigrams) are hashed into 2**hash_bits dimensions, so
+    no vocabulary has to be kept. Vectors live in a column-compressed matrix
+    (per-term posting arrays) so a query only touches the columns of its own
+    terms. New resumes go to a small append-only delta that is merged into the
+    main matrix once it grows past a fraction of it. IDF weights and vector
+    norms are recomputed on merge, after the first full load and whenever the
+    corpus has grown by IDF_REFRESH_GROWTH since they were last computed.
+
+    The index is refreshed incrementally before each match by loading resumes
+    created since the last refresh. Deleted resumes are dropped lazily.
+    """
+
+    def __init__(self, hash_bits: int = 18, max_terms: int = 256, chunk_size: int = 1000):
+        self.dims = 1 << hash_bits
+        self.max_terms = max_terms
+        self.chunk_size = chunk_size
+
+        # Row -> resume id, and whether the row's resume still exists
+        self.resume_ids = np.zeros(0, dtype=np.int64)
+        self.alive = np.zeros(0, dtype=bool)
+        self._rows_by_id: Dict[int, int] = {}
+
+        # Main matrix, column-compressed: rows/counts of term t are in indptr[t]:indptr[t + 1]
+        self.indptr = np.zeros(self.dims + 1, dtype=np.int64)
+        self.rows = np.zeros(0, dtype=np.int32)
+        self.counts = np.zeros(0, dtype=np.uint8)
+
+        # Unmerged (row, term, count) triplets
+        self._delta_rows: List[np.ndarray] = []
+        self._delta_terms: List[np.ndarray] = []
+        self._delta_counts: List[np.ndarray] = []
+        self._delta_size = 0
+
+        self.doc_freq = np.zeros(self.dims, dtype=np.int32)
+        self.idf = np.ones(self.dims, dtype=np.float32)
+        self.norms = np.zeros(0, dtype=np.float32)
+        # Number of rows when idf was last computed
+        self._idf_docs = 0
+
+        # Normalized skill name -> rows of the resumes listing it
+        self.skill_rows: Dict[str, array] = {}
+
+        # (created_at, id) of the newest resume seen
+        self._cursor: Optional[Tuple[datetime, int]] = None
+        self._lock = asyncio.Lock()
+
+    def __len__(self) -> int:
+        return int(self.alive.sum())
+
+    def _hash_terms(self, terms: List[str], max_terms: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Hashed term ids and their counts (capped at 255)"""
+        counted = Counter(terms)
+        if max_terms and len(counted) > max_terms:
+            counted = dict(counted.most_common(max_terms))
+        if not counted:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+        mask = self.dims - 1
+        ids = np.fromiter(
+            (zlib.crc32(term.encode("utf-8")) & mask for term in counted),
+            dtype=np.int64, count=len(counted)
+        )
+        values = np.fromiter(counted.values(), dtype=np.int64, count=len(counted))
+        # Terms colliding on the same hash share one dimension
+        ids, inverse = np.unique(ids, return_inverse=True)
+        return ids, np.minimum(np.bincount(inverse, weights=values), 255).astype(np.int64)
+
+    def _vectorize(self, docs: List[Tuple[int, str]]) -> List[Tuple[int, np.ndarray, np.ndarray]]:
+        """CPU-bound part of indexing, run off the event loop"""
+        return [(resume_id, *self._hash_terms(_terms(text), self.max_terms)) for resume_id, text in docs]
+
+    def _append(self, vectors: List[Tuple[int, np.ndarray, np.ndarray]], skills: Dict[int, List[str]]):
+        """Add vectorized resumes to the delta"""
+        first_row = len(self.resume_ids)
+        ids = np.array([resume_id for resume_id, _, _ in vectors], dtype=np.int64)
+        self.resume_ids = np.concatenate((self.resume_ids, ids))
+        self.alive = np.concatenate((self.alive, np.ones(len(ids), dtype=bool)))
+
+        norms = np.zeros(len(vectors), dtype=np.float32)
+        for offset, (resume_id, terms, counts) in enumerate(vectors):
+            row = first_row + offset
+            self._rows_by_id[resume_id] = row
+            self._delta_rows.append(np.full(len(terms), row, dtype=np.int32))
+            self._delta_terms.append(terms.astype(np.int32))
+            self._delta_counts.append(counts.astype(np.uint8))
+            self._delta_size += len(terms)
+            self.doc_freq[terms] += 1
+            weights = _TF_WEIGHT[counts] * self.idf[terms]
+            norms[offset] = np.sqrt(np.dot(weights, weights))
+            for name in skills.get(resume_id, []):
+                self.skill_rows.setdefault(name, array("i")).append(row)
+        self.norms = np.concatenate((self.norms, norms))
+
+    def _merge(self):
+        """Fold the delta into the main matrix and recompute IDF and norms"""
+        if self._delta_size:
+            main_terms = np.repeat(np.arange(self.dims, dtype=np.int32), np.diff(self.indptr))
+            terms = np.concatenate([main_terms] + self._delta_terms)
+            rows = np.concatenate([self.rows] + self._delta_rows)
+            counts = np.concatenate([self.counts] + self._delta_counts)
+            order = np.argsort(terms, kind="stable")
+            terms, self.rows, self.counts = terms[order], rows[order], counts[order]
+            self.indptr = np.zeros(self.dims + 1, dtype=np.int64)
+            np.cumsum(np.bincount(terms, minlength=self.dims), out=self.indptr[1:])
+            self._delta_rows, self._delta_terms, self._delta_counts = [], [], []
+            self._delta_size = 0
+        self._reweight()
+
+    def _reweight(self):
+        """Recompute IDF from the current document frequencies, and the norms of all rows (main and delta)"""
+        n_docs = len(self.resume_ids)
+        self.idf = (np.log((1 + n_docs) / (1 + self.doc_freq)) + 1).astype(np.float32)
+        main_terms = np.repeat(np.arange(self.dims, dtype=np.int32), np.diff(self.indptr))
+        terms = np.concatenate([main_terms] + self._delta_terms)
+        rows = np.concatenate([self.rows] + self._delta_rows)
+        counts = np.concatenate([self.counts] + self._delta_counts)
+        weights = _TF_WEIGHT[counts] * self.idf[terms]
+        self.norms = np.sqrt(np.bincount(rows, weights=weights * weights, minlength=n_docs)).astype(np.float32)
+        self._idf_docs = n_docs
+
+    def _remove(self, resume_id: int):
+        """Stop returning a deleted resume"""
+        row = self._rows_by_id.pop(resume_id, None)
+        if row is not None:
+            self.alive[row] = False
+
+    async def _index(self, ids: List[int]):
+        """Load and index the given resumes"""
+        if not ids:
+            return
+        rows = await Resume.filter(id__in=ids).values(
+            "id", "last_job_title", "highest_degree", "skills", "special_highlights"
+        )
+        texts = dict(await ResumeText.filter(resume_id__in=ids).values_list("resume_id", "content"))
+        skills: Dict[int, List[str]] = {}
+        for resume_id, name in await ResumeSkill.filter(resume_id__in=ids).values_list("resume_id", "name"):
+            skills.setdefault(resume_id, []).append(name)
+
+        docs = [(row["id"], _resume_document({**row, "content": texts.get(row["id"])})) for row in rows]
+        vectors = await asyncio.to_thread(self._vectorize, docs)
+        self._append(vectors, skills)
+
+    async def refresh(self):
+        """Index resumes created since the last refresh"""
+        async with self._lock:
+            first_load = self._cursor is None
+            if not first_load:
+                # Rows that committed after newer ones were already indexed
+                recent = await Resume.filter(
+                    created_at__gte=self._cursor[0] - SETTLE_WINDOW
+                ).values_list("id", "created_at")
+                await self._index([
+                    resume_id for resume_id, created_at in recent
+                    if resume_id not in self._rows_by_id and (created_at, resume_id) <= self._cursor
+                ])
+
+            # Keyset pagination on (created_at, id) past the newest indexed resume
+            while True:
+                query = Resume.all()
+                if self._cursor is not None:
+                    created_at, resume_id = self._cursor
+                    query = query.filter(Q(created_at__gt=created_at) | Q(created_at=created_at, id__gt=resume_id))
+                page = await query.order_by("created_at", "id").limit(self.chunk_size).values("id", "created_at")
+                if not page:
+                    break
+                await self._index([row["id"] for row in page if row["id"] not in self._rows_by_id])
+                self._cursor = (page[-1]["created_at"], page[-1]["id"])
+
+            # Queries scan the whole delta, so keep it small relative to the main matrix
+            if first_load or self._delta_size > max(len(self.rows) // 4, 50_000):
+                self._merge()
+            elif len(self.resume_ids) > self._idf_docs * (1 + IDF_REFRESH_GROWTH):
+                # Document frequencies moved on since idf was computed
+                self._reweight()
+
+    def _similarity(self, text: str) -> np.ndarray:
+        """Cosine similarity of every indexed resume to a text"""
+        scores = np.zeros(len(self.resume_ids), dtype=np.float64)
+        terms, counts = self._hash_terms(_terms(text))
+        if not len(terms):
+            return scores
+        weights = _TF_WEIGHT[counts] * self.idf[terms]
+        weights /= np.sqrt(np.dot(weights, weights))
+
+        # Main matrix: gather the posting arrays of the query terms only
+        starts, ends = self.indptr[terms], self.indptr[terms + 1]
+        lengths = ends - starts
+        if lengths.sum():
+            positions = np.concatenate([np.arange(s, e) for s, e in zip(starts, ends) if e > s])
+            term_weights = np.repeat(weights * self.idf[terms], lengths)
+            scores += np.bincount(
+                self.rows[positions], weights=term_weights * _TF_WEIGHT[self.counts[positions]],
+                minlength=len(scores)
+            )
+
+        # Delta: small, scanned with a dense lookup of the query weights
+        if self._delta_size:
+            dense = np.zeros(self.dims, dtype=np.float32)
+            dense[terms] = weights * self.idf[terms]
+            delta_terms = np.concatenate(self._delta_terms)
+            scores += np.bincount(
+                np.concatenate(self._delta_rows),
+                weights=dense[delta_terms] * _TF_WEIGHT[np.concatenate(self._delta_counts)],
+                minlength=len(scores)
+            )
+
+        norms = self.norms
+        return np.divide(scores, norms, out=np.zeros_like(scores), where=norms > 0)
+
+    def _skill_overlap(self, skills: List[str]) -> np.ndarray:
+        """Share of the wanted skills each indexed resume lists"""
+        matched = np.zeros(len(self.resume_ids), dtype=np.float64)
+        for name in skills:
+            rows = self.skill_rows.get(name)
+            if rows:
+                matched[np.frombuffer(rows, dtype=np.int32)] += 1
+        return matched / len(skills) if skills else matched
+
+    def job_skills(self, job_description: str) -> List[str]:
+        """Known skill names mentioned in a job description"""
+        return sorted(_skill_candidates(job_description) & self.skill_rows.keys())
+
+    async def match(
+        self,
+        job_description: str,
+        top_k: int = 20,
+        skills: Optional[List[str]] = None,
+        skill_weight: float = 0.3,
+    ) -> Dict[str, Any]:
+        """
+        Rank stored resumes against a job description.
+        score = (1 - skill_weight) * cosine similarity + skill_weight * skill overlap;
+        wanted skills are taken from the job description unless given explicitly.
+        """
+        await self.refresh()
+        wanted = Resume.normalize_skills(",".join(skills)) if skills else self.job_skills(job_description)
+
+        similarity = self._similarity(job_description)
+        overlap = self._skill_overlap(wanted)
+        weight = skill_weight if wanted else 0.0
+        scores = (1 - weight) * similarity + weight * overlap
+
+        while True:
+            candidates = np.flatnonzero(self.alive & (scores > 0))
+            if len(candidates) > top_k:
+                candidates = candidates[np.argpartition(-scores[candidates], top_k - 1)[:top_k]]
+            candidates = candidates[np.argsort(-scores[candidates], kind="stable")]
+
+            ids = [int(resume_id) for resume_id in self.resume_ids[candidates]]
+            resumes = {
+                row["id"]: row
+                for row in await Resume.filter(id__in=ids).values(
+                    "id", "name", "email", "last_job_title", "last_job_company", "total_years_experience", "skills"
+                )
+            } if ids else {}
+            missing = [resume_id for resume_id in ids if resume_id not in resumes]
+            if not missing:
+                break
+            # Deleted since they were indexed
+            for resume_id in missing:
+                self._remove(resume_id)
+
+        wanted_set = set(wanted)
+        results = []
+        for row, resume_id in zip(candidates, ids):
+            result = dict(resumes[resume_id])
+            result["score"] = round(float(scores[row]), 4)
+            result["similarity"] = round(float(similarity[row]), 4)
+            result["skill_overlap"] = round(float(overlap[row]), 4)
+            result["matched_skills"] = [
+                name for name in Resume.normalize_skills(result["skills"]) if name in wanted_set
+            ]
+            results.append(result)
+
+        return {
+            "indexed": len(self),
+            "job_skills": wanted,
+            "count": len(results),
+            "results": results,
+        }
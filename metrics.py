@@ -0,0 +1,268 @@
+import bisect
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+# Latency buckets (seconds) covering fast stages up to slow LLM calls
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [
+        '{}="{}"'.format(name, str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for name, value in zip(names, values)
+    ]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """Monotonic counter, optionally split by labels"""
+
+    type = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        self._values[key] = self._values.get(key, 0) + amount
+
+    def total(self, **labels) -> float:
+        """Sum over the samples matching the given labels (all samples without labels)"""
+        wanted = {self.labelnames.index(name): str(value) for name, value in labels.items()}
+        return sum(
+            value for key, value in self._values.items()
+            if all(key[index] == label for index, label in wanted.items())
+        )
+
+    def samples(self) -> Iterator[str]:
+        for key, value in sorted(self._values.items()):
+            yield f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+
+
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus sense, optionally split by labels"""
+
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # labels -> [per-bucket counts (last one is +Inf), sum]
+        self._series: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, value: float, **labels):
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        series = self._series.get(key)
+        if series is None:
+            series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0]
+        series[0][bisect.bisect_left(self.buckets, value)] += 1
+        series[1] += value
+
+    def samples(self) -> Iterator[str]:
+        for key, (counts, total) in sorted(self._series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                labels = _format_labels(self.labelnames, key, f'le="{_format_value(bound)}"')
+                yield f"{self.name}_bucket{labels} {cumulative}"
+            labels = _format_labels(self.labelnames, key)
+            yield f"{self.name}_sum{labels} {_format_value(total)}"
+            yield f"{self.name}_count{labels} {cumulative}"
+
+
+class Registry:
+    """
+    Metrics of this process plus callbacks evaluated at scrape time.
+    Rendered in the Prometheus text exposition format.
+    """
+
+    def __init__(self):
+        self._metrics: List = []
+        self._callbacks: List[Tuple[str, str, str, Callable[[], List[Tuple[Dict[str, str], float]]]]] = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def callback(
+        self,
+        name: str,
+        help: str,
+        collect: Callable[[], List[Tuple[Dict[str, str], float]]],
+        type: str = "gauge",
+    ):
+        """Register a metric whose samples ([(labels, value), ...]) are read on every scrape"""
+        self._callbacks.append((name, help, type, collect))
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            lines.extend(metric.samples())
+        for name, help, type, collect in self._callbacks:
+            try:
+                samples = collect()
+            except Exception:
+                # A broken collector must not take the whole endpoint down
+                continue
+            if not samples:
+                continue
+            lines.append(f"# HELP {name} {help}")
+            lines.append(f"# TYPE {name} {type}")
+            for labels, value in samples:
+                lines.append(f"{name}{_format_labels(list(labels), list(labels.values()))} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+STAGE_SECONDS = REGISTRY.register(Histogram(
+    "resume_stage_seconds",
+    "Time spent in each resume processing stage",
+    ["stage"],
+))
+FILE_SECONDS = REGISTRY.register(Histogram(
+    "resume_file_seconds",
+    "End-to-end processing time of one uploaded file",
+    ["outcome"],
+))
+FILES_TOTAL = REGISTRY.register(Counter(
+    "resume_files_total",
+    "Uploaded files processed, by outcome",
+    ["outcome"],
+))
+EXTRACTIONS_TOTAL = REGISTRY.register(Counter(
+    "resume_extractions_total",
+    "Documents whose text was extracted, by backend",
+    ["backend"],
+))
+GROQ_REQUESTS_TOTAL = REGISTRY.register(Counter(
+    "groq_requests_total",
+    "Groq chat completions, by result",
+    ["status"],
+))
+GROQ_TOKENS_TOTAL = REGISTRY.register(Counter(
+    "groq_tokens_total",
+    "Tokens reported by Groq, by direction (prompt = in, completion = out)",
+    ["type"],
+))
+RESUME_FIELDS_TOTAL = REGISTRY.register(Counter(
+    "resume_fields_total",
+    "Parsed fields with a value, by source (local = regex/dictionary pass, llm = Groq)",
+    ["field", "source"],
+))
+LLM_TOKENS_SAVED_TOTAL = REGISTRY.register(Counter(
+    "llm_prompt_tokens_saved_total",
+    "Estimated prompt tokens saved by text pre-processing (text) and the compact template (prompt)",
+    ["source"],
+))
+
+
+class RequestTimings:
+    """Per-file breakdown of stage durations and Groq token usage"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.stages: Dict[str, float] = {}
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.tokens_saved = 0
+
+    def add(self, stage: str, seconds: float):
+        self.stages[stage] = self.stages.get(stage, 0.0) + seconds
+
+    def to_dict(self) -> Dict[str, object]:
+        return {
+            "total_seconds": round(time.perf_counter() - self.started, 4),
+            "stages": {stage: round(seconds, 4) for stage, seconds in self.stages.items()},
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "tokens_saved": self.tokens_saved,
+        }
+
+
+# Breakdown of the file being processed by the current task (None outside of one)
+_current: ContextVar[Optional[RequestTimings]] = ContextVar("resume_timings", default=None)
+
+
+def start_timings() -> RequestTimings:
+    """Collect stage timings of the current task (and the tasks it starts) into a new breakdown"""
+    timings = RequestTimings()
+    _current.set(timings)
+    return timings
+
+
+def current_timings() -> Optional[RequestTimings]:
+    return _current.get()
+
+
+def detach_timings():
+    """
+    Stop attributing work of the current task to the breakdown it inherited.
+    Used by shared background tasks (e.g. an LLM batch serving several files).
+    """
+    _current.set(None)
+
+
+def observe_stage(stage: str, seconds: float):
+    """Record a stage duration measured elsewhere (e.g. in an extraction worker)"""
+    STAGE_SECONDS.observe(seconds, stage=stage)
+    timings = _current.get()
+    if timings is not None:
+        timings.add(stage, seconds)
+
+
+@contextmanager
+def timed(stage: str):
+    """Time the enclosed block as `stage`"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe_stage(stage, time.perf_counter() - started)
+
+
+def record_tokens(prompt_tokens: int, completion_tokens: int):
+    """Count Groq token usage, attributing it to the current file when there is one"""
+    GROQ_TOKENS_TOTAL.inc(prompt_tokens, type="prompt")
+    GROQ_TOKENS_TOTAL.inc(completion_tokens, type="completion")
+    timings = _current.get()
+    if timings is not None:
+        timings.prompt_tokens += prompt_tokens
+        timings.completion_tokens += completion_tokens
+
+
+def record_tokens_saved(text_tokens: int, prompt_tokens: int):
+    """Count estimated prompt tokens saved for one resume"""
+    LLM_TOKENS_SAVED_TOTAL.inc(text_tokens, source="text")
+    LLM_TOKENS_SAVED_TOTAL.inc(prompt_tokens, source="prompt")
+    timings = _current.get()
+    if timings is not None:
+        timings.tokens_saved += text_tokens + prompt_tokens
+
+
+def render() -> str:
+    """All metrics of this process in the Prometheus text format"""
+    return REGISTRY.render()
@@ -1,12 +1,18 @@
+import re
+from typing import List
+
 from tortoise import fields
 from tortoise.models import Model
 
+# Separators used between skills in the LLM's free-text skills field
+_SKILL_SEPARATORS = re.compile(r"[,;|\n•]+")
+
 class Resume(Model):
     id = fields.IntField(pk=True)
     name = fields.CharField(max_length=255)
     email = fields.CharField(max_length=255, null=True)
     phone = fields.CharField(max_length=50, null=True)
-    total_years_experience = fields.FloatField(null=True)
+    total_years_experience = fields.FloatField(null=True, index=True)
     
     # Last job details
     last_job_title = fields.CharField(max_length=255, null=True)
@@ -24,12 +30,38 @@ class Resume(Model):
     # Skills
     skills = fields.TextField(null=True)
     
+    # SHA-256 of the uploaded file, used to spot re-uploads
+    content_hash = fields.CharField(max_length=64, null=True, index=True)
+    
     # Metadata
     created_at = fields.DatetimeField(auto_now_add=True)
     updated_at = fields.DatetimeField(auto_now=True)
     
     class Meta:
         table = "resumes"
+        # Keyset pagination on (created_at, id)
+        indexes = (("created_at", "id"),)
+    
+    @staticmethod
+    def normalize_skills(skills: str) -> List[str]:
+        """Split the free-text skills field into unique lower-case skill names"""
+        if not skills:
+            return []
+        names = []
+        for part in _SKILL_SEPARATORS.split(skills):
+            name = " ".join(part.split()).lower()[:100]
+            if name and name not in names:
+                names.append(name)
+        return names
+    
+    async def save_skills(self, using_db=None):
+        """Store the normalized skills of this resume in resume_skills"""
+        names = self.normalize_skills(self.skills)
+        if names:
+            await ResumeSkill.bulk_create(
+                [ResumeSkill(resume_id=self.id, name=name) for name in names],
+                using_db=using_db
+            )
     
     async def to_dict(self):
         return {
@@ -52,4 +84,126 @@ class Resume(Model):
             "skills": self.skills,
             "created_at": self.created_at.isoformat() if self.created_at else None,
             "updated_at": self.updated_at.isoformat() if self.updated_at else None
-        }
\ No newline at end of file
+        }
+
+
+class ResumeSkill(Model):
+    """
+    One normalized (lower-case) skill of a resume, indexed for skill filters
+    """
+    id = fields.IntField(pk=True)
+    resume = fields.ForeignKeyField("models.Resume", related_name="skill_entries", on_delete=fields.CASCADE)
+    name = fields.CharField(max_length=100, index=True)
+    
+    class Meta:
+        table = "resume_skills"
+        unique_together = (("resume", "name"),)
+
+
+class ResumeText(Model):
+    """
+    Raw text extracted from the uploaded file, kept for full-text search
+    """
+    id = fields.IntField(pk=True)
+    resume = fields.OneToOneField("models.Resume", related_name="text", on_delete=fields.CASCADE)
+    content = fields.TextField()
+    # How the text was extracted: "pypdf2", "pdfplumber", "python-docx", ...
+    extraction_backend = fields.CharField(max_length=20, null=True)
+    page_count = fields.IntField(null=True)
+    created_at = fields.DatetimeField(auto_now_add=True)
+    
+    class Meta:
+        table = "resume_texts"
+
+
+class ParseCacheEntry(Model):
+    """
+    Extracted text and parsed fields for an uploaded file.
+    Keyed by SHA-256 of the file bytes plus model name and prompt version,
+    so re-uploaded resumes skip extraction and the LLM call entirely.
+    """
+    key = fields.CharField(max_length=64, pk=True)
+    content_hash = fields.CharField(max_length=64, index=True)
+    model_name = fields.CharField(max_length=100)
+    prompt_version = fields.CharField(max_length=20)
+    extracted_text = fields.TextField()
+    parsed_data = fields.JSONField()
+    created_at = fields.DatetimeField(auto_now_add=True)
+    
+    class Meta:
+        table = "parse_cache"
+
+
+class IngestJob(Model):
+    """
+    A queued bulk upload. Files and progress are stored in the database
+    so queued and interrupted jobs survive a process restart.
+    """
+    id = fields.UUIDField(pk=True)
+    # queued -> running -> completed
+    status = fields.CharField(max_length=20, default="queued", index=True)
+    dedupe = fields.BooleanField(default=False)
+    total = fields.IntField(default=0)
+    processed = fields.IntField(default=0)
+    successful = fields.IntField(default=0)
+    failed = fields.IntField(default=0)
+    cache_hits = fields.IntField(default=0)
+    
+    # A worker owns a running job until its lease expires
+    lease_expires_at = fields.DatetimeField(null=True)
+    
+    created_at = fields.DatetimeField(auto_now_add=True)
+    started_at = fields.DatetimeField(null=True)
+    finished_at = fields.DatetimeField(null=True)
+    
+    class Meta:
+        table = "ingest_jobs"
+
+
+class IngestJobFile(Model):
+    id = fields.IntField(pk=True)
+    job = fields.ForeignKeyField("models.IngestJob", related_name="files", on_delete=fields.CASCADE)
+    position = fields.IntField()
+    filename = fields.CharField(max_length=255)
+    # Uploaded bytes of files queued before ingest_job_file_chunks existed,
+    # cleared once the file has been processed
+    content = fields.BinaryField(null=True)
+    
+    # pending -> done | failed
+    status = fields.CharField(max_length=20, default="pending")
+    error = fields.TextField(null=True)
+    resume_id = fields.IntField(null=True)
+    cached = fields.BooleanField(default=False)
+    duplicate = fields.BooleanField(default=False)
+    finished_at = fields.DatetimeField(null=True)
+    
+    class Meta:
+        table = "ingest_job_files"
+        unique_together = (("job", "position"),)
+
+
+class IngestJobFileChunk(Model):
+    """
+    A slice of a queued file's bytes. Files are stored and read back in chunks
+    so neither enqueueing nor processing holds a whole upload in memory.
+    """
+    id = fields.IntField(pk=True)
+    file = fields.ForeignKeyField("models.IngestJobFile", related_name="chunks", on_delete=fields.CASCADE)
+    seq = fields.IntField()
+    data = fields.BinaryField()
+    
+    class Meta:
+        table = "ingest_job_file_chunks"
+        unique_together = (("file", "seq"),)
+
+
+class RateLimitState(Model):
+    """
+    Groq rate limiter bucket levels shared by all worker processes
+    (used with GROQ_RATE_LIMIT_BACKEND=postgres)
+    """
+    name = fields.CharField(max_length=50, pk=True)
+    state = fields.JSONField()
+    
+    class Meta:
+        table = "rate_limit_state"
@@ -0,0 +1,142 @@
+import io
+from typing import Any, BinaryIO, Dict, List, Optional, Tuple, Union
+
+from metrics import timed
+
+# Pages looked at before choosing a backend
+PROBE_PAGES = 2
+# Probed text shorter than this (or mostly non-alphanumeric) means PyPDF2 can't decode the fonts
+MIN_PROBE_CHARS = 50
+MIN_ALNUM_RATIO = 0.5
+
+
+def _usable(text: str) -> bool:
+    """Whether extracted text looks like real words rather than missing or undecoded glyphs"""
+    chars = "".join(text.split())
+    if len(chars) < MIN_PROBE_CHARS:
+        return False
+    alnum = sum(1 for char in chars if char.isalnum())
+    return alnum / len(chars) >= MIN_ALNUM_RATIO
+
+
+def _has_resource(page, key: str, subtype: Optional[str] = None) -> bool:
+    """Whether a PyPDF2 page declares resources of a kind (e.g. "/Font", or "/XObject" of subtype "/Form")"""
+    try:
+        resources = page.get("/Resources")
+        entries = resources.get_object().get(key) if resources else None
+        if not entries:
+            return False
+        if subtype is None:
+            return True
+        return any(entry.get_object().get("/Subtype") == subtype for entry in entries.get_object().values())
+    except Exception:
+        return False
+
+
+def probe(reader, probe_pages: int = PROBE_PAGES) -> Tuple[str, List[str]]:
+    """
+    Pick the backend for a PDF from its first pages.
+    Returns (backend, text of the probed pages) where backend is "pypdf2",
+    "pdfplumber" or "none" (scanned pages without a text layer). The probed
+    text is reused when PyPDF2 is chosen, so those pages aren't parsed twice.
+    """
+    texts = []
+    # Text is drawn with page fonts or inside form XObjects (which carry their own fonts)
+    has_text_layer = False
+    for page in reader.pages[:probe_pages]:
+        has_text_layer = has_text_layer or _has_resource(page, "/Font") or _has_resource(page, "/XObject", "/Form")
+        texts.append(page.extract_text() or "")
+
+    if _usable("\n".join(texts)):
+        return "pypdf2", texts
+    if not has_text_layer and not any(text.strip() for text in texts):
+        # Scanned pages: neither backend can read them without OCR
+        return "none", texts
+    # Fonts PyPDF2 can't decode (e.g. missing ToUnicode maps); pdfminer handles more of them
+    return "pdfplumber", texts
+
+
+def open_source(source: Union[bytes, str]) -> BinaryIO:
+    """A binary stream over document bytes or a file path (spooled uploads are read from disk as needed)"""
+    if isinstance(source, str):
+        return open(source, "rb")
+    return io.BytesIO(source)
+
+
+def _pdfplumber_pages(source: Union[bytes, str], start: int, max_pages: int, max_chars: int, collected: int) -> Tuple[List[str], int]:
+    """Extract pages [start, max_pages) with pdfplumber until max_chars is reached"""
+    import pdfplumber
+
+    texts = []
+    with open_source(source) as stream, pdfplumber.open(stream) as pdf:
+        total = len(pdf.pages)
+        for page in pdf.pages[start:max_pages]:
+            page_text = page.extract_text() or ""
+            # Drop the parsed layout right away; long documents would otherwise keep every page
+            page.close()
+            texts.append(page_text)
+            collected += len(page_text)
+            if collected >= max_chars:
+                break
+    return texts, total
+
+
+def extract_pdf(source: Union[bytes, str], max_pages: int = 20, max_chars: int = 30000) -> Tuple[str, Dict[str, Any]]:
+    """
+    Extract the text of a PDF (bytes or a file path) with a single backend chosen up front.
+
+    Pages are read one at a time; extraction stops after max_pages pages or
+    once max_chars characters are collected. If PyPDF2 fails part way, only
+    the remaining pages are read with pdfplumber.
+    Returns (text, info) with the backend used and page counts.
+    """
+    from PyPDF2 import PdfReader
+
+    texts: List[str] = []
+    total_pages: Optional[int] = None
+    # PyPDF2 seeks into the stream per page, so a spooled file isn't loaded whole
+    with open_source(source) as stream:
+        try:
+            with timed("pdf_probe"):
+                reader = PdfReader(stream)
+                total_pages = len(reader.pages)
+                backend, texts = probe(reader, min(PROBE_PAGES, max_pages))
+        except Exception as e:
+            print(f"PyPDF2 could not open the PDF ({e}), using pdfplumber")
+            backend, reader, texts = "pdfplumber", None, []
+
+        if backend == "pypdf2":
+            collected = sum(len(t) for t in texts)
+            try:
+                with timed("pypdf2"):
+                    for page in reader.pages[len(texts):max_pages]:
+                        if collected >= max_chars:
+                            break
+                        page_text = page.extract_text() or ""
+                        texts.append(page_text)
+                        collected += len(page_text)
+            except Exception as e:
+                print(f"PyPDF2 failed on page {len(texts) + 1} ({e}), reading the rest with pdfplumber")
+                backend = "pypdf2+pdfplumber"
+                try:
+                    with timed("pdfplumber"):
+                        rest, total_pages = _pdfplumber_pages(source, len(texts), max_pages, max_chars, collected)
+                    texts.extend(rest)
+                except Exception as e:
+                    print(f"pdfplumber extraction also failed: {e}")
+        elif backend == "pdfplumber":
+            try:
+                with timed("pdfplumber"):
+                    texts, total_pages = _pdfplumber_pages(source, 0, max_pages, max_chars, 0)
+            except Exception as e:
+                # Keep whatever the probe got
+                print(f"pdfplumber extraction failed: {e}")
+
+    # Pages end with a form feed so repeated headers/footers can be told apart from content later
+    text = "".join(page_text + "\n\f" for page_text in texts if page_text)
+    return text, {
+        "backend": backend,
+        "pages": total_pages,
+        "pages_processed": len(texts),
+        "truncated": total_pages is not None and len(texts) < total_pages,
+    }
@@ -0,0 +1,367 @@
+import os
+import asyncio
+import traceback
+from typing import List, Dict, Any, Optional, Tuple, Union
+
+import config
+from models import Resume
+from services import ResumeParserService
+from extraction import ExtractionExecutor
+from rate_limit import GroqRateLimiter, FileRateLimitStore, DatabaseRateLimitStore
+from cache import ParseCache, content_sha256, file_sha256
+from batching import LLMBatcher
+from writer import ResumeWriter
+from uploads import SpooledUpload
+from metrics import (
+    RequestTimings, timed, start_timings, record_tokens_saved,
+    FILES_TOTAL, FILE_SECONDS, EXTRACTIONS_TOTAL,
+)
+
+ALLOWED_EXTENSIONS = {'.pdf', '.docx', '.doc'}
+
+
+def unsupported_file_error(filename: str) -> Optional[str]:
+    """Error message for files we can't parse, None if the type is supported"""
+    file_ext = os.path.splitext(filename)[1].lower()
+    if file_ext not in ALLOWED_EXTENSIONS:
+        return f"Unsupported file type: {file_ext}"
+    return None
+
+
+def placeholder_name(filename: str) -> str:
+    """Name stored for a resume whose name couldn't be found: its file name without the extension"""
+    return os.path.splitext(os.path.basename(filename))[0].strip() or filename
+
+
+def summarize(outcomes: List[Dict[str, Any]], include_timings: bool = False) -> Dict[str, Any]:
+    """
+    Build the bulk upload summary from per-file outcomes (in upload order).
+    Each outcome is {"filename", "resume"} on success or {"filename", "error"} on failure.
+    With include_timings the per-file stage breakdown and its totals are added.
+    """
+    results = {
+        "total": len(outcomes),
+        "successful": 0,
+        "failed": 0,
+        "cache_hits": 0,
+        "errors": [],
+        "resumes": []
+    }
+    batches = []
+    seen_batches = set()
+    for outcome in outcomes:
+        if "error" in outcome:
+            results["failed"] += 1
+            results["errors"].append({
+                "filename": outcome["filename"],
+                "error": outcome["error"]
+            })
+        else:
+            results["successful"] += 1
+            if outcome["resume"]["cached"]:
+                results["cache_hits"] += 1
+            results["resumes"].append(outcome["resume"])
+            # Files parsed together share one report
+            batch = outcome.get("batch")
+            if batch is not None and id(batch) not in seen_batches:
+                seen_batches.add(id(batch))
+                batches.append(batch)
+    if batches:
+        results["batches"] = batches
+    if include_timings:
+        results["timings"] = [
+            {
+                "filename": outcome["filename"],
+                **outcome["timings"],
+                "extraction": outcome.get("extraction"),
+                "preprocess": outcome.get("preprocess"),
+                "fields": outcome.get("fields"),
+            }
+            for outcome in outcomes if outcome.get("timings")
+        ]
+        # Summed over files; concurrent files overlap, so this exceeds wall-clock time
+        totals: Dict[str, float] = {}
+        for entry in results["timings"]:
+            for stage, seconds in entry["stages"].items():
+                totals[stage] = totals.get(stage, 0.0) + seconds
+        results["stage_totals"] = {stage: round(seconds, 4) for stage, seconds in totals.items()}
+        results["tokens_saved"] = sum(entry["tokens_saved"] for entry in results["timings"])
+    return results
+
+
+class BulkIngestPipeline:
+    """
+    Processes bulk uploads concurrently.
+
+    Text extraction runs on the extraction process pool, LLM calls are bounded
+    by a semaphore and parsed resumes are written in batches by a write-behind
+    stage that still reports success or failure per file.
+    """
+
+    def __init__(
+        self,
+        parser_service: ResumeParserService,
+        extractor: ExtractionExecutor,
+        max_llm_calls: int = 4,
+        parse_cache: Optional[ParseCache] = None,
+        llm_batch_size: int = 1,
+        llm_batch_token_budget: int = 6000,
+        db_write_batch_size: int = 1,
+    ):
+        self.parser_service = parser_service
+        self.extractor = extractor
+        self.max_llm_calls = max_llm_calls
+        self.parse_cache = parse_cache
+        self._llm_semaphore = asyncio.Semaphore(max_llm_calls)
+        # With a batch size above 1, resumes are packed into shared Groq requests
+        self.batcher = None
+        if llm_batch_size > 1:
+            self.batcher = LLMBatcher(
+                parser_service,
+                self._llm_semaphore,
+                max_batch_size=llm_batch_size,
+                token_budget=llm_batch_token_budget
+            )
+        self.writer = ResumeWriter(batch_size=db_write_batch_size)
+        # Serializes the duplicate check + insert for identical files: hash -> [lock, users]
+        self._dedupe_locks: Dict[str, list] = {}
+
+    async def _extract_and_parse(
+        self,
+        source: Union[bytes, str],
+        file_ext: str,
+        info: Dict[str, Any]
+    ) -> Tuple[str, Dict[str, Any]]:
+        """
+        Extract text, find what fields we can locally and parse the rest with
+        the LLM (recording extraction details, the field sources, the
+        pre-processing report and the batch report in info).
+        The full text is returned for storage; only the prompt gets the slimmed text.
+        """
+        with timed("extract"):
+            text, info["extraction"] = await self.extractor.extract(source, file_ext)
+        EXTRACTIONS_TOTAL.inc(backend=info["extraction"]["backend"])
+
+        # Regex/dictionary scans and text clean-up are CPU-bound, keep them off the event loop
+        local = await asyncio.to_thread(self.parser_service.extract_local, text)
+        fields = self.parser_service.llm_fields(local)
+        llm_data: Dict[str, Any] = {}
+        if fields:
+            prompt_text, info["preprocess"] = await asyncio.to_thread(self.parser_service.prepare_text, text)
+            record_tokens_saved(info["preprocess"]["tokens_saved"], info["preprocess"]["prompt_tokens_saved"])
+
+            if self.batcher:
+                # The batch is timed in its own task; this file only sees the wait
+                with timed("llm_batch_wait"):
+                    llm_data, info["batch"] = await self.batcher.parse(prompt_text, fields)
+            else:
+                # Parse resume using AI, bounded so we don't stampede the API
+                async with self._llm_semaphore:
+                    llm_data = await self.parser_service.parse_text(prompt_text, fields)
+
+        parsed_data, info["fields"] = self.parser_service.merge(local, llm_data, fields)
+        return text, parsed_data
+
+    async def _save(
+        self,
+        parsed_data: Dict[str, Any],
+        text: str,
+        content_hash: str,
+        dedupe: bool,
+        extraction: Optional[Dict[str, Any]] = None
+    ) -> Tuple[Resume, bool]:
+        """
+        Save a parsed resume through the write-behind stage.
+        With dedupe enabled an existing row for the same file is returned instead.
+        """
+        if not dedupe:
+            return await self.writer.save(parsed_data, text, content_hash, extraction), False
+
+        entry = self._dedupe_locks.setdefault(content_hash, [asyncio.Lock(), 0])
+        entry[1] += 1
+        try:
+            async with entry[0]:
+                existing = await Resume.filter(content_hash=content_hash).order_by("id").first()
+                if existing:
+                    return existing, True
+                return await self.writer.save(parsed_data, text, content_hash, extraction), False
+        finally:
+            entry[1] -= 1
+            if entry[1] == 0:
+                del self._dedupe_locks[content_hash]
+
+    async def process_file(self, upload: SpooledUpload, dedupe: bool = False) -> Dict[str, Any]:
+        """
+        Process a received upload; spooled files are handed to the extractors by path.
+        Returns {"filename", "resume"} on success or {"filename", "error"} on failure.
+        """
+        error = unsupported_file_error(upload.filename)
+        if error:
+            return {"filename": upload.filename, "error": error}
+        return await self._process(upload.filename, upload.source, upload.content_hash, dedupe, start_timings())
+
+    async def process_content(self, filename: str, content: bytes, dedupe: bool = False) -> Dict[str, Any]:
+        """
+        Extract, parse and save a single file.
+        Returns {"filename", "resume"} on success or {"filename", "error"} on failure.
+        """
+        error = unsupported_file_error(filename)
+        if error:
+            return {"filename": filename, "error": error}
+        return await self._process(filename, content, content_sha256(content), dedupe, start_timings())
+
+    async def process_path(self, filename: str, path: str, dedupe: bool = False) -> Dict[str, Any]:
+        """
+        Process a file on disk (e.g. for the ingest CLI); the extractors read it by path.
+        Returns {"filename", "resume"} on success or {"filename", "error"} on failure.
+        """
+        error = unsupported_file_error(filename)
+        if error:
+            return {"filename": filename, "error": error}
+        timings = start_timings()
+        try:
+            with timed("file_read"):
+                content_hash = await asyncio.to_thread(file_sha256, path)
+        except OSError as e:
+            return {"filename": filename, "error": str(e), "timings": timings.to_dict()}
+        return await self._process(filename, path, content_hash, dedupe, timings)
+
+    async def _process(
+        self,
+        filename: str,
+        source: Union[bytes, str],
+        content_hash: str,
+        dedupe: bool,
+        timings: RequestTimings
+    ) -> Dict[str, Any]:
+        """
+        Stages of process_content for the file's bytes or spooled path;
+        timed stages are collected into `timings`
+        """
+        file_ext = os.path.splitext(filename)[1].lower()
+
+        try:
+            size = os.path.getsize(source) if isinstance(source, str) else len(source)
+            print(f"Processing file: {filename}, size: {size} bytes")
+
+            info: Dict[str, Any] = {}
+
+            if self.parse_cache:
+                text, parsed_data, cached = await self.parse_cache.get_or_compute(
+                    content_hash,
+                    lambda: self._extract_and_parse(source, file_ext, info)
+                )
+            else:
+                text, parsed_data = await self._extract_and_parse(source, file_ext, info)
+                cached = False
+            if not parsed_data.get("name"):
+                # Neither the local pass nor the LLM found one (e.g. an unusual header
+                # in fast mode); the name column is required
+                parsed_data = {**parsed_data, "name": placeholder_name(filename)}
+            print(f"Parsed data for {filename}: {parsed_data.get('name', 'NO NAME')}"
+                  f"{' (cached)' if cached else ''}")
+
+            # Save to database; a failed insert only rolls back this file
+            with timed("db_insert"):
+                resume, duplicate = await self._save(
+                    parsed_data, text, content_hash, dedupe, info.get("extraction")
+                )
+            print(f"Successfully saved resume ID: {resume.id}")
+
+            outcome = {
+                "filename": filename,
+                "batch": info.get("batch"),
+                "extraction": info.get("extraction"),
+                "preprocess": info.get("preprocess"),
+                "fields": info.get("fields"),
+                "resume": {
+                    "id": resume.id,
+                    "name": resume.name,
+                    "filename": filename,
+                    "cached": cached,
+                    "duplicate": duplicate
+                }
+            }
+
+        except Exception as e:
+            print(f"ERROR processing {filename}: {str(e)}")
+            traceback.print_exc()
+            outcome = {
+                "filename": filename,
+                "error": str(e)
+            }
+
+        outcome["timings"] = timings.to_dict()
+        result = "failed" if "error" in outcome else "successful"
+        FILES_TOTAL.inc(outcome=result)
+        FILE_SECONDS.observe(outcome["timings"]["total_seconds"], outcome=result)
+        return outcome
+
+    async def run(
+        self,
+        files: List[SpooledUpload],
+        dedupe: bool = False,
+        include_timings: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Process all files concurrently and build the bulk upload summary.
+        The returned resumes and errors keep the upload order.
+        """
+        outcomes = await asyncio.gather(*(self.process_file(file, dedupe) for file in files))
+        return summarize(outcomes, include_timings=include_timings)
+
+
+def build_pipeline(workers: Optional[int] = None, max_llm_calls: Optional[int] = None) -> BulkIngestPipeline:
+    """
+    The ingestion pipeline as configured by the environment (used by the server
+    and the ingest CLI); `workers` and `max_llm_calls` override
+    EXTRACTION_WORKERS and MAX_CONCURRENT_LLM_CALLS.
+    """
+    # Shared by all requests so concurrent uploads cooperate on Groq quotas; with several
+    # processes the quota state is shared through a file or the database
+    if config.GROQ_RATE_LIMIT_BACKEND == "file":
+        rate_limit_store = FileRateLimitStore(config.GROQ_RATE_LIMIT_FILE)
+    elif config.GROQ_RATE_LIMIT_BACKEND == "postgres":
+        rate_limit_store = DatabaseRateLimitStore()
+    else:
+        rate_limit_store = None
+
+    parser_service = ResumeParserService(
+        groq_api_key=config.GROQ_API_KEY,
+        model_name=config.GROQ_MODEL,
+        rate_limiter=GroqRateLimiter(
+            requests_per_minute=config.GROQ_REQUESTS_PER_MINUTE,
+            tokens_per_minute=config.GROQ_TOKENS_PER_MINUTE,
+            store=rate_limit_store
+        ),
+        max_retries=config.GROQ_MAX_RETRIES,
+        max_retry_delay=config.GROQ_MAX_RETRY_DELAY_SECONDS,
+        prompt_version=config.PROMPT_VERSION,
+        preprocess=config.LLM_PREPROCESS,
+        text_token_budget=config.LLM_TEXT_TOKEN_BUDGET,
+        field_mode=config.LLM_FIELD_MODE
+    )
+
+    # Process pool for CPU-bound PDF/DOCX text extraction
+    extractor = ExtractionExecutor(
+        workers=workers if workers is not None else config.EXTRACTION_WORKERS,
+        timeout=config.EXTRACTION_TIMEOUT_SECONDS,
+        max_tasks=config.EXTRACTION_MAX_TASKS_PER_WORKER,
+        pdf_max_pages=config.PDF_MAX_PAGES,
+        pdf_max_chars=config.PDF_MAX_CHARS
+    )
+
+    return BulkIngestPipeline(
+        parser_service,
+        extractor,
+        max_llm_calls=max_llm_calls if max_llm_calls is not None else config.MAX_CONCURRENT_LLM_CALLS,
+        # Content-hash cache so re-uploaded resumes skip extraction and the LLM
+        parse_cache=ParseCache(
+            model_name=config.GROQ_MODEL,
+            prompt_version=parser_service.cache_version,
+            max_bytes=config.PARSE_CACHE_MAX_BYTES
+        ),
+        llm_batch_size=config.LLM_BATCH_SIZE,
+        llm_batch_token_budget=config.LLM_BATCH_TOKEN_BUDGET,
+        db_write_batch_size=config.DB_WRITE_BATCH_SIZE
+    )
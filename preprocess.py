@@ -0,0 +1,179 @@
+import re
+import unicodedata
+from collections import Counter
+from typing import Any, Dict, List, Tuple
+
+# Bump whenever the output of prepare() changes so cached parses are invalidated
+PREPROCESS_VERSION = "p1"
+
+# Canonical section names and the headings that start them
+SECTION_HEADINGS = {
+    "summary": ["summary", "profile", "professional summary", "objective", "career objective", "about me"],
+    "experience": ["experience", "work experience", "professional experience", "employment",
+                   "employment history", "work history", "career history"],
+    "education": ["education", "academic background", "academics", "qualifications",
+                  "educational qualifications"],
+    "skills": ["skills", "technical skills", "core competencies", "key skills", "technologies", "tech stack"],
+    "certifications": ["certifications", "certificates", "licenses", "licenses and certifications"],
+    "awards": ["awards", "honors", "honours", "achievements", "accomplishments"],
+    "projects": ["projects", "personal projects", "key projects", "academic projects"],
+    "publications": ["publications", "research"],
+    "volunteer": ["volunteer", "volunteering", "volunteer experience", "community involvement"],
+    "languages": ["languages"],
+    "interests": ["interests", "hobbies", "hobbies and interests", "extracurricular activities"],
+    "personal": ["personal details", "personal information", "personal data"],
+    "references": ["references", "referees"],
+    "declaration": ["declaration"],
+}
+_HEADING_TO_SECTION = {
+    heading: section for section, headings in SECTION_HEADINGS.items() for heading in headings
+}
+
+# Sections trimmed first when the text is over budget, least useful for the parsed fields first.
+# (stub characters kept, 0 drops the section). Header, experience, education, skills,
+# certifications and awards are never trimmed here.
+TRIM_ORDER = [
+    ("declaration", 0),
+    ("references", 0),
+    ("personal", 0),
+    ("interests", 0),
+    ("languages", 200),
+    ("publications", 300),
+    ("projects", 400),
+    ("volunteer", 400),
+    ("summary", 400),
+]
+
+_PAGE_NUMBER = re.compile(r"^(page\s*)?[-–—]?\s*\d+\s*((of|/)\s*\d+)?\s*[-–—]?$", re.I)
+# Tabs and the Unicode space characters NFKC leaves alone
+_SPACES = re.compile(r"[ \t\u00a0\u2000-\u200a\u202f\u205f\u3000]+")
+# Zero-width characters, BOMs and control characters other than \t, \n and \f
+_INVISIBLE = re.compile(r"[\u200b-\u200d\u2060\ufeff\x00-\x08\x0b\x0e-\x1f\x7f]")
+_DIGITS = re.compile(r"\d+")
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token)"""
+    return len(text) // 4
+
+
+def normalize_whitespace(text: str) -> str:
+    """Unify characters and spacing; keeps line breaks and form feeds (page breaks)"""
+    # Ligatures and full-width forms (e.g. "ﬁ" -> "fi") as plain characters
+    text = unicodedata.normalize("NFKC", text.replace("\r\n", "\n").replace("\r", "\n"))
+    text = _INVISIBLE.sub("", text)
+    # strip(" ") rather than strip(): form feeds mark page breaks
+    lines = [_SPACES.sub(" ", line).strip(" ") for line in text.split("\n")]
+    text = "\n".join(lines)
+    # At most one blank line in a row
+    return re.sub(r"\n{3,}", "\n\n", text).strip()
+
+
+def _line_key(line: str) -> str:
+    """Lines that differ only in numbers (e.g. "Page 2 of 3") count as the same header/footer"""
+    return _DIGITS.sub("#", line.lower())
+
+
+def strip_headers_footers(text: str, edge_lines: int = 2) -> str:
+    """
+    Remove lines repeated at the top or bottom of several pages (pages are
+    separated by form feeds) and standalone page numbers.
+    """
+    pages = [page.split("\n") for page in text.split("\f")]
+    repeated = set()
+    if len(pages) > 1:
+        counts = Counter()
+        for lines in pages:
+            content = [line for line in lines if line.strip()]
+            edges = content[:edge_lines] + content[-edge_lines:]
+            counts.update({_line_key(line) for line in edges})
+        threshold = max(2, (len(pages) + 1) // 2)
+        repeated = {key for key, count in counts.items() if count >= threshold}
+
+    kept = []
+    for lines in pages:
+        for line in lines:
+            stripped = line.strip()
+            if stripped and (_line_key(stripped) in repeated or _PAGE_NUMBER.match(stripped)):
+                continue
+            kept.append(line)
+    return "\n".join(kept)
+
+
+def _heading(line: str) -> str:
+    """Canonical section for a heading line, or "" if the line isn't one"""
+    candidate = line.strip().strip(":").strip()
+    if not candidate or len(candidate) > 40:
+        return ""
+    return _HEADING_TO_SECTION.get(" ".join(candidate.lower().replace("&", "and").split()), "")
+
+
+def split_sections(text: str) -> List[Tuple[str, str]]:
+    """
+    Split resume text into (section, text) parts in document order.
+    Text before the first heading is the "header" (name and contact details).
+    """
+    sections: List[Tuple[str, List[str]]] = [("header", [])]
+    for line in text.split("\n"):
+        section = _heading(line)
+        if section:
+            sections.append((section, [line]))
+        else:
+            sections[-1][1].append(line)
+    return [(name, "\n".join(lines).strip()) for name, lines in sections if "\n".join(lines).strip()]
+
+
+def fit_budget(sections: List[Tuple[str, str]], max_tokens: int) -> Tuple[List[Tuple[str, str]], List[str]]:
+    """
+    Trim low-value sections (see TRIM_ORDER) until the text fits max_tokens.
+    Returns the sections and the names of those trimmed. If the text is still
+    too long it is cut at the end as a last resort.
+    """
+    def total() -> int:
+        return sum(estimate_tokens(content) + 1 for _, content in sections)
+
+    trimmed = []
+    sections = list(sections)
+    for name, keep_chars in TRIM_ORDER:
+        if total() <= max_tokens:
+            break
+        for index, (section, content) in enumerate(sections):
+            if section != name or len(content) <= keep_chars:
+                continue
+            sections[index] = (section, content[:keep_chars].rsplit(" ", 1)[0] + " ..." if keep_chars else "")
+            if name not in trimmed:
+                trimmed.append(name)
+        sections = [(section, content) for section, content in sections if content]
+
+    if total() > max_tokens:
+        budget = max_tokens * 4
+        cut = []
+        for section, content in sections:
+            if budget <= 0:
+                break
+            cut.append((section, content[:budget]))
+            budget -= len(content) + 1
+        sections = cut
+        trimmed.append("truncated")
+    return sections, trimmed
+
+
+def prepare(text: str, max_tokens: int = 3000) -> Tuple[str, Dict[str, Any]]:
+    """
+    Clean extracted resume text for the LLM prompt.
+    Returns (text, report) where report has the token estimates before and
+    after, the sections found and those trimmed to fit max_tokens.
+    """
+    original_tokens = estimate_tokens(text)
+    cleaned = normalize_whitespace(strip_headers_footers(normalize_whitespace(text)))
+    sections = split_sections(cleaned)
+    sections, trimmed = fit_budget(sections, max_tokens)
+    prepared = "\n\n".join(content for _, content in sections)
+    tokens = estimate_tokens(prepared)
+    return prepared, {
+        "original_tokens": original_tokens,
+        "tokens": tokens,
+        "tokens_saved": max(original_tokens - tokens, 0),
+        "sections": list(dict.fromkeys(name for name, _ in sections)),
+        "trimmed": trimmed,
+    }
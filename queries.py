@@ -0,0 +1,138 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from tortoise.expressions import Q, Subquery
+from tortoise.functions import Count, Max
+
+from models import Resume, ResumeSkill
+
+
+class InvalidCursor(ValueError):
+    """Raised when a pagination cursor can't be decoded"""
+
+
+class InvalidFields(ValueError):
+    """Raised when a list projection names unknown fields"""
+
+
+# Fields of GET /resumes in Resume.to_dict() order; the grouped ones are nested like to_dict()
+LIST_FIELDS = [
+    "id", "name", "email", "phone", "total_years_experience", "last_job", "education",
+    "special_highlights", "skills", "created_at", "updated_at",
+]
+_LIST_GROUPS = {
+    "last_job": {"title": "last_job_title", "company": "last_job_company", "duration": "last_job_duration"},
+    "education": {
+        "highest_degree": "highest_degree", "university": "university", "graduation_year": "graduation_year"
+    },
+}
+
+
+def encode_cursor(created_at: datetime, resume_id: int) -> str:
+    """Opaque cursor pointing just past (created_at, id)"""
+    raw = json.dumps([created_at.isoformat(), resume_id])
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        created_at, resume_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        return datetime.fromisoformat(created_at), int(resume_id)
+    except (ValueError, TypeError) as e:
+        raise InvalidCursor(f"Invalid cursor: {e}")
+
+
+async def query_resumes(
+    min_experience: Optional[float] = None,
+    max_experience: Optional[float] = None,
+    degree: Optional[str] = None,
+    university: Optional[str] = None,
+    company: Optional[str] = None,
+    skills: Optional[List[str]] = None,
+    limit: int = 50,
+    cursor: Optional[str] = None,
+) -> Tuple[List[Resume], Optional[str]]:
+    """
+    Filter resumes, newest first, with keyset pagination on (created_at, id).
+
+    Text filters are case-insensitive substring matches (backed by trigram
+    indexes on Postgres). Every requested skill must be present; skills are
+    matched against the normalized resume_skills table.
+    Returns (resumes, next_cursor); next_cursor is None on the last page.
+    """
+    query = Resume.all()
+    if min_experience is not None:
+        query = query.filter(total_years_experience__gte=min_experience)
+    if max_experience is not None:
+        query = query.filter(total_years_experience__lte=max_experience)
+    if degree:
+        query = query.filter(highest_degree__icontains=degree)
+    if university:
+        query = query.filter(university__icontains=university)
+    if company:
+        query = query.filter(last_job_company__icontains=company)
+
+    for name in Resume.normalize_skills(",".join(skills or [])):
+        query = query.filter(
+            id__in=Subquery(ResumeSkill.filter(name=name).values("resume_id"))
+        )
+
+    if cursor:
+        created_at, resume_id = decode_cursor(cursor)
+        query = query.filter(
+            Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=resume_id)
+        )
+
+    # Fetch one extra row to know whether another page exists
+    rows = await query.order_by("-created_at", "-id").limit(limit + 1)
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].created_at, rows[-1].id)
+    return rows, next_cursor
+
+
+def parse_fields(fields: Optional[str]) -> List[str]:
+    """
+    Comma-separated list fields (all of LIST_FIELDS when empty), in
+    LIST_FIELDS order. The id is always included.
+    """
+    if not fields:
+        return list(LIST_FIELDS)
+    requested = {name.strip() for name in fields.split(",") if name.strip()}
+    unknown = sorted(requested - set(LIST_FIELDS))
+    if unknown:
+        raise InvalidFields(f"Unknown fields: {', '.join(unknown)} (available: {', '.join(LIST_FIELDS)})")
+    return [name for name in LIST_FIELDS if name == "id" or name in requested]
+
+
+async def list_stats() -> Tuple[int, Optional[datetime]]:
+    """Total number of resumes and the latest updated_at, in one aggregate query"""
+    row = await Resume.annotate(total=Count("id"), latest=Max("updated_at")).first().values("total", "latest")
+    if not row:
+        return 0, None
+    return row["total"] or 0, row["latest"]
+
+
+async def list_resumes(fields: List[str], skip: int = 0, limit: int = 100) -> List[Dict[str, Any]]:
+    """
+    A page of resumes ordered by id, shaped like Resume.to_dict() but with only
+    the given fields. Only the needed columns are selected, so large text
+    columns (skills, special_highlights) aren't read unless asked for.
+    """
+    columns = []
+    for name in fields:
+        columns.extend(_LIST_GROUPS[name].values() if name in _LIST_GROUPS else [name])
+    rows = await Resume.all().order_by("id").offset(skip).limit(limit).values(*columns)
+    resumes = []
+    for row in rows:
+        resume = {}
+        for name in fields:
+            if name in _LIST_GROUPS:
+                resume[name] = {key: row[column] for key, column in _LIST_GROUPS[name].items()}
+            else:
+                resume[name] = row[name]
+        resumes.append(resume)
+    return resumes
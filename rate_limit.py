@@ -0,0 +1,304 @@
+import re
+import json
+import time
+import random
+import asyncio
+from typing import Any, Callable, Dict, Mapping, Optional, Tuple
+
+_DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+
+
+def parse_reset_duration(value: Optional[str]) -> Optional[float]:
+    """
+    Parse a rate-limit reset value into seconds.
+    Accepts plain seconds ("7.5") and Groq durations ("2m59.56s", "120ms", "1h2m").
+    """
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+
+    parts = _DURATION_PART.findall(value)
+    if not parts:
+        return None
+    multipliers = {"h": 3600.0, "m": 60.0, "s": 1.0, "ms": 0.001}
+    return sum(float(amount) * multipliers[unit] for amount, unit in parts)
+
+
+def exhausted_limit(headers: Optional[Mapping[str, str]], message: str = "") -> Optional[str]:
+    """
+    Which Groq quota a 429 is about: "tokens", "requests" or None if it can't be told.
+    Groq names it in the error message ("... on tokens per minute (TPM) ...") and
+    reports the remaining quota in x-ratelimit-remaining-* headers.
+    """
+    message = message.lower()
+    if "tokens per" in message or "(tpm)" in message or "(tpd)" in message:
+        return "tokens"
+    if "requests per" in message or "(rpm)" in message or "(rpd)" in message:
+        return "requests"
+    if headers:
+        for limit in ("tokens", "requests"):
+            if (headers.get(f"x-ratelimit-remaining-{limit}") or "").strip() == "0":
+                return limit
+    return None
+
+
+def retry_after_seconds(headers: Optional[Mapping[str, str]], message: str = "") -> Optional[float]:
+    """
+    Read how long the API asked us to wait from response headers.
+    Without a Retry-After, the reset time of the exhausted quota is used. On Groq
+    x-ratelimit-reset-requests is the daily request window, so for a token
+    limit (or when the limit is unknown) the tokens-per-minute reset comes first.
+    """
+    if not headers:
+        return None
+    seconds = parse_reset_duration(headers.get("retry-after"))
+    if seconds is not None:
+        return seconds
+    resets = {
+        limit: parse_reset_duration(headers.get(f"x-ratelimit-reset-{limit}"))
+        for limit in ("tokens", "requests")
+    }
+    limit = exhausted_limit(headers, message)
+    if limit and resets[limit] is not None:
+        return resets[limit]
+    known = [seconds for seconds in resets.values() if seconds is not None]
+    return min(known) if known else None
+
+
+def backoff_delay(
+    attempt: int,
+    base_delay: float,
+    retry_after: Optional[float] = None,
+    max_delay: Optional[float] = None
+) -> float:
+    """
+    Jittered exponential backoff, capped at max_delay when given.
+    When the server sent a Retry-After we wait at least that long plus a little jitter
+    so concurrent callers don't all retry in the same instant (still within max_delay).
+    """
+    if retry_after is not None:
+        delay = retry_after + random.uniform(0, base_delay)
+    else:
+        ceiling = base_delay * (2 ** attempt)
+        delay = random.uniform(ceiling / 2, ceiling)
+    return min(delay, max_delay) if max_delay is not None else delay
+
+
+class TokenBucket:
+    """Classic token bucket refilled continuously at rate_per_minute"""
+
+    def __init__(self, rate_per_minute: float, capacity: Optional[float] = None, clock=time.monotonic):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity if capacity is not None else rate_per_minute
+        self.clock = clock
+        self.tokens = self.capacity
+        self.updated_at = clock()
+
+    def _refill(self):
+        now = self.clock()
+        self.tokens = min(self.capacity, self.tokens + max(now - self.updated_at, 0.0) * self.rate)
+        self.updated_at = now
+
+    def delay_for(self, amount: float) -> float:
+        """Seconds until `amount` tokens are available (0 if available now)"""
+        self._refill()
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.rate
+
+    def consume(self, amount: float):
+        """Take tokens out of the bucket; may go negative to record debt"""
+        self._refill()
+        self.tokens -= amount
+
+    def limit_remaining(self, remaining: float):
+        """Never believe we have more tokens than the server says are left"""
+        self._refill()
+        self.tokens = min(self.tokens, remaining)
+
+
+class FileRateLimitStore:
+    """
+    Limiter state shared by the worker processes of one host through a small
+    JSON file guarded by an exclusive flock. Waiting for the lock and the
+    read-modify-write are blocking, so they run in a thread; apply() runs
+    while the lock is held, which also serializes it across those threads.
+    """
+
+    def __init__(self, path: str):
+        try:
+            import fcntl
+        except ImportError:
+            raise RuntimeError("The file rate limit backend needs fcntl (Unix); use the postgres backend")
+        self._fcntl = fcntl
+        self.path = path
+
+    def _locked_update(self, apply: Callable[[Optional[dict]], Tuple[Any, dict]]) -> Any:
+        with open(self.path, "a+") as f:
+            self._fcntl.flock(f, self._fcntl.LOCK_EX)
+            try:
+                f.seek(0)
+                raw = f.read()
+                try:
+                    state = json.loads(raw) if raw else None
+                except ValueError:
+                    state = None
+                result, state = apply(state)
+                f.seek(0)
+                f.truncate()
+                f.write(json.dumps(state))
+                f.flush()
+            finally:
+                self._fcntl.flock(f, self._fcntl.LOCK_UN)
+        return result
+
+    async def update(self, apply: Callable[[Optional[dict]], Tuple[Any, dict]]) -> Any:
+        """Atomically replace the stored state with apply(state)[1], returning apply(state)[0]"""
+        return await asyncio.to_thread(self._locked_update, apply)
+
+
+class DatabaseRateLimitStore:
+    """
+    Limiter state shared by every process using the database, kept in one
+    row of rate_limit_state and updated under SELECT ... FOR UPDATE.
+    """
+
+    def __init__(self, name: str = "groq"):
+        self.name = name
+
+    async def update(self, apply: Callable[[Optional[dict]], Tuple[Any, dict]]) -> Any:
+        from tortoise.exceptions import IntegrityError
+        from tortoise.transactions import in_transaction
+        from models import RateLimitState
+
+        async with in_transaction(connection_name="default") as conn:
+            row = await RateLimitState.select_for_update().using_db(conn).get_or_none(name=self.name)
+            result, state = apply(row.state if row else None)
+            if row:
+                row.state = state
+                await row.save(using_db=conn, update_fields=["state"])
+                return result
+        try:
+            await RateLimitState.create(name=self.name, state=state)
+        except IntegrityError:
+            # Another process created the row first; apply again against its state
+            return await self.update(apply)
+        return result
+
+
+class GroqRateLimiter:
+    """
+    Shared requests/min and tokens/min limiter for Groq calls.
+
+    Every caller waits its turn in FIFO order, so concurrent uploads cooperate
+    instead of stampeding the API. A 429 pauses all callers until the
+    server-provided reset time.
+
+    With a store (FileRateLimitStore / DatabaseRateLimitStore) the bucket
+    levels are loaded from and saved to state shared with other worker
+    processes around every operation, so all workers together stay within
+    the account quota.
+    """
+
+    def __init__(self, requests_per_minute: float, tokens_per_minute: float, store=None):
+        self.store = store
+        # Shared state is compared across processes, so it needs wall-clock time
+        self._clock = time.time if store else time.monotonic
+        self.requests = TokenBucket(requests_per_minute, clock=self._clock)
+        self.tokens = TokenBucket(tokens_per_minute, clock=self._clock)
+        self._blocked_until = 0.0
+        self._lock: Optional[asyncio.Lock] = None
+
+    def _dump(self) -> dict:
+        return {
+            "requests": [self.requests.tokens, self.requests.updated_at],
+            "tokens": [self.tokens.tokens, self.tokens.updated_at],
+            "blocked_until": self._blocked_until,
+        }
+
+    def _load(self, state: dict):
+        self.requests.tokens, self.requests.updated_at = state["requests"]
+        self.tokens.tokens, self.tokens.updated_at = state["tokens"]
+        self._blocked_until = state["blocked_until"]
+
+    async def _sync(self, operation: Callable[..., Any], *args) -> Any:
+        """Run an operation on the buckets, against the shared state if there is a store"""
+        if self.store is None:
+            return operation(*args)
+
+        def apply(state):
+            if state:
+                self._load(state)
+            result = operation(*args)
+            return result, self._dump()
+
+        return await self.store.update(apply)
+
+    def _try_acquire(self, estimated_tokens: int) -> float:
+        """Take one request and the tokens if possible, else return the seconds to wait"""
+        wait = max(
+            self._blocked_until - self._clock(),
+            self.requests.delay_for(1),
+            self.tokens.delay_for(estimated_tokens),
+        )
+        if wait > 0:
+            return wait
+        self.requests.consume(1)
+        self.tokens.consume(min(estimated_tokens, self.tokens.capacity))
+        return 0.0
+
+    async def acquire(self, estimated_tokens: int):
+        """Wait until one request and `estimated_tokens` tokens may be spent"""
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            while True:
+                wait = await self._sync(self._try_acquire, estimated_tokens)
+                if wait <= 0:
+                    return
+                await asyncio.sleep(wait)
+
+    def _record_usage(self, estimated_tokens: int, actual_tokens: int):
+        estimated = min(estimated_tokens, self.tokens.capacity)
+        self.tokens.consume(actual_tokens - estimated)
+
+    async def record_usage(self, estimated_tokens: int, actual_tokens: Optional[int]):
+        """Correct the token bucket once the real usage is known"""
+        if actual_tokens is None:
+            return
+        await self._sync(self._record_usage, estimated_tokens, actual_tokens)
+
+    def _limit_remaining(self, remaining: Dict[str, float]):
+        for name, value in remaining.items():
+            getattr(self, name).limit_remaining(value)
+
+    async def update_from_headers(self, headers: Optional[Mapping[str, str]]):
+        """Align local buckets with the x-ratelimit-remaining-* headers"""
+        if not headers:
+            return
+        remaining = {}
+        for header, bucket in (
+            ("x-ratelimit-remaining-requests", "requests"),
+            ("x-ratelimit-remaining-tokens", "tokens"),
+        ):
+            value = headers.get(header)
+            if value is None:
+                continue
+            try:
+                remaining[bucket] = float(value)
+            except ValueError:
+                continue
+        if remaining:
+            await self._sync(self._limit_remaining, remaining)
+
+    def _block_for(self, seconds: float):
+        self._blocked_until = max(self._blocked_until, self._clock() + seconds)
+
+    async def block_for(self, seconds: float):
+        """Pause every caller for `seconds` (used after a 429)"""
+        await self._sync(self._block_for, seconds)
@@ -0,0 +1,199 @@
+import asyncio
+import heapq
+import math
+import re
+from collections import Counter
+from typing import Any, Dict, List, Tuple
+
+from tortoise import Tortoise
+
+from models import Resume, ResumeText
+
+_TOKEN = re.compile(r"[a-z0-9][a-z0-9+#.]*[a-z0-9+#]|[a-z0-9]")
+
+# Common English words that carry no ranking signal
+STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it its of on or that the "
+    "this to was were will with".split()
+)
+
+SNIPPET_CHARS = 160
+
+
+def tokenize(text: str, drop_stopwords: bool = True) -> List[str]:
+    """Lower-case word tokens, keeping tech terms like c++, c# and node.js intact"""
+    tokens = _TOKEN.findall(text.lower())
+    if not drop_stopwords:
+        return tokens
+    return [token for token in tokens if token not in STOPWORDS]
+
+
+def highlight(text: str, terms: List[str], max_chars: int = SNIPPET_CHARS) -> str:
+    """Snippet around the first matching term with all matches wrapped in <mark>"""
+    if not terms:
+        return text[:max_chars]
+    pattern = re.compile(
+        r"(?<![a-z0-9])(" + "|".join(re.escape(term) for term in terms) + r")(?![a-z0-9+#])",
+        re.IGNORECASE
+    )
+    match = pattern.search(text)
+    start = max(0, match.start() - max_chars // 3) if match else 0
+    window = " ".join(text[start:start + max_chars].split())
+    snippet = pattern.sub(r"<mark>\1</mark>", window)
+    prefix = "..." if start > 0 else ""
+    suffix = "..." if start + max_chars < len(text) else ""
+    return f"{prefix}{snippet}{suffix}"
+
+
+class InvertedIndex:
+    """
+    In-process BM25 index over resume_texts, used when the database has no
+    native full-text search (e.g. SQLite setups).
+
+    The index is built on first use and refreshed incrementally before each
+    search by loading rows newer than the last one seen, so inserts from any
+    process are picked up. Deleted resumes are dropped lazily when they
+    show up in results.
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75, chunk_size: int = 1000):
+        self.k1 = k1
+        self.b = b
+        self.chunk_size = chunk_size
+        # term -> {resume_id: term frequency}
+        self.postings: Dict[str, Dict[int, int]] = {}
+        self.doc_lengths: Dict[int, int] = {}
+        self.total_length = 0
+        self._last_text_id = 0
+        self._lock = asyncio.Lock()
+
+    def add(self, resume_id: int, text: str):
+        """Index (or re-index) a document"""
+        self.remove(resume_id)
+        counts = Counter(tokenize(text))
+        for term, tf in counts.items():
+            self.postings.setdefault(term, {})[resume_id] = tf
+        length = sum(counts.values())
+        self.doc_lengths[resume_id] = length
+        self.total_length += length
+
+    def remove(self, resume_id: int):
+        """Drop a document from the index"""
+        length = self.doc_lengths.pop(resume_id, None)
+        if length is None:
+            return
+        self.total_length -= length
+        for term in list(self.postings):
+            docs = self.postings[term]
+            if docs.pop(resume_id, None) is not None and not docs:
+                del self.postings[term]
+
+    async def refresh(self):
+        """Load resume texts stored since the last refresh"""
+        async with self._lock:
+            while True:
+                rows = await (
+                    ResumeText.filter(id__gt=self._last_text_id)
+                    .order_by("id")
+                    .limit(self.chunk_size)
+                    .values("id", "resume_id", "content")
+                )
+                if not rows:
+                    return
+                for row in rows:
+                    self.add(row["resume_id"], row["content"])
+                self._last_text_id = rows[-1]["id"]
+
+    def search(self, terms: List[str], limit: int) -> List[Tuple[int, float]]:
+        """Top (resume_id, BM25 score) pairs for the query terms"""
+        n_docs = len(self.doc_lengths)
+        if not n_docs:
+            return []
+        avg_length = self.total_length / n_docs
+        scores: Dict[int, float] = {}
+        for term in set(terms):
+            docs = self.postings.get(term)
+            if not docs:
+                continue
+            idf = math.log(1 + (n_docs - len(docs) + 0.5) / (len(docs) + 0.5))
+            for resume_id, tf in docs.items():
+                norm = tf + self.k1 * (1 - self.b + self.b * self.doc_lengths[resume_id] / avg_length)
+                scores[resume_id] = scores.get(resume_id, 0.0) + idf * tf * (self.k1 + 1) / norm
+        return heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
+
+
+class ResumeSearch:
+    """
+    Ranked full-text search over extracted resume text.
+    Uses Postgres tsvector/ts_rank when available, the in-process index otherwise.
+    """
+
+    def __init__(self):
+        self.index = InvertedIndex()
+
+    @staticmethod
+    def _is_postgres() -> bool:
+        return Tortoise.get_connection("default").capabilities.dialect == "postgres"
+
+    async def search(self, query: str, limit: int = 20) -> Dict[str, Any]:
+        if self._is_postgres():
+            results = await self._search_postgres(query, limit)
+            backend = "postgres"
+        else:
+            results = await self._search_memory(query, limit)
+            backend = "memory"
+        return {"query": query, "backend": backend, "count": len(results), "results": results}
+
+    async def _search_postgres(self, query: str, limit: int) -> List[Dict[str, Any]]:
+        # Rank against the stored tsvector first, only highlight the top rows
+        conn = Tortoise.get_connection("default")
+        return await conn.execute_query_dict(
+            """
+            SELECT r.id, r.name, r.email, r.last_job_title, r.last_job_company,
+                   r.total_years_experience, ranked.rank,
+                   ts_headline('english', t.content, ranked.q,
+                               'StartSel=<mark>, StopSel=</mark>, MaxWords=30, MinWords=10, MaxFragments=2')
+                       AS snippet
+            FROM (
+                SELECT t.id AS text_id, ts_rank_cd(t.content_tsv, q) AS rank, q
+                FROM resume_texts t, websearch_to_tsquery('english', $1) q
+                WHERE t.content_tsv @@ q
+                ORDER BY rank DESC
+                LIMIT $2
+            ) ranked
+            JOIN resume_texts t ON t.id = ranked.text_id
+            JOIN resumes r ON r.id = t.resume_id
+            ORDER BY ranked.rank DESC
+            """,
+            [query, limit]
+        )
+
+    async def _search_memory(self, query: str, limit: int) -> List[Dict[str, Any]]:
+        terms = tokenize(query)
+        if not terms:
+            return []
+        await self.index.refresh()
+        hits = self.index.search(terms, limit)
+        if not hits:
+            return []
+
+        ids = [resume_id for resume_id, _ in hits]
+        resumes = {
+            row["id"]: row
+            for row in await Resume.filter(id__in=ids).values(
+                "id", "name", "email", "last_job_title", "last_job_company", "total_years_experience"
+            )
+        }
+        texts = dict(await ResumeText.filter(resume_id__in=ids).values_list("resume_id", "content"))
+
+        results = []
+        for resume_id, score in hits:
+            if resume_id not in resumes:
+                # Deleted since it was indexed
+                self.index.remove(resume_id)
+                continue
+            result = dict(resumes[resume_id])
+            result["rank"] = round(score, 4)
+            result["snippet"] = highlight(texts.get(resume_id, ""), terms)
+            results.append(result)
+        return results
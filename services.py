@@ -1,80 +1,302 @@
-import io
 import json
-from groq import Groq
-from PyPDF2 import PdfReader
-import pdfplumber
-from docx import Document
-from typing import Dict, Any
+import asyncio
+from typing import Dict, Any, List, Optional, Tuple, Union
+
+from rate_limit import GroqRateLimiter, backoff_delay, retry_after_seconds
+from metrics import timed, record_tokens, GROQ_REQUESTS_TOTAL, RESUME_FIELDS_TOTAL
+from pdf_text import extract_pdf, open_source
+from preprocess import PREPROCESS_VERSION, prepare
+import local_extract
+import startup
+
+# Bump whenever the parsing prompt changes so cached parses are invalidated.
+# "v1" is the original long-form prompt, "v2" the compact one.
+PROMPT_VERSION = "v2"
+PROMPT_VERSIONS = ("v1", "v2")
+# "full": the LLM is asked for every field, local matches only fill its gaps;
+# "fill": the LLM is only asked for fields the local pass didn't find reliably;
+# "fast": no LLM call, local matches only
+FIELD_MODES = ("full", "fill", "fast")
+
+# Parsed fields and how the v2 prompt describes them
+FIELDS = {
+    "name": "name",
+    "email": "email",
+    "phone": "phone",
+    "total_years_experience": "total_years_experience: number; sum of professional job durations only",
+    "last_job_title": "last_job_title: of the most recent job",
+    "last_job_company": "last_job_company: of the most recent job",
+    "last_job_duration": 'last_job_duration: of the most recent job (e.g. "Jan 2020 - Present")',
+    "highest_degree": 'highest_degree (e.g. "Bachelor\'s in Computer Science")',
+    "university": "university",
+    "graduation_year": "graduation_year",
+    "special_highlights": "special_highlights: awards, certifications, volunteer work or other notable achievements",
+    "skills": "skills: comma-separated technical and professional skills",
+}
+_BATCH_INDEX_FIELD = '- index: the n of the resume\'s "=== RESUME n ===" marker\n'
+_EXPERIENCE_FIELDS = {"total_years_experience", "last_job_title", "last_job_company", "last_job_duration"}
 
 class ResumeParserService:
-    def __init__(self, groq_api_key: str, model_name: str = "llama-3.3-70b-versatile"):
-        self.client = Groq(api_key=groq_api_key)
+    def __init__(
+        self,
+        groq_api_key: str,
+        model_name: str = "llama-3.3-70b-versatile",
+        rate_limiter: Optional[GroqRateLimiter] = None,
+        max_retries: int = 3,
+        base_delay: float = 2.0,
+        max_retry_delay: float = 60.0,
+        prompt_version: str = PROMPT_VERSION,
+        preprocess: bool = True,
+        text_token_budget: int = 3000,
+        field_mode: str = "full"
+    ):
+        if prompt_version not in PROMPT_VERSIONS:
+            raise ValueError(f"Unknown prompt version: {prompt_version}")
+        if field_mode not in FIELD_MODES:
+            raise ValueError(f"Unknown field mode: {field_mode}")
+        self.groq_api_key = groq_api_key
+        # Created on first use so processes that never call Groq don't import the SDK
+        self._client = None
         self.model_name = model_name
+        self.rate_limiter = rate_limiter
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_retry_delay = max_retry_delay
+        self.prompt_version = prompt_version
+        self.preprocess = preprocess
+        self.text_token_budget = text_token_budget
+        self.field_mode = field_mode
     
-    def extract_text_from_pdf(self, content: bytes) -> str:
-        """Extract text from PDF file with fallback support for various encodings"""
-        text = ""
-        
-        # Try PyPDF2 first (faster)
-        try:
-            pdf_file = io.BytesIO(content)
-            reader = PdfReader(pdf_file)
-            for page in reader.pages:
-                page_text = page.extract_text()
-                if page_text:
-                    text += page_text + "\n"
-            
-            # If we got meaningful text (more than just whitespace), return it
-            if text.strip() and len(text.strip()) > 50:
-                return text
-        except Exception as e:
-            print(f"PyPDF2 extraction failed: {e}. Trying pdfplumber...")
-        
-        # Fallback to pdfplumber for better encoding support
-        try:
-            pdf_file = io.BytesIO(content)
-            with pdfplumber.open(pdf_file) as pdf:
-                for page in pdf.pages:
-                    page_text = page.extract_text()
-                    if page_text:
-                        text += page_text + "\n"
-            return text
-        except Exception as e:
-            print(f"pdfplumber extraction also failed: {e}")
-            # Return whatever we got, even if minimal
-            return text if text else ""
-    
-    def extract_text_from_docx(self, content: bytes) -> str:
-        """Extract text from DOCX file"""
-        doc_file = io.BytesIO(content)
-        doc = Document(doc_file)
-        text = ""
-        for paragraph in doc.paragraphs:
-            text += paragraph.text + "\n"
+    @property
+    def client(self):
+        """The AsyncGroq client (imports the groq SDK on first use)"""
+        if self._client is None:
+            groq = startup.load("groq")
+            # Retries are handled here so they respect the shared rate limiter
+            self._client = groq.AsyncGroq(api_key=self.groq_api_key, max_retries=0)
+        return self._client
+    
+    @property
+    def cache_version(self) -> str:
+        """Identifies everything that shapes the parse besides the model (part of the parse cache key)"""
+        version = self.prompt_version
+        if self.preprocess:
+            version += f"+{PREPROCESS_VERSION}"
+        return f"{version}+{self.field_mode}"
+    
+    @staticmethod
+    def extract_text_from_pdf(content: bytes, max_pages: int = 20, max_chars: int = 30000) -> str:
+        """Extract text from PDF file with a backend chosen by probing the first pages"""
+        return extract_pdf(content, max_pages=max_pages, max_chars=max_chars)[0]
+    
+    @staticmethod
+    def extract_text_from_docx(content: Union[bytes, str]) -> str:
+        """Extract text from DOCX file (bytes or a file path)"""
+        docx = startup.load("docx")
+        with timed("docx"), open_source(content) as doc_file:
+            doc = docx.Document(doc_file)
+            text = ""
+            for paragraph in doc.paragraphs:
+                text += paragraph.text + "\n"
         return text
     
-    async def parse_resume(self, content: bytes, file_extension: str) -> Dict[str, Any]:
+    @staticmethod
+    def extract_document(
+        content: Union[bytes, str],
+        file_extension: str,
+        pdf_max_pages: int = 20,
+        pdf_max_chars: int = 30000
+    ) -> Tuple[str, Dict[str, Any]]:
         """
-        Parse resume using Groq AI
+        Extract text based on file type, with details on how it was extracted.
+        `content` is the file's bytes or the path of a spooled upload.
         """
-        # Extract text based on file type
         if file_extension.lower() == '.pdf':
-            text = self.extract_text_from_pdf(content)
+            return extract_pdf(content, max_pages=pdf_max_pages, max_chars=pdf_max_chars)
         elif file_extension.lower() in ['.docx', '.doc']:
-            text = self.extract_text_from_docx(content)
+            return ResumeParserService.extract_text_from_docx(content), {"backend": "python-docx"}
         else:
             raise ValueError(f"Unsupported file extension: {file_extension}")
+    
+    @staticmethod
+    def extract_text(content: bytes, file_extension: str) -> str:
+        """Extract text based on file type"""
+        return ResumeParserService.extract_document(content, file_extension)[0]
+    
+    async def parse_resume(self, content: bytes, file_extension: str) -> Dict[str, Any]:
+        """
+        Parse resume using Groq AI
+        """
+        # Extraction is CPU-bound, keep it off the event loop
+        text = await asyncio.to_thread(self.extract_text, content, file_extension)
+        local = await asyncio.to_thread(self.extract_local, text)
+        fields = self.llm_fields(local)
+        parsed_data = {}
+        if fields:
+            prompt_text, _ = await asyncio.to_thread(self.prepare_text, text)
+            parsed_data = await self.parse_text(prompt_text, fields)
+        return self.merge(local, parsed_data, fields)[0]
+    
+    @staticmethod
+    def extract_local(text: str) -> Dict[str, Any]:
+        """Fields found in the text by regexes and the skills dictionary (no LLM)"""
+        with timed("local_extract"):
+            return local_extract.extract(text)
+    
+    def llm_fields(self, local: Dict[str, Any]) -> List[str]:
+        """Fields to ask the LLM for given the local matches (empty: skip the LLM call)"""
+        if self.field_mode == "fast":
+            return []
+        if self.field_mode == "fill":
+            return [
+                field for field in FIELDS
+                if not (field in local_extract.RELIABLE_FIELDS and local.get(field))
+            ]
+        return list(FIELDS)
+    
+    def merge(
+        self,
+        local: Dict[str, Any],
+        parsed_data: Dict[str, Any],
+        fields: List[str]
+    ) -> Tuple[Dict[str, Any], Dict[str, List[str]]]:
+        """
+        Combine local matches with the LLM's answer for `fields` (the LLM wins
+        where it gave a value) into the shape Resume.create expects. In "full"
+        mode only exact matches (local_extract.EXACT_FIELDS) fill the LLM's gaps.
+        Returns (data, {"local": [...], "llm": [...]}) naming where each filled field came from.
+        """
+        if self.field_mode == "full":
+            local = {field: value for field, value in local.items() if field in local_extract.EXACT_FIELDS}
+        merged = dict(local)
+        sources = {field: "local" for field in local}
+        for field in fields:
+            if parsed_data.get(field) not in (None, ""):
+                merged[field] = parsed_data[field]
+                sources[field] = "llm"
+        for field, source in sources.items():
+            RESUME_FIELDS_TOTAL.inc(field=field, source=source)
+        return self._normalize(merged), {
+            "local": [field for field in FIELDS if sources.get(field) == "local"],
+            "llm": [field for field in FIELDS if sources.get(field) == "llm"],
+        }
+    
+    async def complete(self, messages: List[Dict[str, str]], max_tokens: int, temperature: float = 0.1):
+        """
+        Call Groq chat completions through the shared rate limiter.
+        Rate limit and overload errors are retried with jittered backoff,
+        honoring the server's Retry-After / rate-limit reset headers.
+        """
+        # Rough estimate (~4 characters per token) plus the completion budget
+        estimated_tokens = sum(len(m["content"]) for m in messages) // 4 + max_tokens
+        groq = await startup.load_async("groq")
         
-        # Get current date for accurate "Present" calculation
+        for attempt in range(self.max_retries):
+            if self.rate_limiter:
+                with timed("rate_limit_wait"):
+                    await self.rate_limiter.acquire(estimated_tokens)
+            try:
+                with timed("llm"):
+                    raw = await self.client.chat.completions.with_raw_response.create(
+                        model=self.model_name,
+                        messages=messages,
+                        temperature=temperature,
+                        max_tokens=max_tokens
+                    )
+            except (groq.RateLimitError, groq.InternalServerError) as e:
+                GROQ_REQUESTS_TOTAL.inc(status=e.status_code)
+                if attempt >= self.max_retries - 1:
+                    raise
+                retry_after = retry_after_seconds(e.response.headers, e.message)
+                wait_time = backoff_delay(attempt, self.base_delay, retry_after, self.max_retry_delay)
+                if self.rate_limiter and isinstance(e, groq.RateLimitError):
+                    # Pause every concurrent caller, not just this one
+                    await self.rate_limiter.block_for(wait_time)
+                print(f"Groq returned {e.status_code}. Retrying in {wait_time:.1f}s...")
+                await asyncio.sleep(wait_time)
+                continue
+            
+            response = await raw.parse()
+            GROQ_REQUESTS_TOTAL.inc(status=raw.status_code)
+            usage = getattr(response, "usage", None)
+            if usage:
+                record_tokens(usage.prompt_tokens, usage.completion_tokens)
+            if self.rate_limiter:
+                await self.rate_limiter.update_from_headers(raw.headers)
+                await self.rate_limiter.record_usage(
+                    estimated_tokens,
+                    usage.total_tokens if usage else None
+                )
+            return response
+        
+        raise ValueError("Failed to get response from AI service")
+    
+    @staticmethod
+    def estimate_tokens(text: str) -> int:
+        """Rough token count (~4 characters per token)"""
+        return len(text) // 4
+    
+    def prepare_text(self, text: str) -> Tuple[str, Dict[str, Any]]:
+        """
+        Resume text as it should go into the prompt, and a report of the tokens
+        saved: "tokens_saved" by cleaning/trimming the text and
+        "prompt_tokens_saved" by the compact prompt compared to v1.
+        """
+        if self.preprocess:
+            with timed("preprocess"):
+                prompt_text, report = prepare(text, self.text_token_budget)
+        else:
+            tokens = self.estimate_tokens(text)
+            prompt_text, report = text, {"original_tokens": tokens, "tokens": tokens, "tokens_saved": 0}
+        report["prompt_tokens_saved"] = self._prompt_tokens_saved()
+        return prompt_text, report
+    
+    def _prompt_tokens_saved(self) -> int:
+        """Estimated instruction tokens the current template saves per resume compared to v1"""
+        if self.prompt_version == "v1":
+            return 0
+        return self.estimate_tokens(self._build_prompt_v1("")) - self.estimate_tokens(self.build_prompt(""))
+    
+    @staticmethod
+    def _instructions_v2(fields: Optional[List[str]] = None, extra: str = "") -> str:
+        """Compact extraction rules and list of the requested fields (prompt v2)"""
         from datetime import datetime
         current_year = datetime.now().year
         current_date = datetime.now().strftime("%B %Y")
+        fields = fields or list(FIELDS)
+        field_lines = "".join(f"- {FIELDS[field]}\n" for field in fields)
+        
+        rules = ""
+        if _EXPERIENCE_FIELDS.intersection(fields):
+            rules = f"""
+Experience rules:
+- Never count education years; if only education has dates, use 0.
+- "Present", "Current", "Ongoing" or "Till Date" runs to {current_year}; otherwise use the stated end date.
+- Skip internships, student and volunteer roles that precede the main career; count overlapping jobs once.
+- If dates are detached from their sections, count only the continuous recent block of jobs; earlier clusters are usually education.
+- Future job dates count; an expected graduation does not.
+"""
+        return f"""Today is {current_date}. Reply with JSON only, no markdown.
 
-        # Create prompt for AI
-        prompt = f"""
-You are an expert resume parser. Extract the following information from the resume text and return it as a JSON object.
-
-CURRENT DATE: {current_date} (Use this for "Present" calculations)
+Fields:
+{field_lines}{extra}{rules}Fix obvious typos/OCR errors in names, job titles, companies, degrees and universities.
+"""
+    
+    def _instructions(self) -> str:
+        """Extraction rules and field list of the configured prompt version"""
+        if self.prompt_version == "v1":
+            return self._instructions_v1()
+        return self._instructions_v2()
+    
+    @staticmethod
+    def _instructions_v1() -> str:
+        """Extraction rules and field list shared by single and batch prompts (prompt v1)"""
+        # Get current date for accurate "Present" calculation
+        from datetime import datetime
+        current_year = datetime.now().year
+        current_date = datetime.now().strftime("%B %Y")
+        
+        return f"""CURRENT DATE: {current_date} (Use this for "Present" calculations)
 
 IMPORTANT INSTRUCTIONS:
 1. Return ONLY valid JSON without any markdown formatting, code blocks, or explanations.
@@ -129,100 +351,257 @@ Extract these fields:
 10. graduation_year: Year of graduation
 11. special_highlights: Any notable achievements, awards, certifications, volunteer work, or unique experiences
 12. skills: Comma-separated list of technical and professional skills
+"""
+    
+    def build_prompt(self, text: str, fields: Optional[List[str]] = None) -> str:
+        """
+        Prompt asking for a single JSON object.
+        `fields` limits the requested fields (v2 only; v1 always asks for all of them).
+        """
+        if self.prompt_version == "v1":
+            return self._build_prompt_v1(text)
+        return f"""Extract these fields from the resume as one JSON object (null when absent).
+
+{self._instructions_v2(fields)}
+Resume Text:
+{text}
+"""
+    
+    def _build_prompt_v1(self, text: str) -> str:
+        return f"""
+You are an expert resume parser. Extract the following information from the resume text and return it as a JSON object.
 
+{self._instructions_v1()}
 Resume Text:
 {text}
 
 Return the result as a JSON object with the exact field names specified above.
 """
+    
+    def build_batch_prompt(self, texts: List[str], fields: Optional[List[str]] = None) -> str:
+        """Prompt asking for a JSON array with one object per resume"""
+        resumes = "\n".join(
+            f"=== RESUME {index} ===\n{text}\n=== END RESUME {index} ===\n"
+            for index, text in enumerate(texts)
+        )
+        if self.prompt_version != "v1":
+            return f"""Extract these fields from each of the {len(texts)} resumes independently (null when absent).
+
+{self._instructions_v2(fields, extra=_BATCH_INDEX_FIELD)}
+{resumes}
+Reply with a JSON array of exactly {len(texts)} objects, one per resume, each including "index".
+"""
+        return f"""
+You are an expert resume parser. You will receive {len(texts)} resumes. Extract the following information from EACH resume independently and return a JSON array.
+
+{self._instructions()}
+13. index: The number of the resume as given in its "=== RESUME n ===" marker
+
+Resumes:
+{resumes}
+Return ONLY a JSON array with exactly {len(texts)} objects, one per resume, each with the exact field names specified above including "index".
+"""
+    
+    @staticmethod
+    def _strip_code_fences(result_text: str) -> str:
+        """Remove markdown code blocks if present"""
+        result_text = result_text.strip()
+        if result_text.startswith("```json"):
+            result_text = result_text[7:]
+        if result_text.startswith("```"):
+            result_text = result_text[3:]
+        if result_text.endswith("```"):
+            result_text = result_text[:-3]
+        return result_text.strip()
+    
+    @staticmethod
+    def _answer_fields(answer: Any) -> Dict[str, Any]:
+        """
+        The known fields of an LLM answer, as given. Defaults are only filled in
+        by _normalize after merging, so a field the model left out doesn't
+        override a local match.
+        """
+        if not isinstance(answer, dict):
+            raise ValueError("AI response is not a JSON object")
+        return {field: value for field, value in answer.items() if field in FIELDS}
+    
+    @staticmethod
+    def _normalize(parsed_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Fill in missing fields and coerce types into the shape Resume.create expects"""
+        # Ensure all required fields exist
+        default_data = {
+            "name": None,
+            "email": None,
+            "phone": None,
+            "total_years_experience": 0,
+            "last_job_title": None,
+            "last_job_company": None,
+            "last_job_duration": None,
+            "highest_degree": None,
+            "university": None,
+            "graduation_year": None,
+            "special_highlights": None,
+            "skills": None
+        }
         
-        # Call Groq API with retry logic
-        max_retries = 3
-        base_delay = 2
+        # Ignore any extra keys the model adds (e.g. "index" in batch mode)
+        default_data.update({k: v for k, v in parsed_data.items() if k in default_data})
         
+        # Ensure total_years_experience is an integer
         try:
-            import asyncio
-            import time
-            response = None
-            
-            for attempt in range(max_retries):
-                try:
-                    response = self.client.chat.completions.create(
-                        model=self.model_name,
-                        messages=[
-                            {
-                                "role": "system",
-                                "content": "You are a precise resume parser that extracts structured data and returns only valid JSON."
-                            },
-                            {
-                                "role": "user",
-                                "content": prompt
-                            }
-                        ],
-                        temperature=0.1,
-                        max_tokens=1000
-                    )
-                    break # Success, exit loop
-                    
-                except Exception as e:
-                    error_str = str(e).lower()
-                    if "rate_limit" in error_str or "429" in error_str:
-                        if attempt < max_retries - 1:
-                            wait_time = base_delay * (2 ** attempt)
-                            print(f"Rate limit hit. Retrying in {wait_time}s...")
-                            time.sleep(wait_time)
-                            continue
-                    raise e # Re-raise if not rate limit or retries exhausted
-            
-            # Parse the response
-            if not response:
-                raise ValueError("Failed to get response from AI service")
-                
-            result_text = response.choices[0].message.content.strip()
-            
-            # Remove markdown code blocks if present
-            if result_text.startswith("```json"):
-                result_text = result_text[7:]
-            if result_text.startswith("```"):
-                result_text = result_text[3:]
-            if result_text.endswith("```"):
-                result_text = result_text[:-3]
-            result_text = result_text.strip()
-            
-            # Parse JSON
-            parsed_data = json.loads(result_text)
-            
-            # Ensure all required fields exist
-            default_data = {
-                "name": None,
-                "email": None,
-                "phone": None,
-                "total_years_experience": 0,
-                "last_job_title": None,
-                "last_job_company": None,
-                "last_job_duration": None,
-                "highest_degree": None,
-                "university": None,
-                "graduation_year": None,
-                "special_highlights": None,
-                "skills": None
-            }
+            exp = default_data.get("total_years_experience")
+            if exp is None:
+                default_data["total_years_experience"] = 0
+            else:
+                default_data["total_years_experience"] = int(float(str(exp)))
+        except (ValueError, TypeError):
+            default_data["total_years_experience"] = 0
             
-            default_data.update(parsed_data)
+        return default_data
+    
+    @staticmethod
+    def _usage(response) -> Dict[str, int]:
+        usage = getattr(response, "usage", None)
+        return {
+            "prompt_tokens": usage.prompt_tokens if usage else 0,
+            "completion_tokens": usage.completion_tokens if usage else 0
+        }
+    
+    @staticmethod
+    def _completion_budget(fields: Optional[List[str]]) -> int:
+        """max_tokens per resume; fewer requested fields need a shorter answer"""
+        if not fields or len(fields) == len(FIELDS):
+            return 1000
+        return min(1000, 200 + 70 * len(fields))
+    
+    async def _parse_single(
+        self,
+        text: str,
+        fields: Optional[List[str]] = None
+    ) -> Tuple[Dict[str, Any], Dict[str, int]]:
+        """Parse one resume, returning (fields, token usage)"""
+        try:
+            with timed("prompt_build"):
+                prompt = self.build_prompt(text, fields)
+            response = await self.complete(
+                messages=[
+                    {
+                        "role": "system",
+                        "content": "You are a precise resume parser that extracts structured data and returns only valid JSON."
+                    },
+                    {
+                        "role": "user",
+                        "content": prompt
+                    }
+                ],
+                temperature=0.1,
+                max_tokens=self._completion_budget(fields)
+            )
             
-            # Ensure total_years_experience is an integer
-            try:
-                exp = default_data.get("total_years_experience")
-                if exp is None:
-                    default_data["total_years_experience"] = 0
-                else:
-                    default_data["total_years_experience"] = int(float(str(exp)))
-            except (ValueError, TypeError):
-                default_data["total_years_experience"] = 0
+            with timed("json_parse"):
+                result_text = self._strip_code_fences(response.choices[0].message.content)
                 
-            return default_data
+                # Parse JSON; normalized once merged with the local matches
+                parsed_data = self._answer_fields(json.loads(result_text))
+            return parsed_data, self._usage(response)
             
         except json.JSONDecodeError as e:
             raise ValueError(f"Failed to parse AI response as JSON: {e}")
         except Exception as e:
-            raise ValueError(f"Error parsing resume with AI: {e}")
\ No newline at end of file
+            raise ValueError(f"Error parsing resume with AI: {e}")
+    
+    async def parse_text(self, text: str, fields: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        Parse already extracted resume text using Groq AI
+        (only `fields` are asked for when given)
+        """
+        parsed_data, _ = await self._parse_single(text, fields)
+        return parsed_data
+    
+    async def parse_texts_batch(
+        self,
+        texts: List[str],
+        fields: Optional[List[str]] = None
+    ) -> Tuple[List[Any], Dict[str, Any]]:
+        """
+        Parse several resumes with a single chat completion returning a JSON array.
+        
+        If the array is malformed or incomplete the batch is split in half and
+        retried, down to single-resume requests. Returns (results, report) where
+        results holds a parsed dict or an Exception per input text and report
+        sums the token usage of every request made for the batch.
+        """
+        report = {
+            "size": len(texts),
+            "requests": 0,
+            "prompt_tokens": 0,
+            "completion_tokens": 0,
+            "split": False
+        }
+        results = await self._parse_batch_into(texts, report, fields)
+        return results, report
+    
+    async def _parse_batch_into(
+        self,
+        texts: List[str],
+        report: Dict[str, Any],
+        fields: Optional[List[str]] = None
+    ) -> List[Any]:
+        if len(texts) == 1:
+            report["requests"] += 1
+            try:
+                parsed_data, usage = await self._parse_single(texts[0], fields)
+            except Exception as e:
+                return [e]
+            report["prompt_tokens"] += usage["prompt_tokens"]
+            report["completion_tokens"] += usage["completion_tokens"]
+            return [parsed_data]
+        
+        groq = await startup.load_async("groq")
+        report["requests"] += 1
+        try:
+            with timed("prompt_build"):
+                prompt = self.build_batch_prompt(texts, fields)
+            response = await self.complete(
+                messages=[
+                    {
+                        "role": "system",
+                        "content": "You are a precise resume parser that extracts structured data and returns only valid JSON."
+                    },
+                    {
+                        "role": "user",
+                        "content": prompt
+                    }
+                ],
+                temperature=0.1,
+                max_tokens=self._completion_budget(fields) * len(texts)
+            )
+            usage = self._usage(response)
+            report["prompt_tokens"] += usage["prompt_tokens"]
+            report["completion_tokens"] += usage["completion_tokens"]
+            
+            with timed("json_parse"):
+                parsed = json.loads(self._strip_code_fences(response.choices[0].message.content))
+            if not isinstance(parsed, list):
+                raise ValueError("Batch response is not a JSON array")
+            by_index = {
+                int(item["index"]): item
+                for item in parsed
+                if isinstance(item, dict) and str(item.get("index", "")).isdigit()
+            }
+            if any(index not in by_index for index in range(len(texts))):
+                raise ValueError(
+                    f"Batch response covered {len(by_index)} of {len(texts)} resumes"
+                )
+            return [self._answer_fields(by_index[index]) for index in range(len(texts))]
+        
+        except groq.RateLimitError:
+            # Splitting would only multiply requests against an exhausted quota
+            raise
+        except Exception as e:
+            print(f"Batch of {len(texts)} resumes failed ({e}). Splitting and retrying...")
+            report["split"] = True
+            middle = len(texts) // 2
+            first = await self._parse_batch_into(texts[:middle], report, fields)
+            second = await self._parse_batch_into(texts[middle:], report, fields)
+            return first + second
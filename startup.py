@@ -0,0 +1,109 @@
+import asyncio
+import importlib
+import sys
+import threading
+import time
+from types import ModuleType
+from typing import Any, Dict, Iterable, List
+
+import metrics
+
+# Measured from the first import of this module (main imports it first)
+_STARTED = time.perf_counter()
+
+# Heavy third-party modules by the code path that needs them. They are imported
+# on first use (or by warm_up) so a worker only serving e.g. GET /resumes never loads them.
+HEAVY_MODULES = {
+    "parsing": ["groq"],
+    # Used by the extraction worker processes, which preload them on warm-up
+    "documents": ["PyPDF2", "docx", "pdfplumber"],
+    "export": ["openpyxl"],
+    "matching": ["numpy", "matching"],
+}
+
+_lock = threading.Lock()
+# module -> {"seconds": import time, "loaded_by": "first use" | "warm-up"}
+_imports: Dict[str, Dict[str, Any]] = {}
+# phase -> seconds since _STARTED
+_phases: Dict[str, float] = {}
+
+
+def load(name: str, loaded_by: str = "first use") -> ModuleType:
+    """Import a module, recording how long the first import took"""
+    first = name not in sys.modules
+    start = time.perf_counter()
+    # Also waits while another thread (e.g. the warm-up) is still importing it
+    module = importlib.import_module(name)
+    if first:
+        seconds = time.perf_counter() - start
+        with _lock:
+            _imports.setdefault(name, {"seconds": seconds, "loaded_by": loaded_by})
+    return module
+
+
+async def load_async(name: str) -> ModuleType:
+    """load() for async code paths: the first import runs in a thread so the event loop isn't stalled"""
+    if name in _imports:
+        return sys.modules[name]
+    return await asyncio.to_thread(load, name)
+
+
+def mark(phase: str) -> float:
+    """Record a startup phase (e.g. "app_imported", "ready"); returns seconds since start"""
+    seconds = time.perf_counter() - _STARTED
+    with _lock:
+        _phases.setdefault(phase, seconds)
+    return seconds
+
+
+def preload(names: Iterable[str]) -> List[str]:
+    """
+    Import modules ahead of their first use (blocking).
+    Returns the modules that failed to import; the code paths needing them
+    report the error on first use.
+    """
+    failed = []
+    for name in names:
+        try:
+            load(name, loaded_by="warm-up")
+        except Exception as e:
+            print(f"Warm-up could not import {name}: {e}")
+            failed.append(name)
+    return failed
+
+
+def warm_up(groups: Iterable[str]) -> List[str]:
+    """preload() the heavy modules of the given HEAVY_MODULES groups"""
+    return preload([name for group in groups for name in HEAVY_MODULES.get(group, [])])
+
+
+def report() -> Dict[str, Any]:
+    """Startup phases and the import time of each heavy module this process loaded so far"""
+    with _lock:
+        imports = {name: dict(entry) for name, entry in _imports.items()}
+        phases = {phase: round(seconds, 4) for phase, seconds in _phases.items()}
+    for entry in imports.values():
+        entry["seconds"] = round(entry["seconds"], 4)
+    return {
+        "phases": phases,
+        "modules": imports,
+        # Document libraries are imported by the extraction worker processes, not this one
+        "not_loaded": [
+            name for group, names in HEAVY_MODULES.items() if group != "documents" for name in names
+            if name not in imports and name not in sys.modules
+        ],
+    }
+
+
+def _import_samples() -> List[tuple]:
+    with _lock:
+        return [({"module": name, "loaded_by": entry["loaded_by"]}, entry["seconds"]) for name, entry in _imports.items()]
+
+
+def _phase_samples() -> List[tuple]:
+    with _lock:
+        return [({"phase": phase}, seconds) for phase, seconds in _phases.items()]
+
+
+metrics.REGISTRY.callback("module_import_seconds", "Import time of lazily loaded modules", _import_samples)
+metrics.REGISTRY.callback("startup_phase_seconds", "Seconds from process start to each startup phase", _phase_samples)
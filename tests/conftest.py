@@ -0,0 +1,39 @@
+import asyncio
+import os
+import sys
+
+import pytest
+from tortoise import Tortoise
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def db():
+    """Run a coroutine against a fresh in-memory SQLite database with the app's models"""
+    def run(coro_fn):
+        async def main():
+            await Tortoise.init(db_url="sqlite://:memory:", modules={"models": ["models"]})
+            await Tortoise.generate_schemas()
+            try:
+                return await coro_fn()
+            finally:
+                await Tortoise.close_connections()
+        return asyncio.run(main())
+    return run
+
+
+@pytest.fixture
+def docx_bytes():
+    """Build a DOCX file with the given paragraphs"""
+    def build(*paragraphs: str) -> bytes:
+        import io
+        import docx
+
+        document = docx.Document()
+        for paragraph in paragraphs:
+            document.add_paragraph(paragraph)
+        buffer = io.BytesIO()
+        document.save(buffer)
+        return buffer.getvalue()
+    return build
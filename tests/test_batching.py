@@ -0,0 +1,76 @@
+import asyncio
+import json
+import re
+from types import SimpleNamespace
+
+from batching import LLMBatcher
+from services import ResumeParserService
+
+_MARKER = re.compile(r"=== RESUME (\d+) ===\n(.*?)\n=== END RESUME")
+
+
+def _service(drop_from_batches_over: int = 0):
+    """
+    A parser service whose completions answer from the prompt: each resume's
+    text is its name. Batches larger than `drop_from_batches_over` lose their
+    last item, like a truncated answer.
+    """
+    service = ResumeParserService(groq_api_key="test")
+    prompts = []
+
+    async def complete(messages, max_tokens, temperature=0.1):
+        prompt = messages[-1]["content"]
+        prompts.append(prompt)
+        resumes = _MARKER.findall(prompt)
+        if resumes:
+            answer = [{"index": int(index), "name": text} for index, text in resumes]
+            if drop_from_batches_over and len(answer) > drop_from_batches_over:
+                answer = answer[:-1]
+        else:
+            answer = {"name": prompt.rsplit("\n", 2)[-2]}
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=json.dumps(answer)))],
+            usage=SimpleNamespace(prompt_tokens=100, completion_tokens=20),
+        )
+
+    service.complete = complete
+    return service, prompts
+
+
+def test_resumes_parsed_together_share_one_request():
+    service, prompts = _service()
+
+    async def scenario():
+        batcher = LLMBatcher(service, asyncio.Semaphore(2), max_batch_size=3, token_budget=100000)
+        return await asyncio.gather(*(batcher.parse(name) for name in ("Ann", "Bob", "Cat")))
+
+    results = asyncio.run(scenario())
+    assert [parsed["name"] for parsed, _ in results] == ["Ann", "Bob", "Cat"]
+    assert len(prompts) == 1
+    assert results[0][1]["size"] == 3 and results[0][1]["requests"] == 1
+
+
+def test_malformed_batch_is_split_and_retried():
+    service, prompts = _service(drop_from_batches_over=2)
+
+    async def scenario():
+        batcher = LLMBatcher(service, asyncio.Semaphore(2), max_batch_size=4, token_budget=100000)
+        return await asyncio.gather(*(batcher.parse(name) for name in ("Ann", "Bob", "Cat", "Dan")))
+
+    results = asyncio.run(scenario())
+    assert [parsed["name"] for parsed, _ in results] == ["Ann", "Bob", "Cat", "Dan"]
+    report = results[0][1]
+    assert report["split"] is True
+    # The batch of 4 came back short, each half of 2 was fine
+    assert report["requests"] == 3 == len(prompts)
+
+
+def test_partial_batch_is_sent_after_linger():
+    service, prompts = _service()
+
+    async def scenario():
+        batcher = LLMBatcher(service, asyncio.Semaphore(2), max_batch_size=10, token_budget=100000, linger=0.05)
+        return await asyncio.wait_for(batcher.parse("Ann"), 1)
+
+    parsed, report = asyncio.run(scenario())
+    assert len(prompts) == 1 and report["size"] == 1
@@ -0,0 +1,44 @@
+import asyncio
+
+from cache import ParseCache, content_sha256
+
+
+def test_concurrent_misses_share_one_computation(db):
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return "text", {"name": "Jane Doe"}
+
+    async def scenario():
+        cache = ParseCache(model_name="m", prompt_version="v2")
+        results = await asyncio.gather(*(cache.get_or_compute("h", compute) for _ in range(3)))
+        assert len(calls) == 1
+        assert sorted(hit for _, _, hit in results) == [False, True, True]
+        assert all(parsed == {"name": "Jane Doe"} for _, parsed, _ in results)
+
+    db(scenario)
+
+
+def test_entries_persist_per_model_and_prompt_version(db):
+    async def scenario():
+        content_hash = content_sha256(b"resume")
+        await ParseCache(model_name="m", prompt_version="v2").put(content_hash, "text", {"name": "Jane"})
+
+        # A new process starts with an empty LRU and reads the table
+        assert await ParseCache(model_name="m", prompt_version="v2").get(content_hash) == ("text", {"name": "Jane"})
+        assert await ParseCache(model_name="m", prompt_version="v1").get(content_hash) is None
+        assert await ParseCache(model_name="other", prompt_version="v2").get(content_hash) is None
+
+    db(scenario)
+
+
+def test_memory_layer_evicts_least_recently_used():
+    cache = ParseCache(model_name="m", prompt_version="v2", max_bytes=100)
+    for key in ("a", "b", "c"):
+        cache._remember(key, "x" * 30, {})
+    cache._entries.move_to_end("a")
+    cache._remember("d", "x" * 30, {})
+    assert list(cache._entries) == ["c", "a", "d"]
+    assert cache._size <= 100
@@ -0,0 +1,69 @@
+import asyncio
+import signal
+
+import pytest
+
+from extraction import ExtractionExecutor, ExtractionTimeout
+
+
+def _pids(executor: ExtractionExecutor):
+    return [worker.process.pid for worker in executor._workers]
+
+
+def test_extracts_text_in_worker_process(docx_bytes):
+    executor = ExtractionExecutor(workers=1)
+
+    async def scenario():
+        text, info = await executor.extract(docx_bytes("Jane Doe", "jane@example.com"), ".docx")
+        assert "Jane Doe" in text and "jane@example.com" in text
+        assert info["backend"] == "python-docx"
+        # A broken file is reported without losing the worker
+        pid = _pids(executor)
+        with pytest.raises(ValueError):
+            await executor.extract(b"not a docx", ".docx")
+        assert _pids(executor) == pid
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        executor.shutdown()
+
+
+def test_worker_over_time_budget_is_killed_and_replaced(docx_bytes):
+    executor = ExtractionExecutor(workers=1, timeout=0.001)
+
+    async def scenario():
+        executor.warm_up([])
+        [stuck] = executor._workers
+        with pytest.raises(ExtractionTimeout):
+            await executor.extract(docx_bytes("Jane Doe"), ".docx")
+        assert stuck not in executor._workers
+        assert stuck.process.exitcode == -signal.SIGKILL
+        executor.timeout = 60
+        text, _ = await executor.extract(docx_bytes("John Roe"), ".docx")
+        assert "John Roe" in text
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        executor.shutdown()
+
+
+def test_worker_is_recycled_after_max_tasks(docx_bytes):
+    executor = ExtractionExecutor(workers=1, max_tasks=2)
+
+    async def scenario():
+        content = docx_bytes("Jane Doe")
+        await executor.extract(content, ".docx")
+        first = _pids(executor)
+        await executor.extract(content, ".docx")
+        second = _pids(executor)
+        text, _ = await executor.extract(content, ".docx")
+        return first, second, text
+
+    try:
+        first, second, text = asyncio.run(scenario())
+        assert first != second
+        assert "Jane Doe" in text
+    finally:
+        executor.shutdown()
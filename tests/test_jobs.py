@@ -0,0 +1,156 @@
+import asyncio
+import os
+from datetime import timedelta
+
+import pytest
+
+import jobs
+from jobs import JobQueue
+from models import IngestJob, IngestJobFile, IngestJobFileChunk
+from uploads import SpooledUpload
+
+
+def _upload(filename: str, content: bytes, threshold: int = 1024) -> SpooledUpload:
+    upload = SpooledUpload(filename, threshold)
+    upload.write(content)
+    upload.finish()
+    return upload
+
+
+class RecordingPipeline:
+    """Stands in for BulkIngestPipeline, recording what the job queue hands it"""
+
+    def __init__(self):
+        self.received = []
+
+    async def process_path(self, filename, path, dedupe=False):
+        with open(path, "rb") as f:
+            self.received.append((filename, path, f.read()))
+        return {"filename": filename, "resume": {"id": 1, "name": "x", "cached": False, "duplicate": False}}
+
+
+def test_queued_files_are_stored_in_chunks_and_processed_by_path(db, tmp_path, monkeypatch):
+    monkeypatch.setattr(jobs, "FILE_CHUNK_BYTES", 1000)
+    content = os.urandom(4500)
+    upload = _upload("cv.pdf", content)
+    assert upload.path  # spooled to disk
+
+    async def scenario():
+        pipeline = RecordingPipeline()
+        queue = JobQueue(pipeline, spool_dir=str(tmp_path))
+        try:
+            job = await queue.enqueue([upload, _upload("notes.txt", b"x")])
+        finally:
+            upload.close()
+        file = await IngestJobFile.get(job_id=job.id, position=0)
+        assert file.content is None
+        assert await IngestJobFileChunk.filter(file_id=file.id).count() == 5
+
+        await queue._run_job(job)
+        [(filename, path, received)] = pipeline.received
+        assert filename == "cv.pdf" and path.endswith(".pdf")
+        assert received == content
+        # The temp file and the stored chunks are gone once the file is done
+        assert not os.listdir(tmp_path)
+        assert not await IngestJobFileChunk.filter(file_id=file.id).exists()
+        assert (await IngestJobFile.get(id=file.id)).status == "done"
+
+    db(scenario)
+
+
+class BlockingPipeline:
+    """Stands in for BulkIngestPipeline; every file waits until released"""
+
+    def __init__(self):
+        self.started = []
+        self.release = asyncio.Event()
+
+    async def process_path(self, filename, path, dedupe=False):
+        self.started.append(filename)
+        await self.release.wait()
+        return {"filename": filename, "resume": {"id": 1, "name": "x", "cached": False, "duplicate": False}}
+
+
+async def _queued_job(queue: JobQueue, count: int):
+    return await queue.enqueue([_upload(f"cv{n}.pdf", b"%PDF" + bytes([n])) for n in range(count)])
+
+
+def test_only_one_worker_claims_a_job_until_its_lease_expires(db):
+    async def scenario():
+        first, second = JobQueue(RecordingPipeline(), lease_seconds=60), JobQueue(RecordingPipeline())
+        job = await _queued_job(first, 1)
+        claims = await asyncio.gather(first._claim(), second._claim())
+        assert [claim.id for claim in claims if claim] == [job.id]
+        assert await second._claim() is None
+
+        # A crashed owner stops renewing: once the lease lapses the job is claimable again
+        await IngestJob.filter(id=job.id).update(lease_expires_at=jobs._now() - timedelta(seconds=1))
+        reclaimed = await second._claim()
+        assert reclaimed.id == job.id and reclaimed.status == "running"
+        assert reclaimed.lease_expires_at > jobs._now()
+
+    db(scenario)
+
+
+def test_lease_is_renewed_while_the_job_runs(db):
+    async def scenario():
+        queue = JobQueue(RecordingPipeline(), lease_seconds=0.3)
+        job = await _queued_job(queue, 1)
+        claimed = await queue._claim()
+        heartbeat = asyncio.create_task(queue._renew_lease(job.id))
+        await asyncio.sleep(0.5)
+        heartbeat.cancel()
+        renewed = await IngestJob.get(id=job.id)
+        assert renewed.lease_expires_at > claimed.lease_expires_at
+
+    db(scenario)
+
+
+def test_cancelled_job_is_requeued_with_its_pending_files(db, tmp_path):
+    async def scenario():
+        pipeline = BlockingPipeline()
+        queue = JobQueue(pipeline, file_concurrency=1, spool_dir=str(tmp_path))
+        job = await _queued_job(queue, 3)
+        run = asyncio.create_task(queue._run_job(await queue._claim()))
+        while not pipeline.started:
+            await asyncio.sleep(0.01)
+        run.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await run
+
+        requeued = await IngestJob.get(id=job.id)
+        assert requeued.status == "queued" and requeued.lease_expires_at is None
+        assert await IngestJobFile.filter(job_id=job.id, status="pending").count() == 3
+        assert not os.listdir(tmp_path)
+
+        # The next worker resumes it
+        pipeline.release.set()
+        await queue._run_job(await queue._claim())
+        assert (await IngestJob.get(id=job.id)).status == "completed"
+        assert await IngestJobFile.filter(job_id=job.id, status="done").count() == 3
+
+    db(scenario)
+
+
+def test_failing_file_stops_the_other_files_of_the_job(db):
+    async def scenario():
+        pipeline = BlockingPipeline()
+        queue = JobQueue(pipeline, file_concurrency=3)
+        job = await _queued_job(queue, 3)
+        original = queue._process_file
+
+        async def process_file(job, file_id, filename):
+            if filename == "cv0.pdf":
+                await asyncio.sleep(0.05)
+                raise RuntimeError("status update failed")
+            await original(job, file_id, filename)
+
+        queue._process_file = process_file
+        with pytest.raises(RuntimeError):
+            await queue._run_job(await queue._claim())
+        # The others were cancelled, not left running until another worker reclaims the job
+        pipeline.release.set()
+        await asyncio.sleep(0.05)
+        assert await IngestJobFile.filter(job_id=job.id, status="pending").count() == 3
+
+    db(scenario)
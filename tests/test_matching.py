@@ -0,0 +1,27 @@
+from matching import MatchIndex
+from models import Resume
+
+
+async def _rank(index: MatchIndex, job_description: str):
+    result = await index.match(job_description, skill_weight=0.0)
+    return [row["name"] for row in result["results"]]
+
+
+def test_rare_term_outranks_common_terms_on_small_corpus(db):
+    async def scenario():
+        await Resume.create(name="rare", special_highlights="kubernetes administrator")
+        await Resume.create(name="common", special_highlights="experience team, experience")
+        for i in range(6):
+            await Resume.create(name=f"filler {i}", special_highlights=f"experience team project{i}")
+
+        index = MatchIndex(hash_bits=14)
+        ranking = await _rank(index, "kubernetes experience")
+        assert ranking[0] == "rare"
+
+        # Resumes added later are weighted with the updated document frequencies
+        for i in range(6):
+            await Resume.create(name=f"later {i}", special_highlights=f"kubernetes experience team role{i}")
+        await index.refresh()
+        assert index.idf[index._hash_terms(["kubernetes"])[0]][0] < index.idf[index._hash_terms(["project0"])[0]][0]
+
+    db(scenario)
@@ -0,0 +1,86 @@
+import asyncio
+import fcntl
+import json
+
+import pytest
+
+from rate_limit import FileRateLimitStore, GroqRateLimiter, backoff_delay, retry_after_seconds
+
+GROQ_HEADERS = {
+    "x-ratelimit-reset-requests": "2m59.56s",
+    "x-ratelimit-reset-tokens": "7.66s",
+    "x-ratelimit-remaining-requests": "14370",
+}
+
+
+def test_token_limit_waits_for_the_token_reset():
+    message = "Rate limit reached for model `llama-3.3-70b-versatile` on tokens per minute (TPM)"
+    assert retry_after_seconds(GROQ_HEADERS, message) == 7.66
+    assert retry_after_seconds({**GROQ_HEADERS, "x-ratelimit-remaining-tokens": "0"}) == 7.66
+
+
+def test_retry_after_header_wins():
+    assert retry_after_seconds({**GROQ_HEADERS, "retry-after": "3"}) == 3.0
+
+
+def test_delay_is_capped():
+    assert backoff_delay(0, 2.0, retry_after=600, max_delay=60) == 60
+    assert backoff_delay(12, 2.0, max_delay=60) == 60
+
+
+def test_file_store_waits_for_the_lock_off_the_event_loop(tmp_path):
+    path = str(tmp_path / "limits.json")
+    store = FileRateLimitStore(path)
+
+    async def scenario():
+        ticks = 0
+        with open(path, "a+") as holder:
+            # Another worker process holding the lock
+            fcntl.flock(holder, fcntl.LOCK_EX)
+            update = asyncio.create_task(store.update(lambda state: ("done", {"n": 1})))
+            for _ in range(5):
+                await asyncio.sleep(0.01)
+                ticks += 1
+            assert not update.done()
+            fcntl.flock(holder, fcntl.LOCK_UN)
+        assert await update == "done"
+        return ticks
+
+    assert asyncio.run(scenario()) == 5
+    with open(path) as f:
+        assert json.load(f) == {"n": 1}
+
+
+def test_limiters_share_quota_through_the_file_store(tmp_path):
+    path = str(tmp_path / "limits.json")
+    first = GroqRateLimiter(2, 100000, store=FileRateLimitStore(path))
+    second = GroqRateLimiter(2, 100000, store=FileRateLimitStore(path))
+
+    async def scenario():
+        await first.acquire(10)
+        await second.acquire(10)
+        # Two requests per minute between both, so a third has to wait
+        return await asyncio.wait_for(first.acquire(10), 0.2)
+
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(scenario())
+
+
+def test_limiter_makes_callers_wait_their_turn():
+    # 60 requests a minute with room for 2 at once: one more per second after that
+    limiter = GroqRateLimiter(requests_per_minute=60, tokens_per_minute=100000)
+    limiter.requests.capacity = limiter.requests.tokens = 2
+    order = []
+
+    async def call(n):
+        await limiter.acquire(10)
+        order.append(n)
+
+    async def scenario():
+        started = asyncio.get_running_loop().time()
+        await asyncio.gather(*(call(n) for n in range(3)))
+        return asyncio.get_running_loop().time() - started
+
+    elapsed = asyncio.run(scenario())
+    assert order == [0, 1, 2]
+    assert 0.8 < elapsed < 2
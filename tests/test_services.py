@@ -0,0 +1,125 @@
+import asyncio
+import io
+import json
+from types import SimpleNamespace
+
+import docx
+
+from extraction import ExtractionExecutor
+from models import Resume
+from pipeline import BulkIngestPipeline
+from rate_limit import GroqRateLimiter
+from services import ResumeParserService
+
+RESUME_TEXT = """Jane Doe
+jane@example.com
+
+Experience
+Engineer - Acme (2015 - 2020)
+
+Skills
+Python, SQL
+"""
+
+
+def _answer(data):
+    """A chat completion whose message is the given JSON answer"""
+    return SimpleNamespace(
+        choices=[SimpleNamespace(message=SimpleNamespace(content=json.dumps(data)))],
+        usage=SimpleNamespace(prompt_tokens=10, completion_tokens=10),
+    )
+
+
+def test_field_left_out_by_llm_keeps_local_value():
+    async def complete(messages, max_tokens, temperature=0.1):
+        # No total_years_experience in the answer
+        return _answer({"name": "Jane Doe", "last_job_title": "Engineer"})
+
+    service = ResumeParserService(groq_api_key="test", field_mode="fill")
+    service.complete = complete
+
+    local = service.extract_local(RESUME_TEXT)
+    assert local["total_years_experience"] == 5
+    fields = service.llm_fields(local)
+    assert "total_years_experience" in fields
+
+    parsed_data = asyncio.run(service.parse_text(RESUME_TEXT, fields))
+    merged, sources = service.merge(local, parsed_data, fields)
+    assert merged["total_years_experience"] == 5
+    assert "total_years_experience" in sources["local"]
+    assert merged["last_job_title"] == "Engineer"
+
+
+def test_full_mode_only_fills_gaps_with_exact_matches():
+    service = ResumeParserService(groq_api_key="test", field_mode="full")
+    local = service.extract_local(RESUME_TEXT + "\nEducation\nSchool of Rock, 2011\n")
+    fields = service.llm_fields(local)
+    parsed_data = {"name": "Jane Doe", "university": None, "graduation_year": "", "email": None}
+
+    merged, sources = service.merge(local, parsed_data, fields)
+    assert merged["email"] == "jane@example.com"
+    assert merged["university"] is None and merged["graduation_year"] is None
+    assert merged["total_years_experience"] == 0
+    assert sources["local"] == ["email"]
+
+
+def test_fast_mode_without_a_name_falls_back_to_the_file_name(db):
+    document = docx.Document()
+    # No name line the local pass can read
+    document.add_paragraph("jane@example.com | +1 555 123 4567")
+    document.add_paragraph("Curriculum vitae, 2024")
+    document.add_paragraph("Skills")
+    document.add_paragraph("Python, SQL")
+    buffer = io.BytesIO()
+    document.save(buffer)
+
+    async def scenario():
+        extractor = ExtractionExecutor(workers=1)
+        try:
+            pipeline = BulkIngestPipeline(
+                ResumeParserService(groq_api_key="test", field_mode="fast"), extractor
+            )
+            outcome = await pipeline.process_content("scans/jane_doe_cv.docx", buffer.getvalue())
+        finally:
+            extractor.shutdown()
+        assert "error" not in outcome, outcome.get("error")
+        resume = await Resume.get(id=outcome["resume"]["id"])
+        assert resume.name == "jane_doe_cv"
+        assert resume.email == "jane@example.com"
+
+    db(scenario)
+
+
+def test_complete_retries_429_and_pauses_the_shared_limiter():
+    import groq
+    import httpx
+
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        if len(requests) == 1:
+            return httpx.Response(
+                429, headers={"retry-after": "0.05"},
+                json={"error": {"message": "Rate limit reached on requests per minute (RPM)"}}
+            )
+        return httpx.Response(200, headers={"x-ratelimit-remaining-requests": "5"}, json={
+            "id": "1", "object": "chat.completion", "created": 0, "model": "m",
+            "choices": [{"index": 0, "finish_reason": "stop",
+                         "message": {"role": "assistant", "content": "{}"}}],
+            "usage": {"prompt_tokens": 10, "completion_tokens": 5, "total_tokens": 15},
+        })
+
+    limiter = GroqRateLimiter(requests_per_minute=100, tokens_per_minute=100000)
+    service = ResumeParserService(groq_api_key="test", rate_limiter=limiter, base_delay=0.01)
+    service._client = groq.AsyncGroq(
+        api_key="test", max_retries=0,
+        http_client=httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    )
+
+    response = asyncio.run(service.complete([{"role": "user", "content": "hi"}], max_tokens=10))
+    assert response.choices[0].message.content == "{}"
+    assert len(requests) == 2
+    # The 429 paused every caller, and the limiter followed the remaining-requests header
+    assert limiter._blocked_until > 0
+    assert limiter.requests.tokens <= 5
@@ -0,0 +1,87 @@
+import asyncio
+import os
+
+import pytest
+
+from uploads import UploadRejected, receive_uploads
+
+BOUNDARY = "testboundary"
+
+
+def _body(*files):
+    parts = []
+    for filename, content in files:
+        parts.append(
+            f'--{BOUNDARY}\r\nContent-Disposition: form-data; name="files"; filename="{filename}"\r\n'
+            f"Content-Type: application/octet-stream\r\n\r\n".encode() + content + b"\r\n"
+        )
+    return b"".join(parts) + f"--{BOUNDARY}--\r\n".encode()
+
+
+class StreamedRequest:
+    """The parts of a Starlette request receive_uploads uses, streaming the body in small chunks"""
+
+    def __init__(self, body: bytes, content_length: bool = True, chunk_size: int = 1024):
+        self.headers = {"content-type": f"multipart/form-data; boundary={BOUNDARY}"}
+        if content_length:
+            self.headers["content-length"] = str(len(body))
+        self.chunks = [body[i:i + chunk_size] for i in range(0, len(body), chunk_size)]
+        self.consumed = 0
+
+    async def stream(self):
+        for chunk in self.chunks:
+            self.consumed += 1
+            yield chunk
+
+
+def _receive(request, **limits):
+    return asyncio.run(receive_uploads(request, **limits))
+
+
+def test_small_files_stay_in_memory_and_large_ones_are_spooled(tmp_path):
+    small, large = b"a" * 500, os.urandom(5000)
+    uploads = _receive(
+        StreamedRequest(_body(("small.pdf", small), ("dir\\large.pdf", large))),
+        spool_threshold=1000, spool_dir=str(tmp_path)
+    )
+    try:
+        assert [upload.filename for upload in uploads] == ["small.pdf", "large.pdf"]
+        assert uploads[0].path is None and uploads[0].read() == small
+        assert os.path.dirname(uploads[1].path) == str(tmp_path) and uploads[1].read() == large
+    finally:
+        for upload in uploads:
+            upload.close()
+    assert not os.listdir(tmp_path)
+
+
+def test_file_over_limit_is_rejected_while_streaming(tmp_path):
+    request = StreamedRequest(_body(("big.pdf", os.urandom(20000)), ("next.pdf", b"x")))
+    with pytest.raises(UploadRejected) as rejected:
+        _receive(request, max_file_bytes=4000, spool_threshold=1000, spool_dir=str(tmp_path))
+    assert rejected.value.status_code == 413 and "big.pdf" in rejected.value.detail
+    # Stopped as soon as the limit was crossed, without leaving spool files behind
+    assert request.consumed < len(request.chunks) / 2
+    assert not os.listdir(tmp_path)
+
+
+def test_request_over_limit_is_rejected(tmp_path):
+    body = _body(*((f"cv{n}.pdf", b"x" * 3000) for n in range(5)))
+
+    declared = StreamedRequest(body)
+    with pytest.raises(UploadRejected) as rejected:
+        _receive(declared, max_request_bytes=8000)
+    assert rejected.value.status_code == 413 and declared.consumed == 0
+
+    # Without a Content-Length the body is cut off once it grows past the limit
+    undeclared = StreamedRequest(body, content_length=False)
+    with pytest.raises(UploadRejected) as rejected:
+        _receive(undeclared, max_request_bytes=8000, spool_threshold=1000, spool_dir=str(tmp_path))
+    assert rejected.value.status_code == 413
+    assert undeclared.consumed < len(undeclared.chunks)
+    assert not os.listdir(tmp_path)
+
+
+def test_too_many_files_are_rejected():
+    with pytest.raises(UploadRejected) as rejected:
+        _receive(StreamedRequest(_body(*((f"cv{n}.pdf", b"x") for n in range(3)))), max_files=2)
+    assert rejected.value.status_code == 413
@@ -0,0 +1,56 @@
+import asyncio
+
+from models import Resume, ResumeSkill, ResumeText
+from writer import ResumeWriter
+
+
+def _row(name, skills="Python, SQL"):
+    return {"name": name, "skills": skills, "total_years_experience": 3}
+
+
+def test_batch_is_written_with_reserved_ids(db):
+    async def scenario():
+        writer = ResumeWriter(batch_size=3, linger=1)
+        resumes = await asyncio.gather(*(
+            writer.save(_row(name), f"text of {name}", f"hash-{name}", {"backend": "pypdf2", "pages": 1})
+            for name in ("Ann", "Bob", "Cat")
+        ))
+        ids = [resume.id for resume in resumes]
+        assert len(set(ids)) == 3 and ids == sorted(ids)
+        assert [r.name for r in await Resume.filter(id__in=ids).order_by("id")] == ["Ann", "Bob", "Cat"]
+        assert await ResumeSkill.filter(resume_id__in=ids).count() == 6
+        text = await ResumeText.get(resume_id=ids[1])
+        assert text.content == "text of Bob" and text.extraction_backend == "pypdf2"
+
+        # Ids of deleted resumes are not handed out again
+        await Resume.filter(id=ids[-1]).delete()
+        resume = await writer.save(_row("Dan"), "text", "hash-dan")
+        assert resume.id > ids[-1]
+
+    db(scenario)
+
+
+def test_failed_batch_falls_back_to_row_by_row(db):
+    async def scenario():
+        writer = ResumeWriter(batch_size=3, linger=1)
+        results = await asyncio.gather(
+            writer.save(_row("Ann"), "a", "hash-a"),
+            # The name column is required, so this row fails the bulk insert
+            writer.save(_row(None), "b", "hash-b"),
+            writer.save(_row("Cat"), "c", "hash-c"),
+            return_exceptions=True,
+        )
+        assert isinstance(results[1], Exception)
+        assert [resume.name for resume in (results[0], results[2])] == ["Ann", "Cat"]
+        assert await Resume.all().count() == 2
+        assert await ResumeText.all().count() == 2
+
+    db(scenario)
+
+
+def test_batch_size_one_writes_directly(db):
+    async def scenario():
+        resume = await ResumeWriter(batch_size=1).save(_row("Ann"), "text", "hash")
+        assert (await ResumeText.get(resume_id=resume.id)).content == "text"
+
+    db(scenario)
@@ -0,0 +1,231 @@
+import asyncio
+import hashlib
+import os
+import tempfile
+from typing import Any, AsyncIterator, Dict, List, Optional, Union
+
+from fastapi import Request
+
+try:
+    from python_multipart.multipart import MultipartParser, parse_options_header
+except ImportError:  # python-multipart < 0.0.13
+    from multipart.multipart import MultipartParser, parse_options_header
+
+# Request body schema for the OpenAPI docs, since the endpoint reads the raw stream
+OPENAPI_FILES_BODY = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "multipart/form-data": {
+                "schema": {
+                    "type": "object",
+                    "required": ["files"],
+                    "properties": {"files": {"type": "array", "items": {"type": "string", "format": "binary"}}},
+                }
+            }
+        },
+    }
+}
+
+
+class UploadRejected(Exception):
+    """Raised when an upload breaks a size/count limit or isn't valid multipart"""
+
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+def _megabytes(size: int) -> str:
+    return f"{size / (1024 * 1024):.3g} MB"
+
+
+class SpooledUpload:
+    """
+    One uploaded file, kept in memory up to `threshold` bytes and in a temp
+    file on disk beyond that. The SHA-256 is computed while it is received.
+    """
+
+    def __init__(self, filename: str, threshold: int, spool_dir: Optional[str] = None):
+        self.filename = filename
+        self.size = 0
+        self.path: Optional[str] = None
+        self.threshold = threshold
+        self.spool_dir = spool_dir
+        self._buffer = bytearray()
+        self._file = None
+        self._sha256 = hashlib.sha256()
+
+    def spills(self, length: int) -> bool:
+        """Whether writing `length` more bytes goes to disk (so should happen off the event loop)"""
+        return self._file is not None or self.size + length > self.threshold
+
+    def write(self, data: bytes):
+        self._sha256.update(data)
+        self.size += len(data)
+        if self._file is None and self.size > self.threshold:
+            suffix = os.path.splitext(self.filename)[1].lower()
+            self._file = tempfile.NamedTemporaryFile(
+                prefix="upload-", suffix=suffix, dir=self.spool_dir, delete=False
+            )
+            self.path = self._file.name
+            self._file.write(self._buffer)
+            self._buffer = bytearray()
+        if self._file is not None:
+            self._file.write(data)
+        else:
+            self._buffer += data
+
+    def finish(self):
+        """Close the spool file once the part is complete"""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    @property
+    def content_hash(self) -> str:
+        return self._sha256.hexdigest()
+
+    @property
+    def source(self) -> Union[bytes, str]:
+        """What the extractors read: the bytes of a small file, or the path of a spooled one"""
+        return self.path if self.path else bytes(self._buffer)
+
+    def read(self) -> bytes:
+        """The whole file (blocking file I/O for spooled files)"""
+        if self.path:
+            with open(self.path, "rb") as f:
+                return f.read()
+        return bytes(self._buffer)
+
+    async def chunks(self, size: int) -> AsyncIterator[bytes]:
+        """The file in pieces of up to `size` bytes (spooled files are read off the event loop)"""
+        if not self.path:
+            for start in range(0, len(self._buffer), size):
+                yield bytes(self._buffer[start:start + size])
+            return
+        f = await asyncio.to_thread(open, self.path, "rb")
+        try:
+            while True:
+                chunk = await asyncio.to_thread(f.read, size)
+                if not chunk:
+                    return
+                yield chunk
+        finally:
+            f.close()
+
+    def close(self):
+        """Drop the content and remove the spool file"""
+        self.finish()
+        if self.path:
+            try:
+                os.unlink(self.path)
+            except FileNotFoundError:
+                pass
+            self.path = None
+        self._buffer = bytearray()
+
+
+async def receive_uploads(
+    request: Request,
+    field: str = "files",
+    max_file_bytes: int = 20 * 1024 * 1024,
+    max_request_bytes: int = 200 * 1024 * 1024,
+    max_files: int = 1000,
+    spool_threshold: int = 1024 * 1024,
+    spool_dir: Optional[str] = None,
+) -> List[SpooledUpload]:
+    """
+    Stream a multipart/form-data body into SpooledUploads (files of `field` only).
+
+    Limits are enforced as the body arrives: a Content-Length over
+    max_request_bytes is rejected before anything is read, and a file or
+    body growing past its limit stops the upload right there.
+    Raises UploadRejected; the caller must close() the returned uploads.
+    """
+    content_type, params = parse_options_header(request.headers.get("content-type", ""))
+    if content_type != b"multipart/form-data" or b"boundary" not in params:
+        raise UploadRejected(400, "Expected a multipart/form-data upload")
+    declared = request.headers.get("content-length")
+    if declared and declared.isdigit() and int(declared) > max_request_bytes:
+        raise UploadRejected(413, f"Upload exceeds the {_megabytes(max_request_bytes)} request limit")
+
+    uploads: List[SpooledUpload] = []
+    # Parser callbacks run synchronously; data is collected and written after each chunk
+    state: Dict[str, Any] = {"headers": {}, "field": b"", "current": None}
+    writes: List[tuple] = []
+    finished: List[SpooledUpload] = []
+
+    def on_part_begin():
+        state["headers"] = {}
+        state["current"] = None
+
+    def on_header_field(data: bytes, start: int, end: int):
+        state["field"] += data[start:end]
+
+    def on_header_value(data: bytes, start: int, end: int):
+        key = state["field"].lower()
+        state["headers"][key] = state["headers"].get(key, b"") + data[start:end]
+
+    def on_header_end():
+        state["field"] = b""
+
+    def on_headers_finished():
+        _, options = parse_options_header(state["headers"].get(b"content-disposition", b""))
+        if options.get(b"name", b"").decode("utf-8", "replace") != field or b"filename" not in options:
+            return
+        if len(uploads) >= max_files:
+            raise UploadRejected(413, f"At most {max_files} files per upload")
+        # Some browsers send the client-side path
+        filename = os.path.basename(options[b"filename"].decode("utf-8", "replace").replace("\\", "/"))
+        state["current"] = SpooledUpload(filename, spool_threshold, spool_dir)
+        uploads.append(state["current"])
+
+    def on_part_data(data: bytes, start: int, end: int):
+        if state["current"] is not None:
+            writes.append((state["current"], data[start:end]))
+
+    def on_part_end():
+        if state["current"] is not None:
+            finished.append(state["current"])
+
+    parser = MultipartParser(params[b"boundary"], {
+        "on_part_begin": on_part_begin,
+        "on_part_data": on_part_data,
+        "on_part_end": on_part_end,
+        "on_header_field": on_header_field,
+        "on_header_value": on_header_value,
+        "on_header_end": on_header_end,
+        "on_headers_finished": on_headers_finished,
+    })
+
+    received = 0
+    try:
+        async for chunk in request.stream():
+            received += len(chunk)
+            if received > max_request_bytes:
+                raise UploadRejected(413, f"Upload exceeds the {_megabytes(max_request_bytes)} request limit")
+            parser.write(chunk)
+            for upload, data in writes:
+                if upload.size + len(data) > max_file_bytes:
+                    raise UploadRejected(
+                        413, f"{upload.filename} exceeds the {_megabytes(max_file_bytes)} per-file limit"
+                    )
+                if upload.spills(len(data)):
+                    await asyncio.to_thread(upload.write, data)
+                else:
+                    upload.write(data)
+            for upload in finished:
+                upload.finish()
+            writes.clear()
+            finished.clear()
+        parser.finalize()
+    except BaseException as e:
+        # Also on cancellation (client gone), so no spool files are left behind
+        for upload in uploads:
+            upload.close()
+        if isinstance(e, Exception) and not isinstance(e, UploadRejected):
+            raise UploadRejected(400, f"Invalid multipart upload: {e}") from e
+        raise
+    return uploads
@@ -0,0 +1,161 @@
+import asyncio
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from tortoise.transactions import in_transaction
+
+from models import Resume, ResumeSkill, ResumeText
+
+# A pending write: (parsed fields, extracted text, content hash, extraction info, result future)
+_PendingWrite = Tuple[Dict[str, Any], str, str, Optional[Dict[str, Any]], asyncio.Future]
+
+
+def _text_row(resume_id: int, text: str, extraction: Optional[Dict[str, Any]]) -> ResumeText:
+    """resume_texts row, recording how the text was extracted when known"""
+    extraction = extraction or {}
+    return ResumeText(
+        resume_id=resume_id,
+        content=text,
+        extraction_backend=extraction.get("backend"),
+        page_count=extraction.get("pages")
+    )
+
+
+async def _reserve_ids(conn, count: int) -> Optional[List[int]]:
+    """
+    Allocate primary keys for `count` new resumes inside the open transaction.
+    Returns None when the database has no way to do that up front.
+    """
+    dialect = conn.capabilities.dialect
+    if dialect == "postgres":
+        rows = await conn.execute_query_dict(
+            "SELECT nextval(pg_get_serial_sequence('resumes', 'id')) AS id FROM generate_series(1, $1)",
+            [count]
+        )
+        return [row["id"] for row in rows]
+    if dialect == "sqlite":
+        # Tortoise runs SQLite transactions one at a time on a single connection,
+        # so max + 1 is ours (a clash with another process just fails the batch).
+        # sqlite_sequence keeps ids of deleted rows from being handed out again.
+        rows = await conn.execute_query_dict(
+            "SELECT MAX(COALESCE((SELECT seq FROM sqlite_sequence WHERE name = 'resumes'), 0), "
+            "COALESCE((SELECT MAX(id) FROM resumes), 0)) AS id"
+        )
+        start = rows[0]["id"] + 1
+        return list(range(start, start + count))
+    return None
+
+
+async def insert_resume(
+    parsed_data: Dict[str, Any],
+    text: str,
+    content_hash: str,
+    extraction: Optional[Dict[str, Any]] = None
+) -> Resume:
+    """Insert a resume with its normalized skills and extracted text in one transaction"""
+    async with in_transaction(connection_name="default") as conn:
+        resume = await Resume.create(**parsed_data, content_hash=content_hash, using_db=conn)
+        await resume.save_skills(using_db=conn)
+        await _text_row(resume.id, text, extraction).save(using_db=conn)
+    return resume
+
+
+class ResumeWriter:
+    """
+    Write-behind stage for parsed resumes.
+
+    Callers await save() individually; rows arriving around the same time are
+    collected until batch_size is reached or `linger` seconds pass and then
+    written with one bulk insert per table in a single transaction. If the
+    batch fails (e.g. a constraint violation) it is rolled back and its rows
+    are retried one by one, so only the offending rows fail.
+    """
+
+    def __init__(self, batch_size: int = 50, linger: float = 0.05):
+        self.batch_size = batch_size
+        self.linger = linger
+        self._pending: List[_PendingWrite] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks: Set[asyncio.Task] = set()
+
+    async def save(
+        self,
+        parsed_data: Dict[str, Any],
+        text: str,
+        content_hash: str,
+        extraction: Optional[Dict[str, Any]] = None
+    ) -> Resume:
+        """Queue a resume for insertion and wait until it is stored"""
+        if self.batch_size <= 1:
+            return await insert_resume(parsed_data, text, content_hash, extraction)
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((parsed_data, text, content_hash, extraction, future))
+        if len(self._pending) >= self.batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.linger, self._flush)
+        return await future
+
+    def _flush(self):
+        """Write the pending rows as one batch"""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._pending:
+            return
+        batch, self._pending = self._pending, []
+        task = asyncio.get_running_loop().create_task(self._run(batch))
+        # Keep a reference so the task isn't garbage collected mid-flight
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: List[_PendingWrite]):
+        try:
+            resumes = await self._insert_batch(batch)
+        except Exception as e:
+            print(f"Batch insert of {len(batch)} resumes failed ({e}), retrying row by row")
+            resumes = None
+
+        for index, (parsed_data, text, content_hash, extraction, future) in enumerate(batch):
+            if future.done():
+                continue
+            if resumes is not None:
+                future.set_result(resumes[index])
+                continue
+            try:
+                future.set_result(await insert_resume(parsed_data, text, content_hash, extraction))
+            except Exception as e:
+                future.set_exception(e)
+
+    async def _insert_batch(self, batch: List[_PendingWrite]) -> Optional[List[Resume]]:
+        """
+        Insert a batch of resumes, their skills and texts in one transaction.
+        Returns None if ids can't be allocated up front (rows are then inserted one by one).
+        """
+        async with in_transaction(connection_name="default") as conn:
+            ids = await _reserve_ids(conn, len(batch))
+            if ids is None:
+                return None
+            resumes = [
+                Resume(id=resume_id, **parsed_data, content_hash=content_hash)
+                for resume_id, (parsed_data, _, content_hash, _, _) in zip(ids, batch)
+            ]
+            await Resume.bulk_create(resumes, using_db=conn)
+            skills = [
+                ResumeSkill(resume_id=resume.id, name=name)
+                for resume in resumes
+                for name in Resume.normalize_skills(resume.skills)
+            ]
+            if skills:
+                await ResumeSkill.bulk_create(skills, using_db=conn)
+            await ResumeText.bulk_create(
+                [
+                    _text_row(resume.id, text, extraction)
+                    for resume, (_, text, _, extraction, _) in zip(resumes, batch)
+                ],
+                using_db=conn
+            )
+        for resume in resumes:
+            resume._saved_in_db = True
+        return resumes